@@ -1 +1,6 @@
+# -*- coding: utf-8 -*-
 from ._main import MetricsProcessor, MetricsProcessorConfig
+from ._loader import load_config, config_fingerprint
+from ._reloading import ReloadingMetricsProcessor
+from ._coalescer import BatchCoalescer
+from .modules.preprocessing import InputRejectedError
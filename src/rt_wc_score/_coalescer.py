@@ -0,0 +1,225 @@
+"""Micro-batching of concurrent single-payload calls."""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+
+from .telemetry import Histogram, MetricsRegistry, exponential_buckets
+
+logger = logging.getLogger(__name__)
+
+# Wait-time buckets in seconds, from 50us to 1s
+WAIT_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    1.0,
+)
+
+
+class _Pending(NamedTuple):
+    """Item waiting to be batched."""
+
+    item: Any
+    future: Future
+    enqueued: float
+
+
+# Tells a dispatcher thread to exit
+_STOP = object()
+
+
+class BatchCoalescer:
+    """Collects concurrent single-item calls into batches.
+
+    Each caller hands in one item and blocks until its own result is ready.
+    Dispatcher threads take the queued items and run them through `batch_fn`
+    as soon as `max_batch_size` items are collected or the oldest one has
+    waited `max_wait_ms`, whichever comes first. A caller is therefore delayed
+    by at most `max_wait_ms` plus the batch run time, while under load the
+    batch function sees full batches. If `batch_fn` raises, every caller of the
+    batch gets the exception.
+
+    Example:
+        processor = MetricsProcessor()
+        coalescer = BatchCoalescer(processor.batch, max_batch_size=64)
+        result = coalescer(raw_data)  # From any number of threads
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        workers: int = 1,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """Initialize the coalescer and start its dispatcher threads.
+
+        Args:
+            batch_fn: Function returning one result per item, in order
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: Maximum milliseconds an item waits for its batch to fill
+            workers: Number of batches run concurrently
+            registry: Registry to export the batch size and wait time
+                histograms with
+
+        Raises:
+            ValueError: If a limit is not positive
+        """
+        if max_batch_size < 1 or workers < 1 or max_wait_ms < 0:
+            raise ValueError(
+                "max_batch_size and workers must be positive, "
+                "max_wait_ms must not be negative"
+            )
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.batch_size = Histogram(
+            "rt_wc_score_coalescer_batch_size",
+            exponential_buckets(
+                1, 2, max_batch_size.bit_length() + 1, limit=max_batch_size
+            ),
+            "Number of items per batch",
+        )
+        self.wait_seconds = Histogram(
+            "rt_wc_score_coalescer_wait_seconds",
+            WAIT_BUCKETS,
+            "Seconds an item waited before its batch started",
+        )
+        if registry is not None:
+            registry.register(self.batch_size)
+            registry.register(self.wait_seconds)
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._dispatch, name=f"coalescer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Process one item as part of a batch.
+
+        Args:
+            item: Item to process
+            timeout: Maximum seconds to wait for the result
+
+        Returns:
+            Result of the item
+
+        Raises:
+            TimeoutError: If the result is not ready within `timeout`
+            RuntimeError: If the coalescer is closed
+        """
+        return self.submit(item).result(timeout)
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item without waiting for its result.
+
+        Args:
+            item: Item to process
+
+        Returns:
+            Future resolved with the result of the item
+
+        Raises:
+            RuntimeError: If the coalescer is closed
+        """
+        future: Future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("Coalescer is closed")
+            self._queue.put(_Pending(item, future, time.monotonic()))
+        return future
+
+    def close(self) -> None:
+        """Process the items already queued and stop the dispatcher threads."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(_STOP)
+
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> "BatchCoalescer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _dispatch(self) -> None:
+        """Collect and run batches until stopped."""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            deadline = first.enqueued + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        pending = self._queue.get(timeout=remaining)
+                    else:
+                        pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stop = True
+                    break
+                batch.append(pending)
+
+            self._run(batch)
+            if stop:
+                return
+
+    def _run(self, batch: List[_Pending]) -> None:
+        """Run one batch and resolve the futures of its callers."""
+        started = time.monotonic()
+        # Callers that cancelled meanwhile are left out
+        batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        self.batch_size.observe(len(batch))
+        for pending in batch:
+            self.wait_seconds.observe(started - pending.enqueued)
+
+        try:
+            results = self.batch_fn([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results "
+                    f"for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(batch)}: {str(e)}")
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            pending.future.set_result(result)
@@ -0,0 +1,74 @@
+"""Loading of pipeline configuration from YAML/JSON files."""
+
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Union
+
+import yaml
+from pydantic import BaseModel
+
+from ._main import MetricsProcessorConfig
+
+logger = logging.getLogger(__name__)
+
+
+def read_config_file(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a configuration file into a dictionary.
+
+    Files ending in `.json` are parsed as JSON, anything else as YAML. An empty
+    file gives an empty dictionary, i.e. defaults.
+
+    Args:
+        path: Path to the configuration file
+
+    Returns:
+        Configuration values
+
+    Raises:
+        ValueError: If the file does not contain a mapping
+    """
+    path = Path(path)
+    text = path.read_text()
+
+    if path.suffix.lower() == ".json":
+        data = json.loads(text) if text.strip() else {}
+    else:
+        data = yaml.safe_load(text) or {}
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Configuration file {path} must contain a mapping")
+    return data
+
+
+def load_config(path: Union[str, Path]) -> MetricsProcessorConfig:
+    """Load the pipeline configuration from a YAML or JSON file.
+
+    Missing values keep their defaults.
+
+    Args:
+        path: Path to the configuration file
+
+    Returns:
+        Validated, frozen pipeline configuration
+    """
+    return MetricsProcessorConfig.model_validate(read_config_file(path))
+
+
+def config_fingerprint(config: BaseModel) -> str:
+    """Get a content fingerprint of a configuration.
+
+    Configurations with the same values have the same fingerprint, no matter how
+    they were created.
+
+    Args:
+        config: Configuration model
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON form of the configuration
+    """
+    canonical = json.dumps(
+        config.model_dump(mode="json"), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
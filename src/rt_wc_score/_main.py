@@ -1,11 +1,29 @@
 """Main module for processing metrics data through preprocessing and heuristics."""
 
+import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
-from .modules.preprocessing import Preprocessor, PreprocessorConfig
-from .modules.heuristics import HeuristicAnalyzer, HeuristicConfig
+from .modules.preprocessing import (
+    InputRejectedError,
+    Preprocessor,
+    PreprocessorConfig,
+    TrajectoryIndex,
+)
+from .modules.heuristics import (
+    ColumnarHeuristicAnalyzer,
+    HeuristicAnalyzer,
+    HeuristicConfig,
+)
+from .telemetry import (
+    RESULTS,
+    SCORES,
+    STAGE_SECONDS,
+    VERDICTS,
+    ProfilingConfig,
+    SamplingProfiler,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,38 +39,94 @@ class MetricsProcessorConfig(BaseModel):
         default_factory=HeuristicConfig,
         description="Configuration for heuristic analysis",
     )
+    profiling: ProfilingConfig = Field(
+        default_factory=ProfilingConfig,
+        description="Configuration for sampled profiling of calls",
+    )
 
     class Config:
         frozen = True
 
 
 class MetricsProcessor:
-    """Main class for processing metrics data through preprocessing and heuristic analysis."""
+    """Main class for processing metrics data through preprocessing and heuristic analysis.
+
+    The pipeline keeps no per-call state, so a single instance can be shared by
+    several threads. The only exception is the index of prior trajectories
+    kept when the `replay` analysis is enabled, which is locked.
+    """
 
-    def __init__(self, config: Optional[MetricsProcessorConfig] = None):
+    def __init__(
+        self,
+        config: Optional[MetricsProcessorConfig] = None,
+        replay_index: Optional[TrajectoryIndex] = None,
+    ):
         """Initialize the metrics processor pipeline.
 
         Args:
             config: Configuration for the processing pipeline
+            replay_index: Index of prior trajectories for the `replay` analysis,
+                built for the configured replay processing; a new empty index
+                if None. Pipelines sharing an index share the replay history.
         """
         self.config = config or MetricsProcessorConfig()
 
-        self.preprocessor = Preprocessor(config=self.config.preprocessor)
         self.heuristic_analyzer = HeuristicAnalyzer(config=self.config.heuristics)
+        self.columnar_analyzer = ColumnarHeuristicAnalyzer(
+            config=self.config.heuristics
+        )
+        # Only engineer the features the configured analyzers actually read
+        self.preprocessor = Preprocessor(
+            config=self.config.preprocessor,
+            required_features=self.heuristic_analyzer.required_features,
+            replay_index=replay_index,
+        )
+        self.profiler = (
+            SamplingProfiler(config=self.config.profiling)
+            if self.config.profiling.enabled
+            else None
+        )
 
-    def __call__(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        self._analysis_seconds = STAGE_SECONDS.labels(stage="analysis")
+        self._total_seconds = STAGE_SECONDS.labels(stage="total")
+        self._batch_seconds = STAGE_SECONDS.labels(stage="batch")
+        self._successes = RESULTS.labels(outcome="success")
+        self._verdicts = {is_bot: VERDICTS.labels(is_bot=is_bot) for is_bot in (0, 1)}
+
+    def __call__(
+        self, raw_data: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Process raw metrics data through the pipeline.
 
         Args:
             raw_data: Raw metrics data
+            deadline: `time.monotonic()` time by which the result is needed. If
+                the payload is too large to process fully in time, expensive
+                feature processors work on a sample of the events instead.
 
         Returns:
-            Dictionary containing preprocessed features and analysis results
+            Dictionary containing preprocessed features and analysis results,
+            with the `degradations` applied to meet the deadline (empty if the
+            result is exact). Input over the size limits gets a failure with
+            stage `validation` and the structured `rejection`.
         """
+        start = time.perf_counter()
+        if self.profiler is None:
+            result = self._process(raw_data, deadline)
+        else:
+            result = self.profiler(self._process, raw_data, deadline)
+        self._record(result)
+        self._total_seconds.observe(time.perf_counter() - start)
+        return result
+
+    def _process(
+        self, raw_data: Dict[str, Any], deadline: Optional[float]
+    ) -> Dict[str, Any]:
+        """Run the pipeline on one payload."""
         try:
             # Step 1: Preprocess the data
             logger.info("Preprocessing raw data...")
-            processed_features = self.preprocessor(raw_data)
+            processed_features = self.preprocessor(raw_data, deadline=deadline)
 
             logger.info("Preprocessing raw data...")
             logger.info(f"Processing Done")
@@ -66,15 +140,121 @@ class MetricsProcessor:
 
             # Step 2: Run heuristic analysis
             logger.info("Running heuristic analysis...")
+            start = time.perf_counter()
             analysis_results = self.heuristic_analyzer(processed_features)
+            self._analysis_seconds.observe(time.perf_counter() - start)
 
             return {
                 "success": True,
                 "project_id": processed_features["project_id"],
                 "user_id": processed_features["user_id"],
                 "analysis": analysis_results,
+                "degradations": processed_features["degradations"],
             }
 
+        except InputRejectedError as e:
+            return self._rejected(e)
+
         except Exception as e:
             logger.error(f"Error in metrics processing: {str(e)}", exc_info=True)
             return {"success": False, "error": str(e), "stage": "processing"}
+
+    def batch(
+        self, raw_data_list: List[Dict[str, Any]], deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Process several raw metrics payloads, scoring them in one pass.
+
+        Each payload is preprocessed on its own, then all of them are scored
+        together by the columnar analyzer. Results are the same as calling the
+        processor on each payload.
+
+        Args:
+            raw_data_list: Raw metrics data of each session
+            deadline: `time.monotonic()` time by which the results are needed
+
+        Returns:
+            Results in the order of the payloads
+        """
+        start = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(raw_data_list)
+        processed: Dict[int, Dict[str, Any]] = {}
+        for index, raw_data in enumerate(raw_data_list):
+            try:
+                processed_features = self.preprocessor(raw_data, deadline=deadline)
+            except InputRejectedError as e:
+                results[index] = self._rejected(e)
+                continue
+            except Exception as e:
+                logger.error(f"Error in metrics processing: {str(e)}", exc_info=True)
+                results[index] = {
+                    "success": False,
+                    "error": str(e),
+                    "stage": "processing",
+                }
+                continue
+
+            if processed_features is None:
+                logger.error("Preprocessing failed")
+                results[index] = {
+                    "success": False,
+                    "error": "Preprocessing failed",
+                    "stage": "preprocessing",
+                }
+            else:
+                processed[index] = processed_features
+
+        try:
+            analyses = self.columnar_analyzer.analyze_rows(list(processed.values()))
+        except Exception as e:
+            # Fall back to scoring one session at a time to isolate the failure
+            logger.warning(f"Batch analysis failed, scoring one by one: {str(e)}")
+            analyses = [None] * len(processed)
+
+        for (index, processed_features), analysis_results in zip(
+            processed.items(), analyses
+        ):
+            try:
+                if analysis_results is None:
+                    analysis_results = self.heuristic_analyzer(processed_features)
+                results[index] = {
+                    "success": True,
+                    "project_id": processed_features["project_id"],
+                    "user_id": processed_features["user_id"],
+                    "analysis": analysis_results,
+                    "degradations": processed_features["degradations"],
+                }
+            except Exception as e:
+                logger.error(f"Error in metrics processing: {str(e)}", exc_info=True)
+                results[index] = {
+                    "success": False,
+                    "error": str(e),
+                    "stage": "processing",
+                }
+
+        for result in results:
+            self._record(result)
+        self._batch_seconds.observe(time.perf_counter() - start)
+        return results
+
+    def _rejected(self, error: InputRejectedError) -> Dict[str, Any]:
+        """Build the result of an input rejected for its size."""
+        return {
+            "success": False,
+            "error": str(error),
+            "stage": "validation",
+            "rejection": error.to_dict(),
+        }
+
+    def _record(self, result: Dict[str, Any]) -> None:
+        """Record the outcome and verdict of a result in the pipeline metrics."""
+        if not result["success"]:
+            RESULTS.inc(outcome=result["stage"])
+            return
+
+        self._successes.inc()
+        analysis = result["analysis"]
+        if "error" not in analysis:
+            self._verdicts[analysis["is_bot"]].inc()
+            # Sessions decided by early exit have no final score
+            if analysis["score"] is not None:
+                SCORES.observe(analysis["score"])
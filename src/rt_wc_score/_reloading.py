@@ -0,0 +1,220 @@
+"""Metrics processing with configuration reloaded from a file."""
+
+import os
+import time
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ._main import MetricsProcessor
+from ._loader import config_fingerprint, load_config
+from .modules.preprocessing import TrajectoryIndex
+from .telemetry import PIPELINE_CACHE
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadingMetricsProcessor:
+    """Metrics processor that follows a configuration file.
+
+    The file is checked for changes at most every `check_interval` seconds, on
+    a background thread started by the call that finds the check due. On a
+    change the new configuration is loaded and the pipeline built for it on
+    that thread, then swapped in atomically: calls keep using the previous
+    pipeline until the new one is ready, so no call waits for a rebuild. Built
+    pipelines are cached by configuration fingerprint, so switching back to a
+    recent configuration does not rebuild anything. A file that fails to load
+    is logged and the current pipeline is kept. Replace the file atomically
+    (write a temporary file and rename it) so a half-written file is never
+    picked up.
+
+    The index of prior trajectories of the `replay` analysis is kept outside
+    the pipelines: pipelines with the same replay processing configuration
+    share it, so rebuilds and cache evictions keep the replay history.
+    """
+
+    def __init__(
+        self,
+        config_path: Union[str, Path],
+        check_interval: float = 1.0,
+        cache_size: int = 4,
+    ):
+        """Initialize the processor from a configuration file.
+
+        Args:
+            config_path: Path to the YAML or JSON configuration file
+            check_interval: Minimum seconds between checks of the file
+            cache_size: Number of built pipelines kept for reuse
+        """
+        self.config_path = Path(config_path)
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, MetricsProcessor]" = OrderedDict()
+        # Indexes live as long as a pipeline in use or in the cache holds them
+        self._replay_indexes: "weakref.WeakValueDictionary[str, TrajectoryIndex]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._file_signature = self._get_file_signature()
+        self._last_check = time.monotonic()
+
+        config = load_config(self.config_path)
+        fingerprint = config_fingerprint(config)
+        self._current: Tuple[str, MetricsProcessor] = (
+            fingerprint,
+            self._get_processor(fingerprint, config),
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the configuration currently in use."""
+        return self._current[0]
+
+    @property
+    def processor(self) -> MetricsProcessor:
+        """Pipeline currently in use."""
+        return self._current[1]
+
+    def __call__(
+        self, raw_data: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Process raw metrics data with the current pipeline.
+
+        Args:
+            raw_data: Raw metrics data
+            deadline: `time.monotonic()` time by which the result is needed
+
+        Returns:
+            Dictionary containing preprocessed features and analysis results
+        """
+        self._reload_if_due()
+
+        # Keep a reference so a concurrent swap does not affect this call
+        _, processor = self._current
+        return processor(raw_data, deadline=deadline)
+
+    def batch(
+        self, raw_data_list: List[Dict[str, Any]], deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Process several raw metrics payloads with the current pipeline.
+
+        Args:
+            raw_data_list: Raw metrics data of each session
+            deadline: `time.monotonic()` time by which the results are needed
+
+        Returns:
+            Results in the order of the payloads
+        """
+        self._reload_if_due()
+
+        _, processor = self._current
+        return processor.batch(raw_data_list, deadline=deadline)
+
+    def reload(self, force: bool = False) -> bool:
+        """Reload the configuration if the file has changed, on this thread.
+
+        Only one thread reloads at a time; others keep using the current
+        pipeline meanwhile.
+
+        Args:
+            force: Reload even if the file looks unchanged
+
+        Returns:
+            True if a different configuration was swapped in
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        try:
+            return self._reload(force)
+        finally:
+            self._lock.release()
+
+    def _reload_if_due(self) -> None:
+        """Start a background reload if the check is due and none is running."""
+        if time.monotonic() - self._last_check < self.check_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+
+        self._last_check = time.monotonic()
+        try:
+            threading.Thread(
+                target=self._background_reload, name="config-reload", daemon=True
+            ).start()
+        except Exception:
+            self._lock.release()
+            raise
+
+    def _background_reload(self) -> None:
+        """Reload on the background thread, releasing the lock taken for it."""
+        try:
+            self._reload(force=False)
+        except Exception as e:
+            logger.error(f"Error reloading configuration {self.config_path}: {str(e)}")
+        finally:
+            self._lock.release()
+
+    def _reload(self, force: bool) -> bool:
+        """Reload the configuration while holding the lock."""
+        self._last_check = time.monotonic()
+        signature = self._get_file_signature()
+        if not force and signature == self._file_signature:
+            return False
+        self._file_signature = signature
+
+        try:
+            config = load_config(self.config_path)
+        except Exception as e:
+            logger.error(
+                f"Error loading configuration {self.config_path}, keeping "
+                f"{self.fingerprint[:12]}: {str(e)}"
+            )
+            return False
+
+        fingerprint = config_fingerprint(config)
+        if fingerprint == self.fingerprint:
+            return False
+
+        self._current = (fingerprint, self._get_processor(fingerprint, config))
+        logger.info(f"Switched to configuration {fingerprint[:12]}")
+        return True
+
+    def _get_processor(self, fingerprint: str, config: Any) -> MetricsProcessor:
+        """Get the cached pipeline for a configuration or build it."""
+        processor = self._cache.get(fingerprint)
+        if processor is None:
+            PIPELINE_CACHE.inc(result="miss")
+            processor = MetricsProcessor(
+                config=config, replay_index=self._get_replay_index(config)
+            )
+            self._cache[fingerprint] = processor
+        else:
+            PIPELINE_CACHE.inc(result="hit")
+        self._cache.move_to_end(fingerprint)
+
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return processor
+
+    def _get_replay_index(self, config: Any) -> TrajectoryIndex:
+        """Get the shared replay index for a configuration or create it."""
+        processing = config.preprocessor.feature_engineer.replay.processing
+        key = config_fingerprint(processing)
+        index = self._replay_indexes.get(key)
+        if index is None:
+            index = TrajectoryIndex(config=processing)
+            self._replay_indexes[key] = index
+        return index
+
+    def _get_file_signature(self) -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of the configuration file."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,50 @@
+"""Helpers shared across the package."""
+
+import math
+from typing import Any
+
+import numpy as np
+
+
+def json_default(value: Any) -> Any:
+    """Convert numpy scalars and arrays for JSON encoding.
+
+    Example:
+        json.dumps(features, default=json_default)
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_compatible(value: Any) -> Any:
+    """Convert a value to plain JSON types, with non-finite numbers as None.
+
+    Strict JSON has no NaN or infinity, which `json.dumps` would otherwise
+    emit as bare `NaN` and `Infinity` tokens.
+
+    Example:
+        json.dumps(json_compatible(result), allow_nan=False)
+    """
+    if isinstance(value, dict):
+        return {key: json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_compatible(item) for item in value]
+    if hasattr(value, "tolist"):
+        return json_compatible(value.tolist())
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def group_ranks(counts: np.ndarray) -> np.ndarray:
+    """Position of each element within its group, for consecutive groups.
+
+    Args:
+        counts: Number of elements of each group
+
+    Returns:
+        Array of `counts.sum()` positions, from 0 in each group
+    """
+    starts = np.cumsum(counts) - counts
+    return np.arange(int(counts.sum())) - np.repeat(starts, counts)
@@ -0,0 +1,6 @@
+from .config import ColumnarConfig
+from ._columns import from_record_columns, to_record_columns
+from ._corpus import CORPUS_KIND, CorpusWriter, SessionCorpus, user_id_hashes
+from ._main import RESULTS_KIND, ColumnarRescorer
+from ._sessions import SESSIONS_KIND, SessionBatch
+from ._storage import STORAGE_VERSION, parquet_available, read_tables, write_tables
@@ -0,0 +1,97 @@
+"""Convert and rescore columnar sessions: `python -m rt_wc_score.columnar`."""
+
+import sys
+import json
+import logging
+import argparse
+from itertools import islice
+from typing import Iterator, Optional
+
+from .._loader import load_config
+from ._corpus import CorpusWriter, SessionCorpus
+from ._main import ColumnarRescorer
+from ._sessions import SessionBatch
+from .config import ColumnarConfig
+
+
+def _read_payloads(path: str, limit: Optional[int]) -> Iterator[str]:
+    """Stream the non-empty lines of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        yield from islice((line for line in f if line.strip()), limit)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="rt_wc_score columnar batch I/O")
+    parser.add_argument(
+        "--format", choices=["auto", "parquet", "npz"], default=ColumnarConfig().format
+    )
+    parser.add_argument(
+        "--no-compress", dest="compress", action="store_false", help="Store raw"
+    )
+    parser.add_argument(
+        "--precision",
+        choices=["float64", "int32", "float32"],
+        default=ColumnarConfig().trace_precision,
+        help="Storage of the movement traces written by `convert` and `corpus`",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="Convert JSONL payloads to columns")
+    convert.add_argument("corpus", help="JSONL payloads")
+    convert.add_argument("output", help="Parquet directory or .npz archive")
+    convert.add_argument("--limit", type=int, default=None, help="Payloads to read")
+
+    corpus = commands.add_parser(
+        "corpus", help="Write JSONL payloads into a memory-mapped corpus"
+    )
+    corpus.add_argument("corpus", help="JSONL payloads")
+    corpus.add_argument("output", help="Corpus directory")
+    corpus.add_argument("--limit", type=int, default=None, help="Payloads to read")
+    corpus.add_argument("--shard-size", type=int, default=ColumnarConfig().shard_size)
+
+    rescore = commands.add_parser("rescore", help="Score columnar sessions")
+    rescore.add_argument("sessions", help="Output of `convert` or `corpus`")
+    rescore.add_argument(
+        "output",
+        help="Parquet directory or .npz archive; a directory of them for a corpus",
+    )
+    rescore.add_argument("--config", dest="config_path", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    # Per-session pipeline logs would drown the summary
+    logging.getLogger("rt_wc_score.modules").setLevel(logging.WARNING)
+
+    config = ColumnarConfig(
+        format=args.format,
+        compress=args.compress,
+        trace_precision=args.precision,
+        shard_size=getattr(args, "shard_size", ColumnarConfig().shard_size),
+    )
+    if args.command == "convert":
+        batch = SessionBatch.from_payloads(
+            _read_payloads(args.corpus, args.limit), config=config
+        )
+        summary = {"sessions": len(batch), "format": batch.write(args.output, config)}
+    elif args.command == "corpus":
+        with CorpusWriter(args.output, config=config) as writer:
+            writer.extend(_read_payloads(args.corpus, args.limit))
+        corpus = SessionCorpus(args.output)
+        summary = {"sessions": len(corpus), "shards": len(corpus.shard_names)}
+    else:
+        pipeline_config = load_config(args.config_path) if args.config_path else None
+        rescorer = ColumnarRescorer(pipeline_config, config)
+        if SessionCorpus.is_corpus(args.sessions):
+            summary = rescorer.rescore_corpus(args.sessions, args.output)
+        else:
+            summary = rescorer.rescore(args.sessions, args.output)
+    json.dump(summary, sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Conversion between lists of records and typed columns."""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .._utils import json_default
+
+# Suffix of the column marking which rows hold a value
+VALID_SUFFIX = ":valid"
+# Suffix of columns holding JSON text, for values of no single scalar type
+JSON_SUFFIX = ":json"
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def to_record_columns(
+    records: Sequence[Optional[Dict[str, Any]]],
+) -> Dict[str, np.ndarray]:
+    """Convert records into one column per key.
+
+    A key whose values are all booleans, integers, numbers or strings gets a
+    bool, int64, float64 or string column. Other keys get a `{key}:json`
+    column of JSON text. Keys missing or None in some records also get a
+    `{key}:valid` column, with a filler value in the other column.
+
+    Args:
+        records: Dictionaries; None and other non-dictionaries count as empty
+
+    Returns:
+        Columns by name, one row per record
+    """
+    records = [record if isinstance(record, dict) else {} for record in records]
+    keys = dict.fromkeys(key for record in records for key in record)
+
+    columns: Dict[str, np.ndarray] = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        valid = np.fromiter(
+            (value is not None for value in values), dtype=bool, count=len(values)
+        )
+        present = [value for value in values if value is not None]
+        if not present:
+            continue
+
+        kinds = {_kind(value) for value in present}
+        if kinds == {"int", "float"}:
+            kind = "float"
+        else:
+            kind = kinds.pop() if len(kinds) == 1 else "json"
+
+        name = key
+        if kind == "bool":
+            column = np.array([bool(v) if v is not None else False for v in values])
+        elif kind == "int":
+            column = np.array([v if v is not None else 0 for v in values], np.int64)
+        elif kind == "float":
+            column = np.array(
+                [v if v is not None else np.nan for v in values], np.float64
+            )
+        elif kind == "str":
+            column = np.array([v if v is not None else "" for v in values], dtype=str)
+        else:
+            name = f"{key}{JSON_SUFFIX}"
+            column = np.array(
+                [json.dumps(v, default=json_default) for v in values], dtype=str
+            )
+
+        columns[name] = column
+        if not valid.all():
+            columns[f"{key}{VALID_SUFFIX}"] = valid
+    return columns
+
+
+def from_record_columns(
+    columns: Dict[str, np.ndarray], start: int = 0, stop: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Convert columns back into records, inverting `to_record_columns`.
+
+    Args:
+        columns: Columns by name
+        start: First row to convert
+        stop: Row after the last one to convert; all rows if None
+
+    Returns:
+        One dictionary per row, without the keys missing from it
+    """
+    if stop is None:
+        stop = min((len(column) for column in columns.values()), default=start)
+    records: List[Dict[str, Any]] = [{} for _ in range(stop - start)]
+
+    for name, column in columns.items():
+        if name.endswith(VALID_SUFFIX):
+            continue
+        values = column[start:stop].tolist()
+        key = name
+        if name.endswith(JSON_SUFFIX):
+            key = name[: -len(JSON_SUFFIX)]
+            values = [json.loads(value) for value in values]
+
+        valid = columns.get(f"{key}{VALID_SUFFIX}")
+        if valid is None:
+            for record, value in zip(records, values):
+                record[key] = value
+        else:
+            for record, value, has_value in zip(
+                records, values, valid[start:stop].tolist()
+            ):
+                if has_value:
+                    record[key] = value
+    return records
+
+
+def _kind(value: Any) -> str:
+    """Get the column kind of a value."""
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, (int, np.integer)):
+        return "int" if _INT64_MIN <= value <= _INT64_MAX else "json"
+    if isinstance(value, (float, np.floating)):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    return "json"
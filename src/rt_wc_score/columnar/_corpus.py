@@ -0,0 +1,333 @@
+"""Sharded on-disk session corpus read through memory maps."""
+
+import json
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..modules.preprocessing.feature_engineer._base import MovementTrace
+from ..modules.preprocessing.json_flattener.config import JsonDataFlattenerConfigPM
+from ._columns import from_record_columns
+from ._sessions import _OFFSETS_TABLE, _SESSIONS_TABLE, SESSIONS_KIND, SessionBatch
+from ._storage import STORAGE_VERSION, read_tables, write_tables
+from .config import ColumnarConfig
+
+logger = logging.getLogger(__name__)
+
+# Kind of directories holding a corpus, checked when opening them
+CORPUS_KIND = "corpus"
+
+_META_FILE = "meta.json"
+_TABLES_FILE = "tables.npz"
+_INDEX_DIRECTORY = "index"
+
+
+class CorpusWriter:
+    """Writes sessions into a corpus read by `SessionCorpus`.
+
+    Sessions are buffered and written `shard_size` at a time, each shard as a
+    directory holding:
+
+        {trace field}.x.npy, .y.npy, .t.npy: Movements of all the shard's
+            sessions concatenated, sorted by time within each session
+        {trace field}.offsets.npy: Start of each session's movements and the
+            end of the last one
+        tables.npz: The other tables of the shard's `SessionBatch`: scalar
+            fields such as `user_id`, other event lists and their offsets
+
+    Closing the writer adds an index of every `user_id`, sorted by a 64-bit
+    hash, and `meta.json`, without which the corpus cannot be opened.
+
+    Example:
+        with CorpusWriter("corpus") as writer:
+            writer.extend(load_corpus("sessions.jsonl"))
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        config: Optional[ColumnarConfig] = None,
+        field_mapping: Optional[Dict[str, List[str]]] = None,
+    ):
+        """Initialize the writer.
+
+        Args:
+            path: Directory of the corpus, created if needed
+            config: Configuration of the shard size and trace fields
+            field_mapping: Path of each field in the payload; the flattener's
+                default if None
+
+        Raises:
+            ValueError: If the directory already holds a corpus
+        """
+        self.path = Path(path)
+        self.config = config or ColumnarConfig()
+        self.field_mapping = field_mapping or JsonDataFlattenerConfigPM().field_mapping
+        if (self.path / _META_FILE).exists():
+            raise ValueError(f"{self.path} already holds a corpus")
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._pending: List[Union[str, bytes, Dict[str, Any]]] = []
+        self._shards: List[Dict[str, Any]] = []
+        self._trace_fields: List[str] = []
+        # Hash, shard and row of each session with a `user_id`
+        self._index: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._closed = False
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        # An interrupted corpus is left without metadata, so it cannot be opened
+        if exc_type is None:
+            self.close()
+
+    def add(self, payload: Union[str, bytes, Dict[str, Any]]) -> None:
+        """Add a payload as JSON text, binary payload or dictionary."""
+        if self._closed:
+            raise ValueError("The corpus writer is closed")
+        self._pending.append(payload)
+        if len(self._pending) >= self.config.shard_size:
+            self.flush()
+
+    def extend(self, payloads: Iterable[Union[str, bytes, Dict[str, Any]]]) -> None:
+        """Add several payloads."""
+        for payload in payloads:
+            self.add(payload)
+
+    def flush(self) -> None:
+        """Write the buffered payloads as a shard."""
+        if not self._pending:
+            return
+
+        batch = SessionBatch.from_payloads(
+            self._pending, config=self.config, field_mapping=self.field_mapping
+        )
+        self._pending = []
+        name = f"shard-{len(self._shards):06d}"
+        directory = self.path / name
+        directory.mkdir(exist_ok=True)
+
+        tables = dict(batch.tables)
+        offsets = dict(tables.pop(_OFFSETS_TABLE))
+        for field in batch.trace_fields:
+            for axis, values in tables.pop(field).items():
+                np.save(directory / f"{field}.{axis}.npy", values)
+            np.save(directory / f"{field}.offsets.npy", offsets.pop(field))
+        tables[_OFFSETS_TABLE] = offsets
+        write_tables(
+            directory / _TABLES_FILE,
+            tables,
+            {"kind": SESSIONS_KIND},
+            format="npz",
+            compress=self.config.compress,
+        )
+
+        ids = [
+            session.get("user_id")
+            for session in from_record_columns(
+                batch.tables[_SESSIONS_TABLE], 0, len(batch)
+            )
+        ]
+        rows = [row for row, user_id in enumerate(ids) if user_id is not None]
+        self._index.append(
+            (
+                user_id_hashes(ids[row] for row in rows),
+                np.full(len(rows), len(self._shards), dtype=np.int32),
+                np.array(rows, dtype=np.int32),
+            )
+        )
+        self._trace_fields = batch.trace_fields
+        self._shards.append({"name": name, "sessions": len(batch)})
+        logger.info(f"Wrote {name} with {len(batch)} sessions")
+
+    def close(self) -> None:
+        """Write the remaining payloads, the `user_id` index and the metadata."""
+        if self._closed:
+            return
+        self.flush()
+        self._write_index()
+
+        meta = {
+            "kind": CORPUS_KIND,
+            "version": STORAGE_VERSION,
+            "field_mapping": self.field_mapping,
+            "trace_fields": self._trace_fields,
+            "shards": self._shards,
+            "sessions": sum(shard["sessions"] for shard in self._shards),
+        }
+        (self.path / _META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+        self._closed = True
+
+    def _write_index(self) -> None:
+        """Write the `user_id` hashes of all shards, sorted, with their locations."""
+        hashes, shards, rows = (
+            np.concatenate(
+                [np.empty(0, dtype=dtype)] + [part[i] for part in self._index]
+            )
+            for i, dtype in enumerate((np.uint64, np.int32, np.int32))
+        )
+        order = np.argsort(hashes, kind="stable")
+        directory = self.path / _INDEX_DIRECTORY
+        directory.mkdir(exist_ok=True)
+        np.save(directory / "hashes.npy", hashes[order])
+        np.save(directory / "shards.npy", shards[order])
+        np.save(directory / "rows.npy", rows[order])
+
+
+class SessionCorpus:
+    """Corpus written by `CorpusWriter`, with movements read through memory maps.
+
+    Shards are opened with their movement arrays memory-mapped, so payloads
+    hold `MovementTrace` views into the files and feature engineering reads
+    them without copying; only the pages touched are loaded. Iterating streams
+    the sessions shard by shard, and `find` looks sessions up by `user_id`
+    through the hash index.
+
+    Example:
+        corpus = SessionCorpus("corpus")
+        for batch in corpus.shards():
+            rescorer.score(batch)
+        sessions = corpus.find("user-42")
+    """
+
+    def __init__(self, path: Union[str, Path], config: Optional[ColumnarConfig] = None):
+        """Open a corpus.
+
+        Args:
+            path: Directory of the corpus
+            config: Configuration of the number of shards kept open
+
+        Raises:
+            ValueError: If the directory does not hold a complete corpus
+        """
+        self.path = Path(path)
+        self.config = config or ColumnarConfig()
+        if not self.is_corpus(self.path):
+            raise ValueError(f"{self.path} does not hold a complete corpus")
+
+        meta = json.loads((self.path / _META_FILE).read_text(encoding="utf-8"))
+        if meta["version"] > STORAGE_VERSION:
+            raise ValueError(f"Unsupported storage version {meta['version']}")
+        self.field_mapping: Dict[str, List[str]] = meta["field_mapping"]
+        self.trace_fields: List[str] = meta["trace_fields"]
+        self.shard_names: List[str] = [shard["name"] for shard in meta["shards"]]
+
+        sizes = [shard["sessions"] for shard in meta["shards"]]
+        self._starts = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        self._index: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._cached_shard = lru_cache(maxsize=self.config.cache_shards)(
+            self._load_shard
+        )
+
+    @staticmethod
+    def is_corpus(path: Union[str, Path]) -> bool:
+        """Check whether a path holds a complete corpus."""
+        meta_path = Path(path) / _META_FILE
+        if not meta_path.is_file():
+            return False
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return meta.get("kind") == CORPUS_KIND
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.shards():
+            yield from batch
+
+    def shard(self, index: int) -> SessionBatch:
+        """Open a shard, keeping the last `cache_shards` used ones open.
+
+        Args:
+            index: Position of the shard
+
+        Returns:
+            Sessions of the shard
+        """
+        return self._cached_shard(index)
+
+    def shards(self) -> Iterator[SessionBatch]:
+        """Open the shards one after the other, without keeping them open."""
+        for index in range(len(self.shard_names)):
+            yield self._load_shard(index)
+
+    def session(self, index: int) -> Dict[str, Any]:
+        """Get the payload of a session by its position in the corpus."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Session {index} out of range")
+        shard = int(np.searchsorted(self._starts, index, side="right")) - 1
+        return self.shard(shard).payload(index - int(self._starts[shard]))
+
+    def find(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get the payloads of the sessions of a user.
+
+        Args:
+            user_id: User ID of the sessions
+
+        Returns:
+            Payloads in corpus order, empty if the user has no sessions
+        """
+        hashes, shards, rows = self._load_index()
+        key = user_id_hashes([user_id])[0]
+        start = np.searchsorted(hashes, key, side="left")
+        stop = np.searchsorted(hashes, key, side="right")
+
+        payloads = []
+        # Rows sharing the hash of another user are filtered out
+        for shard, row in sorted(
+            zip(shards[start:stop].tolist(), rows[start:stop].tolist())
+        ):
+            payload = self.shard(shard).payload(row)
+            if payload.get("user_id") == user_id:
+                payloads.append(payload)
+        return payloads
+
+    def _load_shard(self, index: int) -> SessionBatch:
+        """Open a shard with its movement arrays memory-mapped."""
+        directory = self.path / self.shard_names[index]
+        tables, _ = read_tables(directory / _TABLES_FILE)
+        for field in self.trace_fields:
+            tables[_OFFSETS_TABLE][field] = np.load(
+                directory / f"{field}.offsets.npy", mmap_mode="r"
+            )
+            tables[field] = {
+                axis: np.load(directory / f"{field}.{axis}.npy", mmap_mode="r")
+                for axis in MovementTrace._fields
+            }
+        return SessionBatch(tables, self.field_mapping, self.trace_fields)
+
+    def _load_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Memory-map the `user_id` index on first use."""
+        if self._index is None:
+            directory = self.path / _INDEX_DIRECTORY
+            self._index = tuple(
+                np.load(directory / f"{name}.npy", mmap_mode="r")
+                for name in ("hashes", "shards", "rows")
+            )
+        return self._index
+
+
+def user_id_hashes(user_ids: Iterable[Any]) -> np.ndarray:
+    """Hash user IDs to the 64-bit keys of the corpus index.
+
+    Args:
+        user_ids: User IDs, converted to strings
+
+    Returns:
+        Keys as uint64
+    """
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(str(user_id).encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for user_id in user_ids
+        ),
+        dtype=np.uint64,
+    )
@@ -0,0 +1,224 @@
+"""Rescoring of columnar sessions into columnar features and analysis."""
+
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from .._main import MetricsProcessor, MetricsProcessorConfig
+from ..modules.heuristics import to_feature_columns
+from ..modules.preprocessing import InputRejectedError
+from ._columns import to_record_columns
+from ._corpus import SessionCorpus
+from ._sessions import SessionBatch
+from ._storage import Tables, resolve_format, write_tables
+from .config import ColumnarConfig
+
+logger = logging.getLogger(__name__)
+
+# Kind of tables holding rescoring results, checked when reading them
+RESULTS_KIND = "results"
+
+# Entries of the preprocessor output that are not features
+_NON_FEATURES = ("user_id", "project_id", "degradations")
+
+
+class ColumnarRescorer:
+    """Scores stored sessions, writing features and analysis as columns.
+
+    Each session is preprocessed on its own from the flat arrays of a
+    `SessionBatch`, then all of them are scored in one pass by the columnar
+    analyzer, so no JSON is encoded or decoded. The output has three tables
+    with one row per session:
+
+        results: `user_id`, `project_id`, `success`, the failed `stage` and
+            `error` (empty on success) and the `degradations`
+        features: Engineered features as built by `to_feature_columns`
+        analysis: Result columns of `ColumnarHeuristicAnalyzer`, NaN (False
+            for flags, -1 for `is_bot`) for failed sessions
+
+    Example:
+        rescorer = ColumnarRescorer()
+        rescorer.rescore("sessions.npz", "results.npz")
+        features = read_tables("results.npz")[0]["features"]
+    """
+
+    def __init__(
+        self,
+        pipeline_config: Optional[MetricsProcessorConfig] = None,
+        config: Optional[ColumnarConfig] = None,
+    ):
+        """Initialize the rescorer.
+
+        Args:
+            pipeline_config: Configuration for the scoring pipeline
+            config: Configuration of the output format and compression
+        """
+        self.config = config or ColumnarConfig()
+        self.processor = MetricsProcessor(config=pipeline_config)
+
+    def score(self, batch: SessionBatch, deadline: Optional[float] = None) -> Tables:
+        """Score the sessions of a batch.
+
+        Args:
+            batch: Sessions to score
+            deadline: `time.monotonic()` time by which each session's features
+                are needed; None to always compute exact features
+
+        Returns:
+            `results`, `features` and `analysis` tables
+        """
+        statuses: List[Dict[str, Any]] = []
+        features: List[Dict[str, Any]] = []
+        for payload in batch:
+            status = {
+                "user_id": payload.get("user_id"),
+                "project_id": payload.get("project_id"),
+                "success": False,
+                "stage": "processing",
+                "error": "",
+                "degradations": [],
+            }
+            processed = None
+            try:
+                processed = self.processor.preprocessor(payload, deadline=deadline)
+                if processed is None:
+                    status.update(stage="preprocessing", error="Preprocessing failed")
+            except InputRejectedError as e:
+                status.update(stage="validation", error=str(e))
+            except Exception as e:
+                logger.error(f"Error in metrics processing: {str(e)}", exc_info=True)
+                status["error"] = str(e)
+
+            if processed is not None:
+                status.update(
+                    success=True, stage="", degradations=processed["degradations"]
+                )
+            statuses.append(status)
+            features.append(processed or {})
+
+        feature_columns = to_feature_columns(features, self._feature_names(features))
+        succeeded = np.array([status["success"] for status in statuses], dtype=bool)
+        analysis = self.processor.columnar_analyzer(
+            {name: column[succeeded] for name, column in feature_columns.items()}
+        )
+        return {
+            "results": to_record_columns(statuses),
+            "features": feature_columns,
+            "analysis": {
+                name: _scatter(column, succeeded) for name, column in analysis.items()
+            },
+        }
+
+    def rescore(
+        self,
+        source: Union[str, Path, SessionBatch],
+        destination: Union[str, Path],
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Score stored sessions and write the result tables.
+
+        Args:
+            source: Path of the sessions written by `SessionBatch.write`, or the
+                batch itself
+            destination: Destination directory (Parquet) or archive (`npz`)
+            deadline: Deadline of each session, see `score`
+
+        Returns:
+            Summary with the number of `sessions`, how many `succeeded`, the
+            `format` written and the scoring `seconds`
+        """
+        batch = (
+            source if isinstance(source, SessionBatch) else SessionBatch.read(source)
+        )
+        start = time.perf_counter()
+        tables = self.score(batch, deadline=deadline)
+        seconds = time.perf_counter() - start
+
+        format = write_tables(
+            destination,
+            tables,
+            {"kind": RESULTS_KIND},
+            format=self.config.format,
+            compress=self.config.compress,
+        )
+        return {
+            "sessions": len(batch),
+            "succeeded": int(tables["results"]["success"].sum()) if len(batch) else 0,
+            "format": format,
+            "seconds": seconds,
+        }
+
+    def rescore_corpus(
+        self,
+        corpus: Union[str, Path, SessionCorpus],
+        destination: Union[str, Path],
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Score a corpus shard by shard, writing the result tables of each.
+
+        Only one shard is open at a time, so corpora far larger than memory
+        can be rescored.
+
+        Args:
+            corpus: Corpus or its directory
+            destination: Directory receiving the results of each shard, named
+                after the shard (with `.npz` for the `npz` format)
+            deadline: Deadline of each session, see `score`
+
+        Returns:
+            Summary with the number of `shards`, `sessions` and how many
+            `succeeded`, the `format` written and the scoring `seconds`
+        """
+        if not isinstance(corpus, SessionCorpus):
+            corpus = SessionCorpus(corpus, config=self.config)
+        destination = Path(destination)
+        destination.mkdir(parents=True, exist_ok=True)
+        format = resolve_format(destination, self.config.format)
+
+        summary = {"shards": 0, "sessions": 0, "succeeded": 0, "seconds": 0.0}
+        for name, batch in zip(corpus.shard_names, corpus.shards()):
+            start = time.perf_counter()
+            tables = self.score(batch, deadline=deadline)
+            summary["seconds"] += time.perf_counter() - start
+
+            write_tables(
+                destination / (f"{name}.npz" if format == "npz" else name),
+                tables,
+                {"kind": RESULTS_KIND, "shard": name},
+                format=format,
+                compress=self.config.compress,
+            )
+            summary["shards"] += 1
+            summary["sessions"] += len(batch)
+            if len(batch):
+                summary["succeeded"] += int(tables["results"]["success"].sum())
+            logger.info(f"Rescored {name}: {len(batch)} sessions")
+        return {**summary, "format": format}
+
+    def _feature_names(self, features: List[Dict[str, Any]]) -> List[str]:
+        """Get the features to convert: those the analyzers read, then any other
+        scalar feature found, then the checkbox pairs."""
+        names = dict.fromkeys(
+            sorted(self.processor.heuristic_analyzer.required_features)
+        )
+        for session in features:
+            for name, value in session.items():
+                if name not in _NON_FEATURES and not isinstance(value, (list, dict)):
+                    names[name] = None
+        names.pop("checkbox", None)
+        return [*names, "checkbox"]
+
+
+def _scatter(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Spread the values of the masked rows over all rows, filling the others."""
+    if values.dtype == bool:
+        column = np.zeros(len(mask), dtype=bool)
+    elif np.issubdtype(values.dtype, np.integer):
+        column = np.full(len(mask), -1, dtype=values.dtype)
+    else:
+        column = np.full(len(mask), np.nan)
+    column[mask] = values
+    return column
@@ -0,0 +1,399 @@
+"""Sessions stored as columns, with the events of all sessions in flat arrays."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..modules.preprocessing import decode_payload, is_binary_payload
+from ..modules.preprocessing.feature_engineer._base import (
+    MovementTrace,
+    count_movements,
+    drop_null_events,
+    to_movement_trace,
+)
+from ..modules.preprocessing.json_flattener.config import JsonDataFlattenerConfigPM
+from ._columns import from_record_columns, to_record_columns
+from ._storage import Tables, _row_count, read_tables, write_tables
+from .config import ColumnarConfig
+
+# Kind of tables holding sessions, checked when reading them
+SESSIONS_KIND = "sessions"
+
+_SESSIONS_TABLE = "sessions"
+_OFFSETS_TABLE = "offsets"
+_ORIGINS_TABLE = "origins"
+_INVALID_TABLE = "invalid"
+_NULLS_TABLE = "nulls"
+
+
+class SessionBatch:
+    """Sessions stored as columns, ready to be scored without JSON.
+
+    Only the fields of the flattener's `field_mapping` are kept, in these
+    tables:
+
+        sessions: One row per session with the scalar fields, e.g. `user_id`
+        offsets: One column per event field with one row per session and a
+            last row; the events of session `i` are the rows `offsets[i]` to
+            `offsets[i + 1]` of the field's table
+        {trace field}: Columns `x`, `y` and `t` (seconds) of the movements,
+            sorted by time within each session
+        origins: With a compact `trace_precision`, one column per trace field
+            with the first timestamp of each session, in int64 microseconds
+            (`int32`) or seconds (`float32`); the `t` column then holds the
+            time since it in the same unit
+        invalid: If any session has movements without coordinates or a valid
+            timestamp, one column per trace field with their number in each
+            session; their values are not stored
+        nulls: Likewise, the number of null movements of each session, if any
+        {event field}: One column per event key (see `to_record_columns`)
+
+    `payload` hands out slices of the flat arrays without copying; only
+    relative timestamps are converted back to seconds per session. A session
+    with invalid or null movements gets a copy ending with one NaN row per invalid
+    movement, then one row per null movement (see `MovementTrace`), so the
+    feature processors count, reject or drop them as they do in a list of
+    events.
+
+    Example:
+        SessionBatch.from_payloads(load_corpus("corpus.jsonl")).write("s.npz")
+        for payload in SessionBatch.read("s.npz"):
+            processor(payload)
+    """
+
+    def __init__(
+        self,
+        tables: Tables,
+        field_mapping: Dict[str, List[str]],
+        trace_fields: Iterable[str],
+    ):
+        """Initialize the batch from its tables.
+
+        Args:
+            tables: Tables as described in the class documentation
+            field_mapping: Path of each field in the payload
+            trace_fields: Fields stored as movement traces
+        """
+        self.tables = tables
+        self.field_mapping = dict(field_mapping)
+        self.trace_fields = [name for name in trace_fields if name in tables]
+        self.event_fields = [
+            name for name in tables[_OFFSETS_TABLE] if name not in self.trace_fields
+        ]
+
+        self._offsets = tables[_OFFSETS_TABLE]
+        self._origins = tables.get(_ORIGINS_TABLE, {})
+        self._invalid = tables.get(_INVALID_TABLE, {})
+        self._nulls = tables.get(_NULLS_TABLE, {})
+        self._size = (
+            len(next(iter(self._offsets.values()))) - 1
+            if self._offsets
+            else _row_count(tables[_SESSIONS_TABLE])
+        )
+        self._scalars: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def from_payloads(
+        cls,
+        payloads: Iterable[Union[str, bytes, Dict[str, Any]]],
+        config: Optional[ColumnarConfig] = None,
+        field_mapping: Optional[Dict[str, List[str]]] = None,
+    ) -> "SessionBatch":
+        """Convert payloads into columns.
+
+        Args:
+            payloads: Payloads as JSON text, binary payloads or dictionaries
+            config: Configuration naming the trace fields and their precision
+            field_mapping: Path of each field in the payload; the flattener's
+                default if None
+
+        Returns:
+            Batch of the payloads, in order
+
+        Raises:
+            ValueError: If a payload cannot be decoded, has malformed movements
+                or movements out of range of the trace precision
+        """
+        config = config or ColumnarConfig()
+        if field_mapping is None:
+            field_mapping = JsonDataFlattenerConfigPM().field_mapping
+
+        rows: List[Dict[str, Any]] = []
+        for index, payload in enumerate(payloads):
+            try:
+                rows.append(_flatten(payload, field_mapping))
+            except Exception as e:
+                raise ValueError(f"Invalid payload {index}: {str(e)}") from e
+
+        trace_fields = [name for name in config.trace_fields if name in field_mapping]
+        event_fields = [
+            name
+            for name in field_mapping
+            if name not in trace_fields
+            and any(isinstance(row.get(name), list) for row in rows)
+        ]
+
+        tables: Tables = {
+            _SESSIONS_TABLE: to_record_columns(
+                [
+                    {
+                        name: value
+                        for name, value in row.items()
+                        if name not in trace_fields and name not in event_fields
+                    }
+                    for row in rows
+                ]
+            ),
+            _OFFSETS_TABLE: {},
+        }
+        for name in trace_fields:
+            events = [_events(row.get(name)) for row in rows]
+            try:
+                traces = [to_movement_trace(e) for e in events]
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid {name}: {str(e)}") from e
+            tables[_OFFSETS_TABLE][name] = _offsets(len(trace.t) for trace in traces)
+            nulls = np.fromiter(
+                (_null_count(e) for e in events), dtype=np.int64, count=len(events)
+            )
+            invalid = np.fromiter(
+                (count_movements(e) - len(trace.t) for e, trace in zip(events, traces)),
+                dtype=np.int64,
+                count=len(traces),
+            )
+            invalid -= nulls
+            if invalid.any():
+                tables.setdefault(_INVALID_TABLE, {})[name] = invalid
+            if nulls.any():
+                tables.setdefault(_NULLS_TABLE, {})[name] = nulls
+            columns = {
+                axis: np.concatenate(
+                    [np.empty(0)] + [getattr(trace, axis) for trace in traces]
+                ).astype(np.float64, copy=False)
+                for axis in MovementTrace._fields
+            }
+            if config.trace_precision != "float64":
+                origins = np.array(
+                    [trace.t[0] if len(trace.t) else 0.0 for trace in traces]
+                )
+                lengths = np.diff(tables[_OFFSETS_TABLE][name])
+                try:
+                    columns, origins = _compact_trace(
+                        columns, origins, lengths, config.trace_precision
+                    )
+                except ValueError as e:
+                    raise ValueError(f"Invalid {name}: {str(e)}") from e
+                tables.setdefault(_ORIGINS_TABLE, {})[name] = origins
+            tables[name] = columns
+        for name in event_fields:
+            events = [_events(row.get(name)) for row in rows]
+            tables[_OFFSETS_TABLE][name] = _offsets(len(e) for e in events)
+            tables[name] = to_record_columns(
+                [event for session_events in events for event in session_events]
+            )
+
+        return cls(tables, field_mapping, trace_fields)
+
+    @classmethod
+    def read(cls, path: Union[str, Path]) -> "SessionBatch":
+        """Read sessions written by `write`.
+
+        Args:
+            path: Parquet directory or `npz` archive
+
+        Returns:
+            Stored batch
+
+        Raises:
+            ValueError: If the path does not hold sessions
+        """
+        tables, meta = read_tables(path)
+        if meta.get("kind") != SESSIONS_KIND:
+            raise ValueError(f"{path} does not hold sessions")
+        return cls(tables, meta["field_mapping"], meta["trace_fields"])
+
+    def write(
+        self, path: Union[str, Path], config: Optional[ColumnarConfig] = None
+    ) -> str:
+        """Write the sessions.
+
+        Args:
+            path: Destination directory (Parquet) or archive (`npz`)
+            config: Configuration of the format and compression
+
+        Returns:
+            Format written, `parquet` or `npz`
+        """
+        config = config or ColumnarConfig()
+        meta = {
+            "kind": SESSIONS_KIND,
+            "field_mapping": self.field_mapping,
+            "trace_fields": self.trace_fields,
+        }
+        return write_tables(
+            path, self.tables, meta, format=config.format, compress=config.compress
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.payload(index)
+
+    def payload(self, index: int) -> Dict[str, Any]:
+        """Rebuild the payload of a session.
+
+        Args:
+            index: Position of the session
+
+        Returns:
+            Payload in the `InputData` layout, with a `MovementTrace` for each
+            trace field
+        """
+        if self._scalars is None:
+            self._scalars = from_record_columns(
+                self.tables[_SESSIONS_TABLE], 0, len(self)
+            )
+
+        payload: Dict[str, Any] = {}
+        for name, value in self._scalars[index].items():
+            _set_path(payload, self.field_mapping[name], value)
+        for name in self.trace_fields:
+            start, stop = self._offsets[name][index : index + 2].tolist()
+            columns = self.tables[name]
+            t = columns["t"][start:stop]
+            if name in self._origins:
+                t = _absolute_times(t, self._origins[name][index])
+            trace = MovementTrace(
+                x=columns["x"][start:stop], y=columns["y"][start:stop], t=t
+            )
+            invalid = int(self._invalid[name][index]) if name in self._invalid else 0
+            nulls = int(self._nulls[name][index]) if name in self._nulls else 0
+            if invalid or nulls:
+                trace = _with_invalid_events(trace, invalid, nulls)
+            _set_path(payload, self.field_mapping[name], trace)
+        for name in self.event_fields:
+            start, stop = self._offsets[name][index : index + 2].tolist()
+            events = from_record_columns(self.tables[name], start, stop)
+            _set_path(payload, self.field_mapping[name], events)
+        return payload
+
+
+def _compact_trace(
+    columns: Dict[str, np.ndarray],
+    origins: np.ndarray,
+    lengths: np.ndarray,
+    precision: str,
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Convert float64 trace columns to a compact precision.
+
+    With `int32`, timestamps are counted in whole microseconds from an int64
+    origin, so millisecond or microsecond timestamps are restored exactly.
+
+    Args:
+        columns: Columns `x`, `y` and `t` (seconds)
+        origins: First timestamp of each session
+        lengths: Number of movements of each session
+        precision: `int32` or `float32`
+
+    Returns:
+        Columns with coordinates and relative timestamps in the precision, and
+        the origins in the unit of the relative timestamps
+
+    Raises:
+        ValueError: If `int32` coordinates or relative timestamps overflow
+    """
+    if precision == "float32":
+        relative = columns["t"] - np.repeat(origins, lengths)
+        compact = {
+            "x": columns["x"].astype(np.float32),
+            "y": columns["y"].astype(np.float32),
+            "t": relative.astype(np.float32),
+        }
+        return compact, origins
+
+    origins = np.rint(origins * 1e6).astype(np.int64)
+    relative = np.rint(columns["t"] * 1e6).astype(np.int64)
+    relative -= np.repeat(origins, lengths)
+    limit = np.iinfo(np.int32).max
+    compact = {}
+    for axis, values in (
+        ("x", np.rint(columns["x"])),
+        ("y", np.rint(columns["y"])),
+        ("t", relative),
+    ):
+        if values.size and np.abs(values).max() > limit:
+            raise ValueError(f"{axis} out of range of int32 trace storage")
+        compact[axis] = values.astype(np.int32)
+    return compact, origins
+
+
+def _absolute_times(relative: np.ndarray, origin: Any) -> np.ndarray:
+    """Get the timestamps in seconds of a compact trace from its origin."""
+    if relative.dtype == np.int32:
+        return (origin + relative.astype(np.int64)) / 1e6
+    return origin + relative.astype(np.float64)
+
+
+def _with_invalid_events(
+    trace: MovementTrace, invalid: int, nulls: int = 0
+) -> MovementTrace:
+    """Copy a trace as float64 with the rows of `invalid` and `nulls` events
+    appended, as described in `MovementTrace`."""
+    coordinates = np.concatenate((np.full(invalid, np.nan), np.full(nulls, np.inf)))
+    return MovementTrace(
+        x=np.concatenate((trace.x.astype(np.float64, copy=False), coordinates)),
+        y=np.concatenate((trace.y.astype(np.float64, copy=False), coordinates)),
+        t=np.concatenate(
+            (trace.t.astype(np.float64, copy=False), np.full(invalid + nulls, np.nan))
+        ),
+    )
+
+
+def _flatten(
+    payload: Union[str, bytes, Dict[str, Any]], field_mapping: Dict[str, List[str]]
+) -> Dict[str, Any]:
+    """Decode a payload and get the value of each field, if present."""
+    if is_binary_payload(payload):
+        payload = decode_payload(payload)
+    elif isinstance(payload, (str, bytes, bytearray)):
+        payload = json.loads(payload)
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be an object")
+
+    row = {}
+    for name, path in field_mapping.items():
+        value = payload
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None:
+            row[name] = value
+    return row
+
+
+def _events(value: Any) -> Any:
+    """Get the events of a field, treating anything but a list as no events."""
+    return value if isinstance(value, (list, MovementTrace)) else []
+
+
+def _null_count(events: Any) -> int:
+    """Get the number of null events of a trace field."""
+    if isinstance(events, MovementTrace):
+        return len(events.t) - len(drop_null_events(events).t)
+    return sum(event is None for event in events)
+
+
+def _offsets(counts: Iterable[int]) -> np.ndarray:
+    """Get the start of each group and the end of the last one."""
+    return np.concatenate([[0], np.cumsum(np.fromiter(counts, dtype=np.int64))])
+
+
+def _set_path(payload: Dict[str, Any], path: List[str], value: Any) -> None:
+    """Set a value in a nested payload, creating the parent objects."""
+    parent = payload
+    for key in path[:-1]:
+        parent = parent.setdefault(key, {})
+    parent[path[-1]] = value
@@ -0,0 +1,154 @@
+"""Storage of named column tables as Parquet files or a NumPy archive."""
+
+import json
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# Version of the storage layout, increased on incompatible changes
+STORAGE_VERSION = 1
+
+Tables = Dict[str, Dict[str, np.ndarray]]
+
+# Name of the metadata in an archive and in a Parquet directory
+_META_KEY = "__meta__"
+_META_FILE = "meta.json"
+
+
+def parquet_available() -> bool:
+    """Check whether pandas has a Parquet engine installed."""
+    return any(
+        importlib.util.find_spec(engine) is not None
+        for engine in ("pyarrow", "fastparquet")
+    )
+
+
+def resolve_format(path: Union[str, Path], format: str = "auto") -> str:
+    """Get the storage format used for a path.
+
+    Args:
+        path: Destination path
+        format: `parquet`, `npz` or `auto`
+
+    Returns:
+        `parquet` or `npz`
+
+    Raises:
+        ImportError: If Parquet is requested but pandas has no Parquet engine
+    """
+    if format == "auto":
+        if Path(path).suffix == ".npz" or not parquet_available():
+            return "npz"
+        return "parquet"
+    if format == "parquet" and not parquet_available():
+        raise ImportError("Parquet storage requires pyarrow or fastparquet")
+    return format
+
+
+def write_tables(
+    path: Union[str, Path],
+    tables: Tables,
+    meta: Optional[Dict[str, Any]] = None,
+    format: str = "auto",
+    compress: bool = True,
+) -> str:
+    """Write tables of equally long columns.
+
+    With Parquet, `path` is a directory holding one `{table}.parquet` file per
+    table and `meta.json`. With `npz`, it is a single archive holding the
+    column `c` of table `t` as `t/c`.
+
+    Args:
+        path: Destination directory or file
+        tables: Columns by name, by table name
+        meta: JSON-serializable metadata stored with the tables
+        format: `parquet`, `npz` or `auto` (see `resolve_format`)
+        compress: Whether to compress the columns
+
+    Returns:
+        Format written, `parquet` or `npz`
+    """
+    format = resolve_format(path, format)
+    meta = {
+        **(meta or {}),
+        "version": STORAGE_VERSION,
+        "tables": {name: list(columns) for name, columns in tables.items()},
+        "rows": {name: _row_count(columns) for name, columns in tables.items()},
+    }
+
+    if format == "npz":
+        arrays = {
+            f"{name}/{column}": np.asarray(values)
+            for name, columns in tables.items()
+            for column, values in columns.items()
+        }
+        arrays[_META_KEY] = np.array(json.dumps(meta))
+        # A file object keeps numpy from appending `.npz` to the path
+        with open(path, "wb") as f:
+            if compress:
+                np.savez_compressed(f, **arrays)
+            else:
+                np.savez(f, **arrays)
+        return format
+
+    import pandas as pd
+
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, columns in tables.items():
+        pd.DataFrame(columns).to_parquet(
+            directory / f"{name}.parquet",
+            index=False,
+            compression="snappy" if compress else None,
+        )
+    (directory / _META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+    return format
+
+
+def read_tables(path: Union[str, Path]) -> Tuple[Tables, Dict[str, Any]]:
+    """Read tables written by `write_tables`.
+
+    Args:
+        path: Parquet directory or `npz` archive
+
+    Returns:
+        Columns by name by table name, and the metadata
+
+    Raises:
+        ValueError: If the path holds no tables or a newer layout
+    """
+    path = Path(path)
+    tables: Tables = {}
+    if path.is_dir():
+        import pandas as pd
+
+        meta = json.loads((path / _META_FILE).read_text(encoding="utf-8"))
+        _check_version(meta)
+        for name, column_names in meta["tables"].items():
+            frame = pd.read_parquet(path / f"{name}.parquet")
+            tables[name] = {column: frame[column].to_numpy() for column in column_names}
+        return tables, meta
+
+    with np.load(path, allow_pickle=False) as archive:
+        if _META_KEY not in archive.files:
+            raise ValueError(f"{path} holds no column tables")
+        meta = json.loads(str(archive[_META_KEY]))
+        _check_version(meta)
+        for name, column_names in meta["tables"].items():
+            tables[name] = {
+                column: archive[f"{name}/{column}"] for column in column_names
+            }
+    return tables, meta
+
+
+def _check_version(meta: Dict[str, Any]) -> None:
+    """Reject layouts newer than this version understands."""
+    if meta.get("version", 0) > STORAGE_VERSION:
+        raise ValueError(f"Unsupported storage version {meta.get('version')}")
+
+
+def _row_count(columns: Dict[str, np.ndarray]) -> int:
+    """Get the number of rows of a table."""
+    return len(next(iter(columns.values()))) if columns else 0
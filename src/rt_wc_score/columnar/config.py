@@ -0,0 +1,50 @@
+"""Configuration for columnar session and result storage."""
+
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+
+class ColumnarConfig(BaseModel):
+    """Configuration for columnar session and result storage."""
+
+    format: Literal["auto", "parquet", "npz"] = Field(
+        default="auto",
+        description=(
+            "Storage format: a directory of Parquet files, a NumPy `.npz` "
+            "archive, or `auto` for `npz` when the path ends in `.npz` or pandas "
+            "has no Parquet engine, and Parquet otherwise"
+        ),
+    )
+    compress: bool = Field(default=True, description="Compress the stored columns")
+    trace_fields: List[str] = Field(
+        default=["mouse_movements"],
+        description=(
+            "Flattened fields stored as time-sorted x, y and t arrays and read "
+            "back as `MovementTrace`s"
+        ),
+    )
+    trace_precision: Literal["float64", "int32", "float32"] = Field(
+        default="float64",
+        description=(
+            "Storage of the traces: `float64` coordinates and timestamps; "
+            "`int32` coordinates rounded to whole pixels and microseconds since "
+            "the session's first movement; or `float32` coordinates and "
+            "seconds since the first movement. The compact ones halve the "
+            "bytes per movement"
+        ),
+    )
+    shard_size: int = Field(
+        default=10_000,
+        gt=0,
+        description="Sessions per shard of a memory-mapped corpus",
+    )
+    cache_shards: int = Field(
+        default=4,
+        ge=0,
+        description="Corpus shards kept open for random access by `user_id`",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
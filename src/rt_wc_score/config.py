@@ -1,5 +1,11 @@
 """Metrics processing package."""
 
 from ._main import MetricsProcessor, MetricsProcessorConfig
+from ._loader import load_config, config_fingerprint
 
-__all__ = ["MetricsProcessor", "MetricsProcessorConfig"]
+__all__ = [
+    "MetricsProcessor",
+    "MetricsProcessorConfig",
+    "load_config",
+    "config_fingerprint",
+]
@@ -0,0 +1,2 @@
+from .config import FeatureStoreConfig
+from ._main import SCHEMA_VERSION, FeatureStore, payload_hash
@@ -0,0 +1,341 @@
+"""SQLite store of engineered features, keyed by payload and configuration."""
+
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..__version__ import __version__
+from .._loader import config_fingerprint
+from .._utils import json_default
+from ..modules.heuristics import to_feature_columns
+from ..modules.preprocessing import InputRejectedError, Preprocessor
+from .config import FeatureStoreConfig
+
+logger = logging.getLogger(__name__)
+
+# Version of the database schema, increased on incompatible changes
+SCHEMA_VERSION = 1
+
+# Entries of the preprocessor output stored outside the feature document
+_KEY_FIELDS = ("user_id", "project_id", "degradations")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    fingerprint TEXT NOT NULL,
+    payload_hash TEXT NOT NULL,
+    project_id TEXT,
+    user_id TEXT,
+    features TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (fingerprint, payload_hash)
+);
+CREATE INDEX IF NOT EXISTS features_session
+    ON features (fingerprint, project_id, user_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class FeatureStore:
+    """Caches the output of `Preprocessor` in a local SQLite database.
+
+    Features are stored under the session's `project_id` and `user_id`, a
+    SHA-256 hash of the payload (see `payload_hash`) and a fingerprint of the
+    preprocessor configuration and package version. Changing the feature
+    configuration changes the fingerprint, so entries computed under another
+    configuration are never returned; `purge_stale` deletes them.
+
+    All features are engineered, not only those the current analyzers read,
+    and always exactly (without a deadline), so heuristic experiments can run
+    on the stored features without preprocessing again.
+
+    Example:
+        with FeatureStore("features.db") as store:
+            store.features_many(load_corpus("sessions.jsonl"))
+            results = ColumnarHeuristicAnalyzer(config)(store.load_columns())
+    """
+
+    def __init__(
+        self, path: Union[str, Path], config: Optional[FeatureStoreConfig] = None
+    ):
+        """Open or create the store.
+
+        Args:
+            path: SQLite database file, created if needed
+            config: Configuration of the preprocessing and the database
+
+        Raises:
+            ValueError: If the database was created with a newer schema
+        """
+        self.path = Path(path)
+        self.config = config or FeatureStoreConfig()
+        self.preprocessor = Preprocessor(config=self.config.preprocessor)
+        self.fingerprint = hashlib.sha256(
+            f"{__version__}:{config_fingerprint(self.config.preprocessor)}".encode()
+        ).hexdigest()
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, timeout=self.config.timeout, check_same_thread=False
+        )
+        if self.config.wal:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+        (version,) = self._connection.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+        if int(version) > SCHEMA_VERSION:
+            raise ValueError(f"Unsupported feature store schema {version}")
+
+    def __enter__(self) -> "FeatureStore":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of entries under the current configuration."""
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM features WHERE fingerprint = ?",
+                (self.fingerprint,),
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def get(
+        self, payload: Union[str, bytes, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Get the stored features of a payload.
+
+        Args:
+            payload: Payload as JSON text, binary payload or dictionary
+
+        Returns:
+            Features as returned by `Preprocessor`, or None if not stored
+        """
+        return self.get_many([payload])[0]
+
+    def get_many(
+        self, payloads: Sequence[Union[str, bytes, Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Get the stored features of several payloads.
+
+        Args:
+            payloads: Payloads as JSON text, binary payloads or dictionaries
+
+        Returns:
+            Features of each payload, None for those not stored
+        """
+        hashes = [payload_hash(payload) for payload in payloads]
+        found = self._select(hashes)
+        return [found.get(key) for key in hashes]
+
+    def features(
+        self, payload: Union[str, bytes, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Get the features of a payload, engineering and storing them if needed.
+
+        Args:
+            payload: Payload as JSON text, binary payload or dictionary
+
+        Returns:
+            Features as returned by `Preprocessor`, or None if preprocessing
+            fails or the input is rejected
+        """
+        return self.features_many([payload])[0]
+
+    def features_many(
+        self, payloads: Iterable[Union[str, bytes, Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Get the features of several payloads, engineering the missing ones.
+
+        Newly engineered features are stored in one transaction.
+
+        Args:
+            payloads: Payloads as JSON text, binary payloads or dictionaries
+
+        Returns:
+            Features of each payload, None where preprocessing fails or the
+            input is rejected
+        """
+        payloads = list(payloads)
+        hashes = [payload_hash(payload) for payload in payloads]
+        found = self._select(hashes)
+
+        rows = []
+        results: List[Optional[Dict[str, Any]]] = []
+        for payload, key in zip(payloads, hashes):
+            if key not in found:
+                features = self._engineer(payload)
+                if features is not None:
+                    rows.append(self._row(key, features))
+                found[key] = features
+            results.append(found[key])
+
+        if rows:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+        return results
+
+    def load(
+        self,
+        project_id: Optional[str] = None,
+        user_ids: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Load stored features under the current configuration.
+
+        Args:
+            project_id: Only load sessions of this project
+            user_ids: Only load sessions of these users
+
+        Returns:
+            Features of each stored session, in insertion order
+        """
+        query = (
+            "SELECT features, project_id, user_id FROM features WHERE fingerprint = ?"
+        )
+        parameters: List[Any] = [self.fingerprint]
+        if project_id is not None:
+            query += " AND project_id = ?"
+            parameters.append(project_id)
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            query += f" AND user_id IN ({', '.join('?' * len(user_ids))})"
+            parameters.extend(user_ids)
+
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY rowid", parameters)
+            return [_decode(*row) for row in rows.fetchall()]
+
+    def load_columns(
+        self,
+        project_id: Optional[str] = None,
+        user_ids: Optional[Iterable[str]] = None,
+        feature_names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Load stored features as columns for `ColumnarHeuristicAnalyzer`.
+
+        Args:
+            project_id: Only load sessions of this project
+            user_ids: Only load sessions of these users
+            feature_names: Features to convert; see `to_feature_columns`
+
+        Returns:
+            Feature columns as built by `to_feature_columns`, plus the
+            `project_id` and `user_id` of each row
+        """
+        features = self.load(project_id=project_id, user_ids=user_ids)
+        columns = to_feature_columns(features, feature_names)
+        columns["project_id"] = np.array(
+            [session["project_id"] for session in features], dtype=object
+        )
+        columns["user_id"] = np.array(
+            [session["user_id"] for session in features], dtype=object
+        )
+        return columns
+
+    def purge_stale(self) -> int:
+        """Delete the entries stored under other configurations.
+
+        Returns:
+            Number of deleted entries
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM features WHERE fingerprint != ?", (self.fingerprint,)
+            )
+        return cursor.rowcount
+
+    def _select(self, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the stored features of payload hashes, by hash."""
+        found = {}
+        with self._lock:
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start : start + 500]
+                rows = self._connection.execute(
+                    "SELECT payload_hash, features, project_id, user_id FROM features "
+                    f"WHERE fingerprint = ? AND payload_hash IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    [self.fingerprint, *chunk],
+                )
+                for key, document, project_id, user_id in rows:
+                    found[key] = _decode(document, project_id, user_id)
+        return found
+
+    def _engineer(
+        self, payload: Union[str, bytes, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Run the preprocessor on a payload, giving None on failure."""
+        try:
+            return self.preprocessor(payload)
+        except InputRejectedError as e:
+            logger.warning(f"Not storing features of rejected input: {str(e)}")
+            return None
+
+    def _row(self, key: str, features: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Build the database row of engineered features."""
+        document = {
+            name: value for name, value in features.items() if name not in _KEY_FIELDS
+        }
+        return (
+            self.fingerprint,
+            key,
+            features.get("project_id"),
+            features.get("user_id"),
+            json.dumps(document, default=json_default),
+            time.time(),
+        )
+
+
+def payload_hash(payload: Union[str, bytes, Dict[str, Any]]) -> str:
+    """Get the key of a payload in the store.
+
+    JSON text and binary payloads are hashed as they are; dictionaries are
+    hashed in their canonical JSON form, with arrays (e.g. of a
+    `MovementTrace`) as lists.
+
+    Args:
+        payload: Payload as JSON text, binary payload or dictionary
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    if isinstance(payload, str):
+        data = payload.encode("utf-8")
+    elif isinstance(payload, (bytes, bytearray, memoryview)):
+        data = bytes(payload)
+    else:
+        data = json.dumps(
+            payload, sort_keys=True, separators=(",", ":"), default=json_default
+        ).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _decode(
+    document: str, project_id: Optional[str], user_id: Optional[str]
+) -> Dict[str, Any]:
+    """Rebuild the preprocessor output of a stored row."""
+    features = json.loads(document)
+    features["user_id"] = user_id
+    features["project_id"] = project_id
+    features["degradations"] = []
+    return features
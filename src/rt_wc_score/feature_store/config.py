@@ -0,0 +1,27 @@
+"""Configuration for the engineered-feature store."""
+
+from pydantic import BaseModel, Field
+
+from ..modules.preprocessing import PreprocessorConfig
+
+
+class FeatureStoreConfig(BaseModel):
+    """Configuration for the engineered-feature store."""
+
+    preprocessor: PreprocessorConfig = Field(
+        default_factory=PreprocessorConfig,
+        description="Configuration of the preprocessing whose output is stored",
+    )
+    timeout: float = Field(
+        default=30.0,
+        ge=0,
+        description="Seconds to wait for another writer to release the database",
+    )
+    wal: bool = Field(
+        default=True,
+        description="Use write-ahead logging, letting readers run during writes",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
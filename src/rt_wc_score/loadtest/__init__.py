@@ -0,0 +1,2 @@
+from ._main import REPORT_VERSION, LoadTester, load_corpus
+from .config import LoadStage, LoadTestConfig, ramp_stages
@@ -0,0 +1,108 @@
+"""Run a replay load test: `python -m rt_wc_score.loadtest corpus.jsonl`."""
+
+import sys
+import json
+import logging
+import argparse
+
+from .._loader import load_config
+from ..synthetic import SessionGenerator, SessionGeneratorConfig
+from ._main import LoadTester, load_corpus
+from .config import LoadTestConfig, ramp_stages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="rt_wc_score replay load test")
+    parser.add_argument(
+        "corpus", nargs="?", help="JSONL payloads; synthetic sessions if omitted"
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=1000,
+        help="Number of synthetic sessions replayed without a corpus",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Payloads to read")
+    parser.add_argument(
+        "--mode",
+        choices=["thread", "process", "coalesced"],
+        default=LoadTestConfig().mode,
+    )
+    parser.add_argument("--workers", type=int, default=LoadTestConfig().workers)
+    parser.add_argument("--rate", type=float, default=50.0, help="Payloads per second")
+    parser.add_argument(
+        "--ramp-to", type=float, default=None, help="Rate of the last ramp stage"
+    )
+    parser.add_argument("--steps", type=int, default=5, help="Number of ramp stages")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds of each stage"
+    )
+    parser.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--warmup", type=int, default=0, dest="warmup_requests")
+    parser.add_argument("--decode", action="store_true", help="Send decoded payloads")
+    parser.add_argument(
+        "--deadline-ms", type=float, default=None, help="Per-payload deadline"
+    )
+    parser.add_argument("--config", dest="config_path", default=None)
+    parser.add_argument("--output", default=None, help="Report file; stdout if omitted")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    # Per-payload pipeline logs would drown the stage summaries
+    logging.getLogger("rt_wc_score.modules").setLevel(logging.WARNING)
+    logging.getLogger("rt_wc_score._main").setLevel(logging.WARNING)
+
+    if args.corpus:
+        payloads = load_corpus(args.corpus, limit=args.limit)
+    else:
+        generator = SessionGenerator(SessionGeneratorConfig())
+        payloads = [
+            json.dumps(session.payload, separators=(",", ":"))
+            for session in generator.generate(args.synthetic)
+        ]
+
+    config = LoadTestConfig(
+        mode=args.mode,
+        workers=args.workers,
+        stages=ramp_stages(
+            args.rate,
+            args.ramp_to if args.ramp_to is not None else args.rate,
+            args.steps if args.ramp_to is not None else 1,
+            args.duration,
+        ),
+        arrivals=args.arrivals,
+        warmup_requests=args.warmup_requests,
+        decode=args.decode,
+        deadline=None if args.deadline_ms is None else args.deadline_ms / 1000.0,
+    )
+    pipeline_config = load_config(args.config_path) if args.config_path else None
+    report = LoadTester(config, pipeline_config=pipeline_config).run(payloads)
+
+    for stage in report["stages"]:
+        latency = stage["latency_seconds"]
+        print(
+            f"rate {stage['rate']:8.1f}/s  throughput {stage['throughput']:8.1f}/s  "
+            f"p50 {_ms(latency['p50'])}  p95 {_ms(latency['p95'])}  "
+            f"p99 {_ms(latency['p99'])}  failed {stage['failed']}  "
+            f"dropped {stage['dropped']}",
+            file=sys.stderr,
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def _ms(seconds: float) -> str:
+    return "     n/a" if seconds is None else f"{seconds * 1000:6.1f}ms"
+
+
+if __name__ == "__main__":
+    main()
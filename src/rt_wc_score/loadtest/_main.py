@@ -0,0 +1,395 @@
+"""Open-loop replay of a payload corpus against the scoring pipeline."""
+
+import os
+import json
+import time
+import logging
+import platform
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from .._coalescer import BatchCoalescer
+from .._main import MetricsProcessor, MetricsProcessorConfig
+from .config import LoadStage, LoadTestConfig
+
+logger = logging.getLogger(__name__)
+
+# Version of the report layout, increased on incompatible changes
+REPORT_VERSION = 1
+
+# Pipeline of a process pool worker, built once by `_init_worker`
+_worker_processor: Optional[MetricsProcessor] = None
+
+
+def _init_worker(pipeline_config: Optional[MetricsProcessorConfig]) -> None:
+    """Build the pipeline of a process pool worker."""
+    global _worker_processor
+    _worker_processor = MetricsProcessor(config=pipeline_config)
+
+
+def _score_in_worker(payload: Any, deadline: Optional[float]) -> Dict[str, Any]:
+    """Score a payload with the pipeline of a process pool worker."""
+    return _worker_processor(payload, deadline=deadline)
+
+
+def _start_worker() -> None:
+    """Keep a process pool worker busy long enough for the pool to grow."""
+    time.sleep(0.1)
+
+
+def load_corpus(path: Union[str, Path], limit: Optional[int] = None) -> List[str]:
+    """Read a corpus of payloads, one JSON document per line.
+
+    Args:
+        path: JSONL file
+        limit: Maximum number of payloads to read
+
+    Returns:
+        JSON text of each payload
+    """
+    payloads = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                payloads.append(line)
+                if limit is not None and len(payloads) >= limit:
+                    break
+    return payloads
+
+
+class _StageRecord:
+    """Outcomes of the payloads sent during one stage."""
+
+    def __init__(self, stage: LoadStage):
+        self.stage = stage
+        self.start = 0.0
+        self.end = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_lag = 0.0
+        self.cpu_seconds = 0.0
+        self.max_rss_bytes: Optional[int] = None
+        self.latencies: List[float] = []
+        self.last_completion = 0.0
+
+
+class LoadTester:
+    """Replays payloads at fixed arrival rates and measures the latency.
+
+    The test is open-loop: payloads are sent at their scheduled arrival times
+    whether or not earlier ones have finished, like independent clients would.
+    Latency is measured from the scheduled arrival, so time spent waiting for a
+    worker counts, and a dispatcher falling behind cannot hide it. Stages run
+    back to back without waiting for the payloads of the previous stage.
+
+    Example:
+        tester = LoadTester(LoadTestConfig(stages=ramp_stages(50, 500, 10, 30)))
+        report = tester.run(load_corpus("corpus.jsonl"))
+    """
+
+    def __init__(
+        self,
+        config: Optional[LoadTestConfig] = None,
+        pipeline_config: Optional[MetricsProcessorConfig] = None,
+    ):
+        """Initialize the load tester.
+
+        Args:
+            config: Configuration of the load and the scoring path
+            pipeline_config: Configuration of the tested pipeline
+        """
+        self.config = config or LoadTestConfig()
+        self.pipeline_config = pipeline_config
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def run(
+        self, payloads: Sequence[Union[str, bytes, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run all stages, cycling through the payloads.
+
+        Args:
+            payloads: Payloads as JSON text or decoded
+
+        Returns:
+            Machine-readable report: the host, configuration and payload size
+            distribution, the latency percentiles, throughput and resource use
+            of each stage, and the resource use of the whole run
+
+        Raises:
+            ValueError: If there are no payloads
+        """
+        if not payloads:
+            raise ValueError("The corpus holds no payloads")
+
+        config = self.config
+        sizes = [_payload_bytes(payload) for payload in payloads]
+        items = [
+            (
+                json.loads(payload)
+                if config.decode and isinstance(payload, (str, bytes, bytearray))
+                else payload
+            )
+            for payload in payloads
+        ]
+
+        started_at = datetime.now(timezone.utc)
+        wall_start = time.monotonic()
+        times_start = os.times()
+        records = [_StageRecord(stage) for stage in config.stages]
+        submit, close = self._start()
+        try:
+            cursor = self._warm_up(submit, items)
+            for index, record in enumerate(records):
+                cursor = self._run_stage(submit, items, cursor, index, record)
+        finally:
+            close()
+        wall_seconds = time.monotonic() - wall_start
+        times_end = os.times()
+
+        process_seconds = (times_end.user - times_start.user) + (
+            times_end.system - times_start.system
+        )
+        children_seconds = (times_end.children_user - times_start.children_user) + (
+            times_end.children_system - times_start.children_system
+        )
+        return {
+            "version": REPORT_VERSION,
+            "started_at": started_at.isoformat(),
+            "host": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+            },
+            "config": config.model_dump(mode="json"),
+            "payloads": len(payloads),
+            "payload_bytes": _distribution(sizes),
+            "stages": [self._stage_report(record) for record in records],
+            "cpu": {
+                "wall_seconds": wall_seconds,
+                "process_seconds": process_seconds,
+                "children_seconds": children_seconds,
+                "utilization": (process_seconds + children_seconds) / wall_seconds,
+            },
+            "memory": {
+                "max_rss_bytes": _max_rss_bytes(False),
+                # Only worker processes are children worth reporting
+                "children_max_rss_bytes": (
+                    _max_rss_bytes(True) if config.mode == "process" else None
+                ),
+            },
+        }
+
+    def _start(
+        self,
+    ) -> Tuple[Callable[[Any, Optional[float]], Future], Callable[[], None]]:
+        """Start the scoring workers.
+
+        Returns:
+            Function submitting a payload with its deadline, and function
+            waiting for all submitted payloads and stopping the workers
+        """
+        config = self.config
+        if config.mode == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=config.workers,
+                initializer=_init_worker,
+                initargs=(self.pipeline_config,),
+            )
+            # Start every worker up front rather than during the first stage
+            for future in [
+                executor.submit(_start_worker) for _ in range(config.workers)
+            ]:
+                future.result()
+            return partial(executor.submit, _score_in_worker), executor.shutdown
+
+        processor = MetricsProcessor(config=self.pipeline_config)
+        if config.mode == "coalesced":
+            # Batches share one deadline, so payload deadlines are not passed
+            coalescer = BatchCoalescer(
+                processor.batch,
+                max_batch_size=config.max_batch_size,
+                max_wait_ms=config.max_wait_ms,
+                workers=config.workers,
+            )
+            return lambda payload, deadline: coalescer.submit(payload), coalescer.close
+
+        executor = ThreadPoolExecutor(
+            max_workers=config.workers, thread_name_prefix="loadtest"
+        )
+        return partial(executor.submit, processor), executor.shutdown
+
+    def _warm_up(
+        self, submit: Callable[[Any, Optional[float]], Future], items: Sequence[Any]
+    ) -> int:
+        """Score the warm-up payloads and wait for them.
+
+        Returns:
+            Position in the payloads after the warm-up
+        """
+        count = self.config.warmup_requests
+        futures = [submit(items[i % len(items)], None) for i in range(count)]
+        for future in futures:
+            future.exception()
+        return count
+
+    def _run_stage(
+        self,
+        submit: Callable[[Any, Optional[float]], Future],
+        items: Sequence[Any],
+        cursor: int,
+        index: int,
+        record: _StageRecord,
+    ) -> int:
+        """Send the payloads of one stage at their arrival times.
+
+        Returns:
+            Position in the payloads after the stage
+        """
+        config = self.config
+        stage = record.stage
+        offsets = _arrival_offsets(
+            stage, config.arrivals, np.random.default_rng([config.seed, index])
+        )
+        cpu_start = time.process_time()
+        record.start = start = time.monotonic()
+        for offset in offsets.tolist():
+            scheduled = start + offset
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                record.max_lag = max(record.max_lag, -delay)
+
+            with self._lock:
+                if self._in_flight >= config.max_in_flight:
+                    record.dropped += 1
+                    continue
+                self._in_flight += 1
+
+            deadline = None if config.deadline is None else scheduled + config.deadline
+            future = submit(items[cursor % len(items)], deadline)
+            cursor += 1
+            record.sent += 1
+            future.add_done_callback(partial(self._completed, record, scheduled))
+
+        remaining = start + stage.duration - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        record.end = time.monotonic()
+        record.cpu_seconds = time.process_time() - cpu_start
+        record.max_rss_bytes = _max_rss_bytes(False)
+        logger.info(
+            f"Stage {index}: sent {record.sent} payloads at {stage.rate:g}/s, "
+            f"dropped {record.dropped}, {self._in_flight} in flight"
+        )
+        return cursor
+
+    def _completed(
+        self, record: _StageRecord, scheduled: float, future: Future
+    ) -> None:
+        """Record the outcome of a finished payload."""
+        finished = time.monotonic()
+        try:
+            result = future.result()
+            failed = not (isinstance(result, dict) and result.get("success"))
+        except Exception as e:
+            logger.error(f"Error scoring payload: {str(e)}")
+            failed = True
+
+        with self._lock:
+            self._in_flight -= 1
+            record.latencies.append(finished - scheduled)
+            record.last_completion = max(record.last_completion, finished)
+            if failed:
+                record.failed += 1
+
+    def _stage_report(self, record: _StageRecord) -> Dict[str, Any]:
+        """Summarize the outcomes of one stage."""
+        window = record.end - record.start
+        completed = len(record.latencies)
+        busy = record.last_completion - record.start
+        return {
+            "rate": record.stage.rate,
+            "duration": record.stage.duration,
+            "sent": record.sent,
+            "dropped": record.dropped,
+            "completed": completed,
+            "failed": record.failed,
+            "achieved_rate": record.sent / window,
+            "throughput": completed / busy if completed else 0.0,
+            "latency_seconds": _distribution(record.latencies),
+            "max_dispatch_lag_seconds": record.max_lag,
+            "cpu_seconds": record.cpu_seconds,
+            "cpu_utilization": record.cpu_seconds / window,
+            "max_rss_bytes": record.max_rss_bytes,
+        }
+
+
+def _arrival_offsets(
+    stage: LoadStage, arrivals: str, rng: np.random.Generator
+) -> np.ndarray:
+    """Get the arrival times of a stage in seconds from its start."""
+    expected = stage.rate * stage.duration
+    if arrivals == "uniform":
+        return np.arange(int(expected)) / stage.rate
+
+    # Enough exponential gaps to cover the stage but for a negligible chance
+    count = int(expected + 6 * np.sqrt(expected) + 10)
+    offsets = np.cumsum(rng.exponential(1.0 / stage.rate, count))
+    return offsets[offsets < stage.duration]
+
+
+def _payload_bytes(payload: Union[str, bytes, Dict[str, Any]]) -> int:
+    """Get the size of the JSON text of a payload."""
+    if isinstance(payload, (bytes, bytearray)):
+        return len(payload)
+    if not isinstance(payload, str):
+        payload = json.dumps(payload, separators=(",", ":"))
+    return len(payload.encode("utf-8"))
+
+
+def _distribution(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Summarize values by their count, mean, extremes and percentiles."""
+    if not len(values):
+        return {
+            "count": 0,
+            **dict.fromkeys(("mean", "min", "p50", "p95", "p99", "max")),
+        }
+
+    array = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(array, (50, 95, 99)).tolist()
+    return {
+        "count": int(array.size),
+        "mean": float(array.mean()),
+        "min": float(array.min()),
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "max": float(array.max()),
+    }
+
+
+def _max_rss_bytes(children: bool) -> Optional[int]:
+    """Get the peak resident memory of this process or its finished children."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(
+        resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    )
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return usage.ru_maxrss if platform.system() == "Darwin" else usage.ru_maxrss * 1024
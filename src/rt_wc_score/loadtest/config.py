@@ -0,0 +1,88 @@
+"""Configuration for replay load tests."""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class LoadStage(BaseModel):
+    """Period of a load test with a constant arrival rate."""
+
+    rate: float = Field(gt=0, description="Payloads sent per second")
+    duration: float = Field(gt=0, description="Seconds the rate is held")
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+class LoadTestConfig(BaseModel):
+    """Configuration for replay load tests."""
+
+    mode: Literal["thread", "process", "coalesced"] = Field(
+        default="thread",
+        description=(
+            "Scoring path: a thread pool sharing one processor, a process pool "
+            "with one processor per worker, or a `BatchCoalescer` over "
+            "`MetricsProcessor.batch`"
+        ),
+    )
+    workers: int = Field(default=4, gt=0, description="Number of scoring workers")
+    stages: List[LoadStage] = Field(
+        default_factory=lambda: [LoadStage(rate=50.0, duration=10.0)],
+        description="Arrival rates, run one after the other without draining",
+    )
+    arrivals: Literal["poisson", "uniform"] = Field(
+        default="poisson",
+        description="Spacing of the arrivals: exponential or constant gaps",
+    )
+    max_in_flight: int = Field(
+        default=10_000,
+        gt=0,
+        description="Arrivals finding this many payloads unfinished are dropped",
+    )
+    warmup_requests: int = Field(
+        default=0, ge=0, description="Payloads scored before the stages, unreported"
+    )
+    decode: bool = Field(
+        default=False,
+        description="Send decoded payloads instead of their JSON text",
+    )
+    deadline: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Seconds after its arrival by which a result is needed",
+    )
+    max_batch_size: int = Field(
+        default=32, gt=0, description="Maximum batch size in coalesced mode"
+    )
+    max_wait_ms: float = Field(
+        default=2.0, ge=0, description="Maximum batching delay in coalesced mode"
+    )
+    seed: int = Field(default=0, description="Seed of the Poisson arrivals")
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+def ramp_stages(
+    start_rate: float, stop_rate: float, steps: int, duration: float
+) -> List[LoadStage]:
+    """Get stages stepping the rate evenly from `start_rate` to `stop_rate`.
+
+    Args:
+        start_rate: Rate of the first stage
+        stop_rate: Rate of the last stage
+        steps: Number of stages
+        duration: Seconds of each stage
+
+    Returns:
+        Stages of increasing (or decreasing) rate
+    """
+    if steps == 1:
+        return [LoadStage(rate=start_rate, duration=duration)]
+    step = (stop_rate - start_rate) / (steps - 1)
+    return [
+        LoadStage(rate=start_rate + i * step, duration=duration) for i in range(steps)
+    ]
@@ -0,0 +1,8 @@
+from ._main import ThresholdCalibrator
+from ._metrics import (
+    best_operating_points,
+    curve_summary,
+    operating_curve,
+    operating_point,
+)
+from .config import CalibrationConfig
@@ -0,0 +1,171 @@
+"""Threshold calibration of heuristic analysis over labeled sessions."""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from ..preprocessing import Preprocessor
+from ..heuristics import HeuristicAnalyzer, HeuristicConfig, to_feature_columns
+from ._metrics import (
+    best_operating_points,
+    curve_summary,
+    operating_curve,
+    operating_point,
+)
+from .config import CalibrationConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ThresholdCalibrator:
+    """Calibrates heuristic thresholds against labeled sessions.
+
+    Features are engineered once per session and kept as columns. Every candidate
+    configuration is then scored with the analyzers' columnar scoring, and the
+    score threshold is swept over the sorted final scores, so a sweep costs a few
+    array passes instead of rerunning `MetricsProcessor` per candidate value.
+
+    Rules are always fully evaluated here. Early exit never changes a verdict, so
+    the verdicts at any threshold match `HeuristicAnalyzer` configured with that
+    threshold.
+    """
+
+    def __init__(self, config: Optional[CalibrationConfig] = None):
+        """Initialize the calibrator.
+
+        Args:
+            config: Configuration with the preprocessing and heuristic
+                configuration to calibrate
+        """
+        self.config = config or CalibrationConfig()
+
+        self.heuristic_analyzer = HeuristicAnalyzer(config=self.config.heuristics)
+        self.preprocessor = Preprocessor(
+            config=self.config.preprocessor,
+            required_features=self.heuristic_analyzer.required_features,
+        )
+
+    def compute_features(
+        self, sessions: Iterable[Union[str, Dict]], labels: Iterable[int]
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Engineer the features of labeled sessions once.
+
+        Sessions that fail preprocessing get no verdict from `MetricsProcessor`
+        and are dropped.
+
+        Args:
+            sessions: Raw session data, as passed to `MetricsProcessor`
+            labels: True label of each session (1 = bot, 0 = human)
+
+        Returns:
+            Feature columns and the labels of the kept sessions
+        """
+        features: List[Dict[str, Any]] = []
+        kept_labels: List[int] = []
+        dropped = 0
+        for session, label in zip(sessions, labels):
+            session_features = self.preprocessor(session)
+            if session_features is None:
+                dropped += 1
+                continue
+            features.append(session_features)
+            kept_labels.append(label)
+
+        if dropped:
+            logger.warning(f"Dropped {dropped} sessions that failed preprocessing")
+
+        columns = to_feature_columns(
+            features, feature_names=self.heuristic_analyzer.required_features
+        )
+        return columns, np.asarray(kept_labels, dtype=bool)
+
+    def score(
+        self,
+        columns: Dict[str, np.ndarray],
+        config: Optional[HeuristicConfig] = None,
+    ) -> np.ndarray:
+        """Compute the final scores of many sessions.
+
+        Args:
+            columns: Feature columns from `compute_features`
+            config: Heuristic configuration to score with. If None, the
+                calibrated configuration is used.
+
+        Returns:
+            Array of final scores (higher = more human-like)
+        """
+        analyzer = self.heuristic_analyzer
+        if config is not None:
+            analyzer = HeuristicAnalyzer(config=config)
+
+        return analyzer.score_columns(columns)
+
+    def calibrate(
+        self,
+        columns: Dict[str, np.ndarray],
+        labels: Any,
+        config: Optional[HeuristicConfig] = None,
+    ) -> Dict[str, Any]:
+        """Sweep the score threshold for one heuristic configuration.
+
+        Args:
+            columns: Feature columns from `compute_features`
+            labels: True labels of the sessions (1 = bot, 0 = human)
+            config: Heuristic configuration to evaluate. If None, the
+                calibrated configuration is used.
+
+        Returns:
+            Dictionary with the operating `curve`, its `roc_auc` and
+            `average_precision`, the `best` operating points and the metrics at
+            the `current` score threshold
+        """
+        config = config or self.config.heuristics
+        curve = operating_curve(self.score(columns, config), labels)
+
+        return {
+            "curve": curve,
+            **curve_summary(curve),
+            "best": best_operating_points(curve),
+            "current": operating_point(curve, config.score_threshold),
+        }
+
+    def sweep(
+        self,
+        columns: Dict[str, np.ndarray],
+        labels: Any,
+        parameter: str,
+        values: Iterable[Any],
+    ) -> List[Dict[str, Any]]:
+        """Sweep a heuristic configuration value together with the threshold.
+
+        Args:
+            columns: Feature columns from `compute_features`
+            labels: True labels of the sessions (1 = bot, 0 = human)
+            parameter: Dotted path of the value in `HeuristicConfig`, e.g.
+                `mouse_events.velocity.min_velocity_variation`
+            values: Candidate values
+
+        Returns:
+            Calibration result of each candidate value (without the full
+            curve), with the candidate under `value`
+        """
+        results = []
+        for value in values:
+            config = _with_value(self.config.heuristics, parameter.split("."), value)
+            result = self.calibrate(columns, labels, config)
+            del result["curve"]
+            results.append({"value": value, **result})
+
+        return results
+
+
+def _with_value(model: BaseModel, path: List[str], value: Any) -> BaseModel:
+    """Copy a frozen configuration with the value at `path` replaced."""
+    name = path[0]
+    if name not in type(model).model_fields:
+        raise ValueError(f"Unknown configuration field: {name}")
+    if len(path) > 1:
+        value = _with_value(getattr(model, name), path[1:], value)
+    return model.model_copy(update={name: value})
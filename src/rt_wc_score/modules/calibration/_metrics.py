@@ -0,0 +1,114 @@
+"""Threshold sweep metrics computed from sorted scores and cumulative counts."""
+
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def operating_curve(scores: Any, labels: Any) -> Dict[str, np.ndarray]:
+    """Compute confusion counts and rates for every distinct threshold.
+
+    A session is classified as bot when its final score is below the threshold,
+    like `HeuristicAnalyzer`. Scores are sorted once and the number of bots below
+    each candidate threshold is read from a cumulative sum, so the whole sweep is
+    O(n log n). Candidate thresholds are the distinct scores plus `inf`, which
+    covers every possible split of the sessions.
+
+    Args:
+        scores: Final scores of the sessions (higher = more human-like)
+        labels: True labels of the sessions (1 = bot, 0 = human)
+
+    Returns:
+        Dictionary of arrays, one value per threshold (ascending): `thresholds`,
+        `tp`, `fp`, `tn`, `fn`, `tpr`, `fpr`, `precision`, `recall` and `f1`
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+
+    order = np.argsort(scores, kind="stable")
+    sorted_scores = scores[order]
+    distinct = np.concatenate(([True], np.diff(sorted_scores) > 0))
+    thresholds = np.append(sorted_scores[distinct], np.inf)
+
+    flagged = np.searchsorted(sorted_scores, thresholds, side="left")
+    cumulative_bots = np.concatenate(([0], np.cumsum(labels[order])))
+    positives = cumulative_bots[-1]
+    negatives = scores.size - positives
+
+    tp = cumulative_bots[flagged]
+    fp = flagged - tp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tpr = tp / positives
+        fpr = fp / negatives
+        precision = np.where(flagged > 0, tp / flagged, 1.0)
+        f1 = np.where(tp > 0, 2 * precision * tpr / (precision + tpr), 0.0)
+
+    return {
+        "thresholds": thresholds,
+        "tp": tp,
+        "fp": fp,
+        "tn": negatives - fp,
+        "fn": positives - tp,
+        "tpr": tpr,
+        "fpr": fpr,
+        "precision": precision,
+        "recall": tpr,
+        "f1": f1,
+    }
+
+
+def curve_summary(curve: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Compute area-based summaries of an operating curve.
+
+    Args:
+        curve: Output of `operating_curve`
+
+    Returns:
+        Dictionary with `roc_auc` and `average_precision`
+    """
+    fpr, tpr, precision = curve["fpr"], curve["tpr"], curve["precision"]
+    return {
+        "roc_auc": float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)),
+        "average_precision": float(np.sum(np.diff(tpr) * precision[1:])),
+    }
+
+
+def operating_point(curve: Dict[str, np.ndarray], threshold: float) -> Dict[str, float]:
+    """Get the metrics of an operating curve at a given threshold.
+
+    Args:
+        curve: Output of `operating_curve`
+        threshold: Score threshold (score < threshold = bot)
+
+    Returns:
+        Dictionary of metric name to value at the threshold
+    """
+    index = int(np.searchsorted(curve["thresholds"], threshold, side="left"))
+    point = {"threshold": float(threshold)}
+    point.update(
+        (name, values[index].item())
+        for name, values in curve.items()
+        if name != "thresholds"
+    )
+    return point
+
+
+def best_operating_points(curve: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+    """Find the best thresholds of an operating curve.
+
+    Args:
+        curve: Output of `operating_curve`
+
+    Returns:
+        Operating points maximizing Youden's J statistic (`youden`, TPR - FPR)
+        and the F1 score (`f1`)
+    """
+    youden = np.nan_to_num(curve["tpr"] - curve["fpr"], nan=-np.inf)
+    f1 = np.nan_to_num(curve["f1"], nan=-np.inf)
+    return {
+        "youden": operating_point(curve, curve["thresholds"][np.argmax(youden)]),
+        "f1": operating_point(curve, curve["thresholds"][np.argmax(f1)]),
+    }
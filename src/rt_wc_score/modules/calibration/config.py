@@ -0,0 +1,23 @@
+"""Configuration for threshold calibration."""
+
+from pydantic import BaseModel, Field
+
+from ..preprocessing import PreprocessorConfig
+from ..heuristics import HeuristicConfig
+
+
+class CalibrationConfig(BaseModel):
+    """Configuration for threshold calibration."""
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+    preprocessor: PreprocessorConfig = Field(
+        default_factory=PreprocessorConfig,
+        description="Configuration for preprocessing the labeled sessions",
+    )
+    heuristics: HeuristicConfig = Field(
+        default_factory=HeuristicConfig,
+        description="Heuristic configuration to calibrate",
+    )
@@ -1,2 +1,4 @@
 from ._main import HeuristicAnalyzer
 from .config import HeuristicConfig
+from ._columns import to_feature_columns
+from ._columnar import ColumnarHeuristicAnalyzer
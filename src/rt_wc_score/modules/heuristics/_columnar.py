@@ -0,0 +1,185 @@
+"""Columnar heuristic analysis over tables of engineered features."""
+
+import logging
+from typing import Any, Dict, List, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from ._main import HeuristicAnalyzer
+from ._columns import to_feature_columns
+from .config import HeuristicConfig
+from .mouse_events._base import round_array
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnarHeuristicAnalyzer:
+    """Scores tables of engineered features, one session per row.
+
+    The table holds the scalar features read by the analyzers (e.g.
+    `mouse_movement_stddev_velocity`, `mouse_movement_count`, `is_valid`), a
+    `has_checkbox` flag and the checkbox pairs flattened into
+    `checkbox_{i}_{field}` columns, as built by `to_feature_columns`. Each row
+    gets the same verdict, skipped rules and scores as `HeuristicAnalyzer` on
+    the row's feature dictionary, up to floating-point rounding of the rule
+    scores.
+    """
+
+    def __init__(self, config: Optional[HeuristicConfig] = None):
+        """Initialize the analyzer with configuration.
+
+        Args:
+            config: Configuration for heuristic analysis
+        """
+        self.config = config or HeuristicConfig()
+        self.analyzer = HeuristicAnalyzer(config=self.config)
+
+    @property
+    def required_columns(self) -> Set[str]:
+        """Names of the columns the table must contain."""
+        required = set(self.analyzer.required_features)
+        # Checkbox pairs are flattened; only the flag is mandatory
+        required.discard("checkbox")
+        required.add("has_checkbox")
+        return required
+
+    def __call__(
+        self, table: Union[pd.DataFrame, Dict[str, np.ndarray]]
+    ) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
+        """Analyze a table of features to detect bot-like behavior.
+
+        Args:
+            table: DataFrame or dictionary of column name to array
+
+        Returns:
+            Result columns (a DataFrame with the table's index for DataFrame
+            input): `is_bot`, `confidence` and `score` (NaN on early exit),
+            `early_exit`, `score_min` and `score_max` (the final score range on
+            early exit, NaN otherwise), plus `{rule}_score` (NaN if skipped),
+            `{rule}_skipped` and `{rule}_veto` for every rule
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        columns = self._to_columns(table)
+
+        rule_engine = self.analyzer.rule_engine
+        mouse_scores = self.analyzer.mouse_analyzer.evaluate_columns(columns)
+        combined = rule_engine.combine_columns(mouse_scores)
+        final_score = round_array(1 - combined, 5)
+        threshold = self.config.score_threshold
+
+        size = len(final_score)
+        skipped = np.zeros(size, dtype=bool)
+        vetoed = np.zeros(size, dtype=bool)
+        for rule_scores in mouse_scores.values():
+            skipped |= rule_scores["skipped"]
+            vetoed |= rule_scores["veto"]
+        early_exit = skipped & ~vetoed
+
+        score_min = np.full(size, np.nan)
+        score_max = np.full(size, np.nan)
+        is_bot = final_score < threshold
+        if early_exit.any():
+            lowest, highest = rule_engine.bounds_columns(mouse_scores)
+            score_min[early_exit] = round_array(1 - highest[early_exit], 5)
+            score_max[early_exit] = round_array(1 - lowest[early_exit], 5)
+            is_bot = np.where(early_exit, rule_engine.is_bot_columns(lowest), is_bot)
+            final_score = np.where(early_exit, np.nan, final_score)
+
+        results = {
+            "is_bot": is_bot.astype(np.int64),
+            "confidence": np.minimum(np.abs(final_score - threshold), 1.0),
+            "score": final_score,
+            "early_exit": early_exit,
+            "score_min": score_min,
+            "score_max": score_max,
+        }
+        for name, rule_scores in mouse_scores.items():
+            results[f"{name}_score"] = rule_scores["score"]
+            results[f"{name}_skipped"] = rule_scores["skipped"]
+            results[f"{name}_veto"] = rule_scores["veto"]
+
+        if isinstance(table, pd.DataFrame):
+            return pd.DataFrame(results, index=table.index)
+        return results
+
+    def analyze_rows(self, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze many feature dictionaries in one vectorized pass.
+
+        Args:
+            features: Engineered features of each session
+
+        Returns:
+            Per-session results, as given by `HeuristicAnalyzer` up to
+            floating-point rounding of the rule scores
+        """
+        if not features:
+            return []
+
+        columns = to_feature_columns(features, self.analyzer.required_features)
+        results = self(columns)
+        has_checkbox = columns["has_checkbox"]
+
+        rows = []
+        for index in range(len(features)):
+            mouse_scores = {}
+            skipped = []
+            for rule in self.analyzer.mouse_analyzer.rules:
+                if results[f"{rule.name}_skipped"][index]:
+                    skipped.append(rule.name)
+                    continue
+                if not has_checkbox[index]:
+                    rule_scores = {"score": 1, "weight": rule.weight}
+                else:
+                    rule_scores = {
+                        "score": float(results[f"{rule.name}_score"][index]),
+                        "weight": rule.weight,
+                    }
+                    if results[f"{rule.name}_veto"][index]:
+                        rule_scores["veto"] = True
+                mouse_scores[rule.name] = rule_scores
+
+            if results["early_exit"][index]:
+                row = {
+                    "is_bot": int(results["is_bot"][index]),
+                    "confidence": None,
+                    "score": None,
+                    "score_range": [
+                        float(results["score_min"][index]),
+                        float(results["score_max"][index]),
+                    ],
+                    "early_exit": True,
+                    "skipped_rules": skipped,
+                    "mouse_scores": mouse_scores,
+                    "threshold_used": self.config.score_threshold,
+                }
+            else:
+                row = {
+                    "is_bot": int(results["is_bot"][index]),
+                    "confidence": float(results["confidence"][index]),
+                    "score": float(results["score"][index]),
+                    "mouse_scores": mouse_scores,
+                    "threshold_used": self.config.score_threshold,
+                }
+                if skipped:
+                    row["skipped_rules"] = skipped
+            rows.append(row)
+        return rows
+
+    def _to_columns(
+        self, table: Union[pd.DataFrame, Dict[str, np.ndarray]]
+    ) -> Dict[str, np.ndarray]:
+        """Convert the input table to float columns and a boolean flag column."""
+        missing = self.required_columns - set(table.keys())
+        if missing:
+            raise ValueError(f"Missing feature columns: {sorted(missing)}")
+
+        columns = {}
+        for name in table.keys():
+            if name == "has_checkbox":
+                columns[name] = np.asarray(table[name], dtype=bool)
+            elif name in self.required_columns or name.startswith("checkbox_"):
+                columns[name] = np.asarray(table[name], dtype=np.float64)
+        return columns
@@ -0,0 +1,115 @@
+"""Conversion of engineered feature dictionaries into feature columns."""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CHECKBOX_PAIR_FIELDS = (
+    "time_diff",
+    "path_linearity",
+    "movement_count",
+    "avg_angle_degrees",
+)
+
+
+def checkbox_pair_column(index: int, field: str) -> str:
+    """Get the column name of a checkbox pair feature.
+
+    Args:
+        index: Position of the pair in the session's `checkbox` list
+        field: Pair feature name
+
+    Returns:
+        Column name, e.g. `checkbox_0_time_diff`
+    """
+    return f"checkbox_{index}_{field}"
+
+
+def checkbox_pair_matrix(columns: Dict[str, np.ndarray], field: str) -> np.ndarray:
+    """Stack the per-pair columns of a checkbox pair feature.
+
+    Args:
+        columns: Feature columns
+        field: Pair feature name
+
+    Returns:
+        Array of shape (sessions, pairs), NaN where a session has no such pair
+    """
+    pair_columns = []
+    while checkbox_pair_column(len(pair_columns), field) in columns:
+        pair_columns.append(columns[checkbox_pair_column(len(pair_columns), field)])
+
+    size = len(columns["has_checkbox"])
+    if not pair_columns:
+        return np.empty((size, 0), dtype=np.float64)
+    return np.column_stack(pair_columns).astype(np.float64, copy=False)
+
+
+def _to_float(value: Any) -> float:
+    """Convert a feature value to float, using NaN for missing values."""
+    try:
+        return np.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def to_feature_columns(
+    features: List[Dict[str, Any]], feature_names: Optional[Iterable[str]] = None
+) -> Dict[str, np.ndarray]:
+    """Convert engineered feature dictionaries into per-feature arrays.
+
+    Scalar features become float columns with NaN for missing values. The nested
+    `checkbox` feature is flattened into a `has_checkbox` flag and one column per
+    pair and field (see `checkbox_pair_column`), padded with NaN.
+
+    Args:
+        features: Engineered features of each session (output of `Preprocessor`)
+        feature_names: Features to convert. If None, all scalar features found
+            in the first session plus `checkbox` are converted.
+
+    Returns:
+        Dictionary of column name to array with one value per session
+    """
+    if feature_names is None:
+        feature_names = [
+            name
+            for name, value in (features[0] if features else {}).items()
+            if name not in ("user_id", "project_id")
+            and not isinstance(value, (list, dict))
+        ]
+        feature_names.append("checkbox")
+
+    columns: Dict[str, np.ndarray] = {}
+    for name in feature_names:
+        if name == "checkbox":
+            columns.update(_checkbox_columns(features))
+            continue
+        columns[name] = np.fromiter(
+            (_to_float(session.get(name)) for session in features),
+            dtype=np.float64,
+            count=len(features),
+        )
+
+    return columns
+
+
+def _checkbox_columns(features: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Flatten the checkbox pair lists of many sessions into columns."""
+    pairs = [session.get("checkbox") for session in features]
+    columns = {
+        "has_checkbox": np.array([pair is not None for pair in pairs], dtype=bool)
+    }
+
+    max_pairs = max((len(pair) for pair in pairs if pair), default=0)
+    for field in CHECKBOX_PAIR_FIELDS:
+        matrix = np.full((len(pairs), max_pairs), np.nan)
+        for row, session_pairs in enumerate(pairs):
+            for index, pair in enumerate(session_pairs or []):
+                matrix[row, index] = _to_float(pair.get(field))
+        for index in range(max_pairs):
+            columns[checkbox_pair_column(index, field)] = matrix[:, index]
+
+    return columns
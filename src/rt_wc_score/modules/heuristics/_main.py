@@ -1,10 +1,14 @@
 """Main module for heuristic analysis."""
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set
+
+import numpy as np
 
 from .config import HeuristicConfig
 from .mouse_events import MouseEventAnalyzer
+from .mouse_events._base import round_array
+from .rules import RuleEngine
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +23,17 @@ class HeuristicAnalyzer:
             config: Configuration for heuristic analysis
         """
         self.config = config or HeuristicConfig()
-        self.mouse_analyzer = MouseEventAnalyzer(config=self.config.mouse_events)
+        self.rule_engine = RuleEngine(
+            config=self.config.rules, score_threshold=self.config.score_threshold
+        )
+        self.mouse_analyzer = MouseEventAnalyzer(
+            config=self.config.mouse_events, rule_engine=self.rule_engine
+        )
+
+    @property
+    def required_features(self) -> Set[str]:
+        """Names of the engineered features read by the enabled analyzers."""
+        return self.mouse_analyzer.required_features
 
     def __call__(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze features to detect bot-like behavior.
@@ -28,11 +42,31 @@ class HeuristicAnalyzer:
             features: Dictionary of engineered features
 
         Returns:
-            Dictionary containing detection results and scores
+            Dictionary containing detection results and scores. Sessions
+            decided by early exit have no `score`; they are marked with
+            `early_exit` and give the `score_range` instead. Rules that were
+            not run are left out of `mouse_scores` and listed in
+            `skipped_rules`.
         """
         try:
             # Get mouse event scores
             mouse_scores = self.mouse_analyzer(features)
+            skipped = [
+                name
+                for name, rule_scores in mouse_scores.items()
+                if isinstance(rule_scores, dict) and rule_scores.get("skipped")
+            ]
+            evaluated = {
+                name: rule_scores
+                for name, rule_scores in mouse_scores.items()
+                if name not in skipped
+            }
+
+            if skipped and not any(
+                isinstance(rule_scores, dict) and rule_scores.get("veto")
+                for rule_scores in evaluated.values()
+            ):
+                return self._early_exit_result(mouse_scores, evaluated, skipped)
 
             # Calculate final score
 
@@ -44,13 +78,17 @@ class HeuristicAnalyzer:
             # Calculate confidence based on score distance from threshold
             confidence = abs(final_score - self.config.score_threshold)
 
-            return {
+            result = {
                 "is_bot": is_bot,
                 "confidence": min(confidence, 1.0),  # Cap confidence at 1.0
                 "score": final_score,
-                "mouse_scores": mouse_scores,
+                "mouse_scores": evaluated,
                 "threshold_used": self.config.score_threshold,
             }
+            if skipped:
+                # Rules left after a veto
+                result["skipped_rules"] = skipped
+            return result
 
         except Exception as e:
             logger.error(f"Error in heuristic analysis: {str(e)}", exc_info=True)
@@ -61,26 +99,61 @@ class HeuristicAnalyzer:
                 "error": str(e),
             }
 
-    def _calculate_final_score(self, scores: Dict[str, Dict[str, float]]) -> float:
-        """Calculate weighted average score.
+    def score_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Compute final scores of many sessions given as feature columns.
+
+        Every rule is evaluated for every session, i.e. the scores are those of
+        the analyzer with early exit disabled. Verdicts are the same either way.
 
         Args:
-            scores: Dictionary containing scores and weights
+            columns: Feature columns, as built by `to_feature_columns`
 
         Returns:
-            Final weighted score
+            Array of final scores (higher = more human-like)
         """
-        total_weight = 0
-        weighted_sum = 0
+        rule_scores = self.mouse_analyzer.evaluate_columns(columns, early_exit=False)
+        return round_array(1 - self.rule_engine.combine_columns(rule_scores), 5)
+
+    def _early_exit_result(
+        self,
+        mouse_scores: Dict[str, Dict[str, Any]],
+        evaluated: Dict[str, Dict[str, Any]],
+        skipped: List[str],
+    ) -> Dict[str, Any]:
+        """Build the result of a session decided before all rules ran.
+
+        The verdict is settled, but the final score is only known within the
+        range the skipped rules could move it, so no `score` or `confidence`
+        is given.
 
-        for analyzer_scores in scores.values():
-            score = analyzer_scores.get("score", 0)
-            weight = analyzer_scores.get("weight", 0)
+        Args:
+            mouse_scores: Scores of the evaluated and skipped rules
+            evaluated: Scores of the evaluated rules
+            skipped: Names of the skipped rules
 
-            weighted_sum += score * weight
-            total_weight += weight
+        Returns:
+            Dictionary containing the verdict, the final score range and the
+            skipped rules
+        """
+        lowest, highest = self.rule_engine.bounds(mouse_scores)
+        return {
+            "is_bot": int(self.rule_engine.is_bot(lowest)),
+            "confidence": None,
+            "score": None,
+            "score_range": [round(1 - highest, 5), round(1 - lowest, 5)],
+            "early_exit": True,
+            "skipped_rules": skipped,
+            "mouse_scores": evaluated,
+            "threshold_used": self.config.score_threshold,
+        }
 
-        if total_weight == 0:
-            return 0.0
+    def _calculate_final_score(self, scores: Dict[str, Dict[str, float]]) -> float:
+        """Combine analyzer scores with the configured combination method.
 
-        return weighted_sum / total_weight
+        Args:
+            scores: Dictionary containing scores and weights
+
+        Returns:
+            Final combined score
+        """
+        return self.rule_engine.combine(scores)
@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel, Field
 from .mouse_events.config import MouseEventConfig
+from .rules.config import RuleConfig
 
 
 class HeuristicConfig(BaseModel):
@@ -15,6 +16,10 @@ class HeuristicConfig(BaseModel):
         default_factory=MouseEventConfig,
         description="Configuration for mouse event analysis",
     )
+    rules: RuleConfig = Field(
+        default_factory=RuleConfig,
+        description="Configuration for combining analyzer scores",
+    )
     score_threshold: float = Field(
         default=0.35, description="Threshold for bot classification (>threshold = bot)"
     )
@@ -1,2 +1,3 @@
 from ._main import MouseEventAnalyzer
 from .config import MouseEventConfig
+from ._curves import ScoreCurve, inverse_scaling_values, score_values
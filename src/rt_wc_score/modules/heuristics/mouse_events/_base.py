@@ -1,22 +1,103 @@
 import logging
 import math
 
-from typing import Any
+from typing import Any, Dict, Iterator, Tuple
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from ._curves import inverse_scaling_values, score_values
 
 logger = logging.getLogger(__name__)
 
 
+def round_array(values, ndigits: int = 5) -> np.ndarray:
+    """
+    Round an array the same way as the built-in `round`.
+
+    `np.round` scales by a power of ten first, which can tip values sitting
+    right at a rounding boundary the other way. Those few values are rounded
+    with the built-in instead so results are identical to the scalar path.
+
+    Args:
+        values (array-like): Values to round.
+        ndigits (int): Number of decimal digits.
+
+    Returns:
+        np.ndarray: Rounded values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 10.0**ndigits
+    rounded = np.round(values, ndigits)
+
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, ndigits) for v in values[near_tie]]
+    return rounded
+
+
+def _feature_rows(columns: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    """Rebuild the scalar feature dictionary of each session from columns."""
+    values = {name: np.asarray(column).tolist() for name, column in columns.items()}
+    size = len(next(iter(values.values()), ()))
+    for row in range(size):
+        yield {
+            name: column[row]
+            for name, column in values.items()
+            if column[row] == column[row]
+        }
+
+
 class BaseHeuristicCheck(ABC):
 
     """Abstract base class for data preprocessing."""
 
+    # Relative cost of running the check; cheaper checks are evaluated first
+    cost: int = 1
+    # Names of the engineered features the check reads
+    required_features: Tuple[str, ...] = ()
+
     @abstractmethod
     def __call__(self, data: Any) -> Any:
         """Process the input data."""
         pass
 
+    def is_decisive(self, features: Any) -> bool:
+        """Check whether the features alone settle the verdict (veto rule)."""
+        return False
+
+    def score_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score many sessions given as feature columns.
+
+        By default the check is called on each session's scalar features, NaN
+        values being left out as missing. Checks override it with array code,
+        and must if they read nested features such as `checkbox`.
+
+        Args:
+            columns: Dictionary of feature name to per-session array, as built by
+                `to_feature_columns`
+
+        Returns:
+            Array of per-session scores equal to calling the check on each session
+        """
+        return np.array(
+            [self(features) for features in _feature_rows(columns)], dtype=np.float64
+        )
+
+    def decisive_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Array version of `is_decisive` over feature columns.
+
+        By default `is_decisive` is called on each session's scalar features,
+        as in `score_columns`, unless the check has no veto.
+        """
+        if type(self).is_decisive is BaseHeuristicCheck.is_decisive:
+            size = len(next(iter(columns.values()), ()))
+            return np.zeros(size, dtype=bool)
+        return np.array(
+            [self.is_decisive(features) for features in _feature_rows(columns)],
+            dtype=bool,
+        )
+
     def scoring_function(self,value, min_value, max_value, min_score=0.40, max_score=0.40,min_of_min=0.3,max_of_max=1.5):
         """
         Calculate a score based on a value's relationship to specified minimum and maximum thresholds.
@@ -82,6 +163,73 @@ class BaseHeuristicCheck(ABC):
         scaled = (scaled - math.exp(-rate)) / (1 - math.exp(-rate))
         return min_value + scaled * (max_value - min_value)
 
+    def scoring_function_array(
+        self,
+        value,
+        min_value,
+        max_value,
+        min_score=0.40,
+        max_score=0.40,
+        min_of_min=0.3,
+        max_of_max=1.5,
+    ) -> np.ndarray:
+        """
+        Array version of `scoring_function`.
+
+        Values and thresholds can be numpy arrays (or scalars) and are broadcast
+        against each other, e.g. to score all checkbox pairs of many sessions
+        against per-pair thresholds in one call (see `score_values`).
+
+        Args:
+            value (array-like): The input values to be scored.
+            min_value (array-like): Lower threshold values.
+            max_value (array-like): Upper threshold values.
+            min_score (array-like): Base scores for values below min_value.
+            max_score (array-like): Base scores for values above max_value.
+            min_of_min (array-like): Multipliers for absolute minimum values.
+            max_of_max (array-like): Multipliers for absolute maximum values.
+
+        Returns:
+            np.ndarray: Normalized scores between 0 and 1.
+        """
+        return score_values(
+            value, min_value, max_value, min_score, max_score, min_of_min, max_of_max
+        )
+
+    def inverse_scaling_array(
+        self, value, min_input, max_input, min_value, max_value, rate=1.0
+    ) -> np.ndarray:
+        """
+        Array version of `inverse_scaling`, broadcasting all arguments.
+
+        Args:
+            value (array-like): Input values to scale.
+            min_input (array-like): Minimum input values.
+            max_input (array-like): Maximum input values.
+            min_value (array-like): Minimum output values.
+            max_value (array-like): Maximum output values.
+            rate (array-like): Growth rates of the exponential scaling.
+
+        Returns:
+            np.ndarray: Scaled outputs between min_value and max_value.
+        """
+        return inverse_scaling_values(
+            value, min_input, max_input, min_value, max_value, rate
+        )
+
+    def round_array(self, values, ndigits: int = 5) -> np.ndarray:
+        """
+        Round an array the same way as the built-in `round`.
+
+        Args:
+            values (array-like): Values to round.
+            ndigits (int): Number of decimal digits.
+
+        Returns:
+            np.ndarray: Rounded values.
+        """
+        return round_array(values, ndigits)
+
     def clamp_score_zero_to_one(self, score):
         """
         Clamps a score value to ensure it falls within the range [0.0, 1.0].
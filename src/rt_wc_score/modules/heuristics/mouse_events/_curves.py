@@ -0,0 +1,247 @@
+"""Precompiled score curves for heuristic checks."""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import numpy as np
+
+
+def inverse_scaling_values(
+    values: Any,
+    min_input: Any,
+    max_input: Any,
+    min_value: Any,
+    max_value: Any,
+    rate: Any = 1.0,
+) -> np.ndarray:
+    """Array version of `BaseHeuristicCheck.inverse_scaling`.
+
+    All arguments are array-likes broadcast against each other.
+
+    Args:
+        values: Input values to scale
+        min_input: Minimum input values
+        max_input: Maximum input values
+        min_value: Minimum output values
+        max_value: Maximum output values
+        rate: Growth rates of the exponential scaling
+
+    Returns:
+        Scaled outputs between min_value and max_value
+    """
+    values, min_input, max_input, min_value, max_value, rate = (
+        np.asarray(arg, dtype=np.float64)
+        for arg in (values, min_input, max_input, min_value, max_value, rate)
+    )
+    decay = np.exp(-rate)
+    normalized = (values - min_input) / (max_input - min_input)
+    scaled = (np.exp(-rate * normalized) - decay) / (1 - decay)
+    return min_value + scaled * (max_value - min_value)
+
+
+def score_values(
+    values: Any,
+    min_value: Any,
+    max_value: Any,
+    min_score: Any = 0.40,
+    max_score: Any = 0.40,
+    min_of_min: Any = 0.3,
+    max_of_max: Any = 1.5,
+    rate: Any = 0.1,
+) -> np.ndarray:
+    """Array version of `BaseHeuristicCheck.scoring_function`.
+
+    Values and all parameters are array-likes broadcast against each other, so
+    many sessions can be scored against one set of thresholds, or values
+    against a threshold set each. Branches are taken with `np.where`; results
+    match `scoring_function` to about 1e-12 and NaN values score 0.
+
+    Example:
+        # Scores of 3 values against each of 2 threshold sets, shape (2, 3)
+        score_values([10, 50, 900], [[30], [60]], [[600], [800]])
+
+    Args:
+        values: Input values to be scored
+        min_value: Lower threshold values
+        max_value: Upper threshold values
+        min_score: Base scores for values below min_value
+        max_score: Base scores for values above max_value
+        min_of_min: Multipliers for absolute minimum values
+        max_of_max: Multipliers for absolute maximum values
+        rate: Growth rates of the exponential scaling
+
+    Returns:
+        Scores between 0 and 1 of the broadcast shape
+    """
+    values, min_value, max_value, min_score, max_score = (
+        np.asarray(arg, dtype=np.float64)
+        for arg in (values, min_value, max_value, min_score, max_score)
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        below = min_score + (1 - min_score) * inverse_scaling_values(
+            values, np.multiply(min_of_min, min_value), min_value, 0.05, 1, rate
+        )
+        above = max_score + (1 - max_score) * inverse_scaling_values(
+            values, max_value, np.multiply(max_of_max, max_value), 0.95, 0.05, rate
+        )
+
+    return np.where(
+        values < min_value,
+        np.minimum(1, below),
+        np.where(values > max_value, np.minimum(1, above), 0.0),
+    )
+
+
+@dataclass(frozen=True)
+class ScoreCurve:
+    """Immutable, precompiled version of `BaseHeuristicCheck.scoring_function`.
+
+    All thresholds and exponential constants are computed once at construction,
+    so scoring a value is a couple of comparisons and one `exp`. The same object
+    serves scalar calls (`curve(value)`) and batch calls (`curve.batch(values)`)
+    and gives the same results as `scoring_function` with the same arguments;
+    batch scores go through `score_values` and can differ from scalar ones in
+    the last bit.
+
+    With `table_size > 0` the curve also precomputes a dense lookup table for
+    the integers `0 .. table_size - 1`, which is used for integer-valued inputs
+    such as movement counts.
+
+    Attributes:
+        min_value: Lower threshold value
+        max_value: Upper threshold value
+        min_score: Base score for values below min_value
+        max_score: Base score for values above max_value
+        min_of_min: Multiplier for absolute minimum value
+        max_of_max: Multiplier for absolute maximum value
+        rate: Growth rate of the exponential scaling
+        table_size: Size of the integer lookup table (0 disables it)
+    """
+
+    min_value: float
+    max_value: float
+    min_score: float = 0.40
+    max_score: float = 0.40
+    min_of_min: float = 0.3
+    max_of_max: float = 1.5
+    rate: float = 0.1
+    table_size: int = 0
+
+    lower_start: float = field(init=False)
+    lower_span: float = field(init=False)
+    upper_span: float = field(init=False)
+    decay: float = field(init=False)
+    decay_span: float = field(init=False)
+    table: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        lower_start = self.min_of_min * self.min_value
+        decay = math.exp(-self.rate)
+        object.__setattr__(self, "lower_start", lower_start)
+        object.__setattr__(self, "lower_span", self.min_value - lower_start)
+        object.__setattr__(
+            self, "upper_span", self.max_of_max * self.max_value - self.max_value
+        )
+        object.__setattr__(self, "decay", decay)
+        object.__setattr__(self, "decay_span", 1 - decay)
+
+        table = np.empty(0, dtype=np.float64)
+        if self.table_size > 0:
+            table = np.array(
+                [self._score(value) for value in range(self.table_size)],
+                dtype=np.float64,
+            )
+            table.setflags(write=False)
+        object.__setattr__(self, "table", table)
+
+    def __call__(self, value: float) -> float:
+        """Score a single value.
+
+        Args:
+            value: The input value to be scored
+
+        Returns:
+            Score between 0 and 1
+        """
+        if (
+            self.table_size
+            and isinstance(value, (int, np.integer))
+            and 0 <= value < self.table_size
+        ):
+            return float(self.table[value])
+        return self._score(value)
+
+    def _score(self, value: float) -> float:
+        """Score a single value without the lookup table."""
+        if value < self.min_value:
+            normalized = (value - self.lower_start) / self.lower_span
+            scaled = (math.exp(-self.rate * normalized) - self.decay) / self.decay_span
+            score = self.min_score + (1 - self.min_score) * (0.05 + scaled * (1 - 0.05))
+            return min(1, score)
+        elif value > self.max_value:
+            normalized = (value - self.max_value) / self.upper_span
+            scaled = (math.exp(-self.rate * normalized) - self.decay) / self.decay_span
+            score = self.max_score + (1 - self.max_score) * (
+                0.95 + scaled * (0.05 - 0.95)
+            )
+            return min(1, score)
+        else:
+            return 0
+
+    def batch(self, values: Any) -> np.ndarray:
+        """Score an array of values.
+
+        Args:
+            values: Array-like of input values
+
+        Returns:
+            Array of scores between 0 and 1
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not self.table_size:
+            return self._batch(values)
+
+        with np.errstate(invalid="ignore"):
+            in_table = (values >= 0) & (values < self.table_size)
+        index = np.where(in_table, values, 0).astype(np.int64)
+        in_table &= index == values
+
+        scores = np.empty_like(values)
+        scores[in_table] = self.table[index[in_table]]
+        scores[~in_table] = self._batch(values[~in_table])
+        return scores
+
+    def _batch(self, values: np.ndarray) -> np.ndarray:
+        """Score an array of values without the lookup table."""
+        return score_values(
+            values,
+            self.min_value,
+            self.max_value,
+            self.min_score,
+            self.max_score,
+            self.min_of_min,
+            self.max_of_max,
+            self.rate,
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        """Get curve parameters and precomputed constants.
+
+        Returns:
+            Dictionary of curve parameters, constants and breakpoints
+        """
+        return {
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "min_of_min": self.min_of_min,
+            "max_of_max": self.max_of_max,
+            "rate": self.rate,
+            "table_size": self.table_size,
+            "lower_start": self.lower_start,
+            "upper_end": self.max_value + self.upper_span,
+            "decay": self.decay,
+        }
@@ -1,12 +1,16 @@
 """Mouse event analysis module."""
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
+
+import numpy as np
 
 from .config import MouseEventConfig
 from .velocity import VelocityAnalyzer
 from .movement_count import MovementCountAnalyzer
 from .checkbox_path import CheckboxPathAnalyzer
+from .replay import ReplayAnalyzer
+from ..rules import Rule, RuleEngine
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +18,20 @@ logger = logging.getLogger(__name__)
 class MouseEventAnalyzer:
     """Analyzes mouse events for bot-like behavior."""
 
-    def __init__(self, config: Optional[MouseEventConfig] = None):
-        """Initialize mouse event analyzers."""
+    def __init__(
+        self,
+        config: Optional[MouseEventConfig] = None,
+        rule_engine: Optional[RuleEngine] = None,
+    ):
+        """Initialize mouse event analyzers.
+
+        Args:
+            config: Configuration for mouse event analysis
+            rule_engine: Engine that evaluates the analyzers; by default every
+                analyzer is run
+        """
         self.config = config or MouseEventConfig()
+        self.rule_engine = rule_engine or RuleEngine()
 
         self.velocity_analyzer = VelocityAnalyzer(config=self.config.velocity)
         self.movement_count_analyzer = MovementCountAnalyzer(
@@ -25,31 +40,44 @@ class MouseEventAnalyzer:
         self.checkbox_path_analyzer = CheckboxPathAnalyzer(
             config=self.config.checkbox_path
         )
+        self.replay_analyzer = ReplayAnalyzer(config=self.config.replay)
+
+        analyzers = [
+            ("velocity", self.velocity_analyzer, self.config.velocity),
+            (
+                "movement_count",
+                self.movement_count_analyzer,
+                self.config.movement_count,
+            ),
+            ("checkbox_path", self.checkbox_path_analyzer, self.config.checkbox_path),
+            ("replay", self.replay_analyzer, self.config.replay),
+        ]
+        self.rules = [
+            Rule(name, analyzer, analyzer_config.weight)
+            for name, analyzer, analyzer_config in analyzers
+            if analyzer_config.enabled
+        ]
+
+    @property
+    def required_features(self) -> Set[str]:
+        """Names of the engineered features read by the enabled analyzers."""
+        # "checkbox" is always read to detect sessions without checkboxes
+        required = {"checkbox"}
+        for rule in self.rules:
+            required.update(rule.check.required_features)
+        return required
 
     def __call__(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze mouse features for bot detection."""
         try:
-
-            velocity_score = self.velocity_analyzer(features)
-            movement_count_score = self.movement_count_analyzer(features)
-            checkbox_path_score = self.checkbox_path_analyzer(features)
             checkbox_getter = features.get("checkbox")
             if checkbox_getter is None:
-                velocity_score ,movement_count_score , checkbox_path_score = 1, 1, 1
-            return {
-                "velocity": {
-                    "score": velocity_score,
-                    "weight": self.config.velocity.weight,
-                },
-                "movement_count": {
-                    "score": movement_count_score,
-                    "weight": self.config.movement_count.weight,
-                },
-                "checkbox_path": {
-                    "score": checkbox_path_score,
-                    "weight": self.config.checkbox_path.weight,
-                },
-            }
+                return {
+                    rule.name: {"score": 1, "weight": rule.weight}
+                    for rule in self.rules
+                }
+
+            return self.rule_engine.evaluate(self.rules, features)
 
         except Exception as e:
             logger.error(f"Error in mouse event analysis: {str(e)}")
@@ -59,3 +87,38 @@ class MouseEventAnalyzer:
                 "checkbox_path": {"score": 0.0, "weight": 0.0},
                 "error": str(e),
             }
+
+    def evaluate_columns(
+        self, columns: Dict[str, np.ndarray], early_exit: Optional[bool] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Array version of `__call__` over feature columns of many sessions.
+
+        Args:
+            columns: Feature columns, as built by `to_feature_columns`
+            early_exit: Whether to skip rules that cannot change the verdict;
+                the rule engine's configuration if None
+
+        Returns:
+            Dictionary of rule name to per-session `score` (NaN if skipped),
+            `skipped` and `veto` arrays and the rule `weight`
+        """
+        has_checkbox = np.asarray(columns["has_checkbox"], dtype=bool)
+        evaluated = self.rule_engine.evaluate_columns(
+            self.rules,
+            {name: values[has_checkbox] for name, values in columns.items()},
+            early_exit=early_exit,
+        )
+
+        # Sessions without checkboxes score 1 on every rule
+        results = {}
+        for rule in self.rules:
+            result = {
+                "score": np.ones(has_checkbox.size),
+                "weight": rule.weight,
+                "skipped": np.zeros(has_checkbox.size, dtype=bool),
+                "veto": np.zeros(has_checkbox.size, dtype=bool),
+            }
+            for key in ("score", "skipped", "veto"):
+                result[key][has_checkbox] = evaluated[rule.name][key]
+            results[rule.name] = result
+        return results
@@ -7,15 +7,50 @@ from typing import Dict, Any, Optional
 import numpy as np
 from .config import CheckboxPathConfig
 from .._base import BaseHeuristicCheck
+from .._curves import ScoreCurve
+from ..._columns import checkbox_pair_matrix
+
 logger = logging.getLogger(__name__)
 
 
 class CheckboxPathAnalyzer(BaseHeuristicCheck):
     """Analyzes checkbox interaction patterns for bot detection."""
 
+    cost = 10
+    required_features = ("is_valid", "checkbox")
+
     def __init__(self, config: Optional[CheckboxPathConfig] = None):
         """Initialize checkbox path analyzer."""
         self.config = config or CheckboxPathConfig()
+        self.timing_curve = ScoreCurve(
+            min_value=self.config.min_expected_time,
+            max_value=self.config.max_expected_time,
+            min_score=0.8,
+            max_score=0.5,
+            min_of_min=0.5,  # min_expected_time * 0.5 = 0.5
+            max_of_max=2,  # max_expected_time * 2   = 8
+        )
+        self.linearity_curve = ScoreCurve(
+            min_value=self.config.min_linearity_threshold,
+            max_value=self.config.max_linearity_threshold,
+            min_score=0.8,
+            max_score=0.5,
+            min_of_min=0.6,  # min_linearity_threshold * 0.6  = 0.45
+            max_of_max=1.04,  # max_linearity_threshold * 1.04 = 0.988
+        )
+        self.avg_angle_curve = ScoreCurve(
+            min_value=self.config.min_avg_angle_degrees,
+            max_value=self.config.max_avg_angle_degrees,
+            min_score=0.5,
+            max_score=0.8,
+            min_of_min=0.5,
+            max_of_max=1.5,
+        )
+        self.curves = {
+            "time_diff": self.timing_curve,
+            "path_linearity": self.linearity_curve,
+            "avg_angle_degrees": self.avg_angle_curve,
+        }
 
     def __call__(self, features: Dict[str, Any]) -> float:
         """Analyze checkbox interaction features for bot detection.
@@ -33,7 +68,7 @@ class CheckboxPathAnalyzer(BaseHeuristicCheck):
                 for feature in features["checkbox"]:
                     movement_count = feature.get("movement_count")
                     if movement_count < self.config.min_movement_count_too_low:
-                        max_suspicion_score = 1
+                        max_suspicion_score = 1.0
                         continue
                     time_diff = feature.get("time_diff")
                     linearity = feature.get("path_linearity")
@@ -76,18 +111,7 @@ class CheckboxPathAnalyzer(BaseHeuristicCheck):
         Returns:
             Suspicion score for timing (0-1)
         """
-
-        score = self.scoring_function(
-            value=time_diff,
-            min_value=self.config.min_expected_time,
-            max_value=self.config.max_expected_time,
-            min_score=0.8,
-            max_score=0.5,
-            min_of_min=0.5,  # min_expected_time * 0.5 = 0.5
-            max_of_max=2,    # max_expected_time * 2   = 8
-        )
-
-        return self.clamp_score_zero_to_one(score)
+        return self.clamp_score_zero_to_one(self.timing_curve(time_diff))
 
     def _analyze_path_linearity(self, linearity: float) -> float:
         """Analyze path linearity between checkboxes.
@@ -99,18 +123,7 @@ class CheckboxPathAnalyzer(BaseHeuristicCheck):
         Returns:
             Suspicion score for path linearity (0-1)
         """
-        score = self.scoring_function(
-            value=linearity,
-            min_value=self.config.min_linearity_threshold,
-            max_value=self.config.max_linearity_threshold,
-            min_score=0.8,
-            max_score=0.5,
-            min_of_min=0.6,   # min_linearity_threshold * 0.6  = 0.45
-            max_of_max=1.04,  # max_linearity_threshold * 1.04 = 0.988
-        )
-
-
-        return self.clamp_score_zero_to_one(score)
+        return self.clamp_score_zero_to_one(self.linearity_curve(linearity))
 
     def _analyze_avg_angle(self, avg_angle_degrees: float) -> float:
         """Analyze average angle between movements.
@@ -121,14 +134,90 @@ class CheckboxPathAnalyzer(BaseHeuristicCheck):
         Returns:
             Suspicion score for average angle (0-1)
         """
-        score = self.scoring_function(
-            value = avg_angle_degrees,
-            min_value = self.config.min_avg_angle_degrees,
-            max_value = self.config.max_avg_angle_degrees,
-            min_score = 0.5,
-            max_score = 0.8,
-            min_of_min = 0.5,
-            max_of_max = 1.5
+        return self.clamp_score_zero_to_one(self.avg_angle_curve(avg_angle_degrees))
+
+    def score_pairs(
+        self,
+        time_diff: np.ndarray,
+        linearity: np.ndarray,
+        avg_angle_degrees: np.ndarray,
+    ) -> np.ndarray:
+        """Score many checkbox pairs in one call.
+
+        Args:
+            time_diff: Array of time differences between clicks in seconds
+            linearity: Array of path linearity scores
+            avg_angle_degrees: Array of average angles between movements
+
+        Returns:
+            Array of pair suspicion scores (0-1)
+        """
+        timing_score = self.timing_curve.batch(time_diff)
+        linearity_score = self.linearity_curve.batch(linearity)
+        avg_angle_score = self.avg_angle_curve.batch(avg_angle_degrees)
+
+        return (
+            0.1 * np.clip(timing_score, 0.0, 1.0)
+            + 0.4 * np.clip(linearity_score, 0.0, 1.0)
+            + 0.5 * np.clip(avg_angle_score, 0.0, 1.0)
+        )
 
+    def score_batch(
+        self,
+        time_diff: np.ndarray,
+        linearity: np.ndarray,
+        movement_count: np.ndarray,
+        avg_angle_degrees: np.ndarray,
+        is_valid: np.ndarray,
+    ) -> np.ndarray:
+        """Score the checkbox pairs of many sessions in one call.
+
+        Pair features are 2D arrays of shape (sessions, pairs), padded with NaN
+        for sessions that have fewer pairs.
+
+        Args:
+            time_diff: Time differences between clicks in seconds
+            linearity: Path linearity scores
+            movement_count: Number of movements between checkboxes
+            avg_angle_degrees: Average angles between movements
+            is_valid: Per-session `is_valid` flags
+
+        Returns:
+            Array of per-session scores equal to calling the analyzer on each session
+        """
+        time_diff = np.atleast_2d(np.asarray(time_diff, dtype=np.float64))
+        linearity = np.atleast_2d(np.asarray(linearity, dtype=np.float64))
+        movement_count = np.atleast_2d(np.asarray(movement_count, dtype=np.float64))
+        avg_angle_degrees = np.atleast_2d(
+            np.asarray(avg_angle_degrees, dtype=np.float64)
+        )
+        is_valid = np.asarray(is_valid, dtype=bool)
+
+        too_low = movement_count < self.config.min_movement_count_too_low
+        analyzed = (
+            ~too_low
+            & ~np.isnan(movement_count)
+            & ~np.isnan(time_diff)
+            & ~np.isnan(linearity)
+        )
+        pair_scores = np.where(
+            analyzed,
+            self.score_pairs(time_diff, linearity, avg_angle_degrees),
+            np.where(too_low, 1.0, 0.0),
+        )
+
+        max_suspicion_score = (
+            pair_scores.max(axis=1) if pair_scores.shape[1] else np.zeros(len(is_valid))
+        )
+        return np.where(is_valid & analyzed.any(axis=1), max_suspicion_score, 1.0)
+
+    def score_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score flattened checkbox pair columns of many sessions."""
+        is_valid = np.nan_to_num(columns["is_valid"], nan=0.0) != 0
+        return self.score_batch(
+            time_diff=checkbox_pair_matrix(columns, "time_diff"),
+            linearity=checkbox_pair_matrix(columns, "path_linearity"),
+            movement_count=checkbox_pair_matrix(columns, "movement_count"),
+            avg_angle_degrees=checkbox_pair_matrix(columns, "avg_angle_degrees"),
+            is_valid=is_valid,
         )
-        return self.clamp_score_zero_to_one(score)
@@ -44,3 +44,4 @@ class CheckboxPathConfig(BaseModel):
         default=1.5,  # Increased weight as this is a key indicator
         description="Weight for checkbox path analysis",
     )
+    enabled: bool = Field(default=True, description="Whether the analysis is run")
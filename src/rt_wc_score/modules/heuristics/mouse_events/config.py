@@ -4,6 +4,7 @@ from pydantic import BaseModel, Field
 from .velocity import VelocityConfig
 from .movement_count import MovementCountConfig
 from .checkbox_path import CheckboxPathConfig
+from .replay import ReplayConfig
 
 
 class MouseEventConfig(BaseModel):
@@ -23,4 +24,8 @@ class MouseEventConfig(BaseModel):
         default_factory=CheckboxPathConfig,
         description="Checkbox path analysis configuration",
     )
+    replay: ReplayConfig = Field(
+        default_factory=ReplayConfig,
+        description="Replayed trajectory analysis configuration",
+    )
 
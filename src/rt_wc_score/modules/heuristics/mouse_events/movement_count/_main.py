@@ -1,8 +1,13 @@
 """Movement count analysis for mouse events."""
 import logging
+import math
+import numbers
 from typing import Dict, Any, Optional
 
+import numpy as np
+
 from .._base import BaseHeuristicCheck
+from .._curves import ScoreCurve
 
 from .config import MovementCountConfig
 
@@ -12,28 +17,83 @@ logger = logging.getLogger(__name__)
 class MovementCountAnalyzer(BaseHeuristicCheck):
     """Analyzes mouse movement count for bot detection."""
 
+    cost = 1
+    required_features = ("mouse_movement_count",)
+
     def __init__(self, config: Optional[MovementCountConfig] = None):
         """Initialize movement count analyzer."""
         self.config = config or MovementCountConfig()
+        # Movement counts are integers, so the curve gets a dense lookup table
+        # covering the whole scaled range.
+        max_of_max = 1.5
+        self.curve = ScoreCurve(
+            min_value=self.config.min_movement_count,
+            max_value=self.config.max_movement_count,
+            min_score=0.6,
+            max_score=0.65,
+            min_of_min=0.2,
+            max_of_max=max_of_max,
+            table_size=math.ceil(max_of_max * self.config.max_movement_count) + 1,
+        )
+        self.curves = {"movement_count": self.curve}
 
     def __call__(self, features: Dict[str, Any]) -> float:
         """Analyze movement count for bot detection."""
         try:
 
-            movement_count = features.get("mouse_movement_count", 0)
+            if math.isnan(self._movement_count(features)):
+                return 0.0
+            movement_count = features["mouse_movement_count"]
             if movement_count < self.config.min_movement_count_too_low:
                 return 1.0
-            score = self.scoring_function(
-                value = movement_count,
-                min_value=self.config.min_movement_count,
-                max_value=self.config.max_movement_count,
-                min_score=0.6,
-                max_score=0.65,
-                min_of_min=0.2,
-                max_of_max=1.5,
-            )
-            score = round(score, 5)
+            score = round(self.curve(movement_count), 5)
             return self.clamp_score_zero_to_one(score)
         except Exception as e:
             logger.error(f"Error in movement count analysis: {str(e)}")
             return 0.0
+
+    def is_decisive(self, features: Dict[str, Any]) -> bool:
+        """Too few movements settle the verdict without other checks."""
+        return self._movement_count(features) < self.config.min_movement_count_too_low
+
+    def _movement_count(self, features: Dict[str, Any]) -> float:
+        """Get the movement count, NaN if it is missing or not a number.
+
+        A missing count (e.g. after the movement processor failed) is no
+        evidence either way: it scores 0.0 and does not veto, in the scalar and
+        columnar paths alike.
+        """
+        movement_count = features.get("mouse_movement_count")
+        if isinstance(movement_count, numbers.Real):
+            return float(movement_count)
+        return math.nan
+
+    def score_batch(self, movement_count: np.ndarray) -> np.ndarray:
+        """Score movement counts of many sessions in one call.
+
+        Missing counts (NaN) score 0.0 and do not veto, like a missing count in
+        a single session.
+
+        Args:
+            movement_count: Array of `mouse_movement_count` values
+
+        Returns:
+            Array of scores equal to calling the analyzer on each session
+        """
+        movement_count = np.asarray(movement_count, dtype=np.float64)
+        score = self.round_array(self.curve.batch(movement_count), 5)
+        score = np.where(
+            movement_count < self.config.min_movement_count_too_low,
+            1.0,
+            np.clip(score, 0.0, 1.0),
+        )
+        return np.where(np.isnan(movement_count), 0.0, score)
+
+    def score_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score movement count feature columns of many sessions."""
+        return self.score_batch(columns["mouse_movement_count"])
+
+    def decisive_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Array version of `is_decisive` over feature columns."""
+        movement_count = columns["mouse_movement_count"]
+        return movement_count < self.config.min_movement_count_too_low
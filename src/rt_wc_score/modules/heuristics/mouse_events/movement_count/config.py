@@ -17,4 +17,5 @@ class MovementCountConfig(BaseModel):
         default=700, description="Maximum expected mouse movements"
     )
     weight: float = Field(default=0.8, description="Weight for movement count analysis")
+    enabled: bool = Field(default=True, description="Whether the analysis is run")
 
@@ -0,0 +1 @@
+from ._main import ReplayAnalyzer, ReplayConfig
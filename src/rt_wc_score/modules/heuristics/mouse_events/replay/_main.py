@@ -0,0 +1,81 @@
+"""Replayed trajectory analysis for mouse events."""
+
+import math
+import logging
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from .._base import BaseHeuristicCheck
+from .config import ReplayConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayAnalyzer(BaseHeuristicCheck):
+    """Scores how closely a session's trajectory replays a prior session's.
+
+    The similarity is engineered by `TrajectoryReplayProcessor` from an index
+    of the traces seen before. The score rises linearly from 0 at
+    `min_similarity` to 1 at `max_similarity`.
+    """
+
+    cost = 1
+    required_features = ("mouse_replay_similarity",)
+
+    def __init__(self, config: Optional[ReplayConfig] = None):
+        """Initialize replay analyzer."""
+        self.config = config or ReplayConfig()
+
+    def __call__(self, features: Dict[str, Any]) -> float:
+        """Analyze the similarity to prior trajectories for bot detection."""
+        try:
+            similarity = features.get("mouse_replay_similarity", 0.0)
+            if similarity is None or math.isnan(similarity):
+                return 0.0
+            return float(self.score_batch(np.array([similarity]))[0])
+        except Exception as e:
+            logger.error(f"Error in replay analysis: {str(e)}")
+            return 0.0
+
+    def is_decisive(self, features: Dict[str, Any]) -> bool:
+        """A near-identical prior trajectory settles the verdict, if configured."""
+        similarity = features.get("mouse_replay_similarity", 0.0)
+        try:
+            return (
+                self.config.veto_similarity is not None
+                and similarity >= self.config.veto_similarity
+            )
+        except TypeError:
+            return False
+
+    def score_batch(self, similarity: np.ndarray) -> np.ndarray:
+        """Score similarities of many sessions in one call.
+
+        Missing similarities (NaN) score 0.0, like a failed single-session
+        analysis.
+
+        Args:
+            similarity: Array of `mouse_replay_similarity` values
+
+        Returns:
+            Array of scores equal to calling the analyzer on each session
+        """
+        similarity = np.asarray(similarity, dtype=np.float64)
+        span = max(self.config.max_similarity - self.config.min_similarity, 1e-9)
+        with np.errstate(invalid="ignore"):
+            score = np.clip((similarity - self.config.min_similarity) / span, 0.0, 1.0)
+        score = self.round_array(score, 5)
+        return np.where(np.isnan(similarity), 0.0, score)
+
+    def score_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score replay similarity feature columns of many sessions."""
+        return self.score_batch(columns["mouse_replay_similarity"])
+
+    def decisive_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Array version of `is_decisive` over feature columns."""
+        similarity = columns["mouse_replay_similarity"]
+        if self.config.veto_similarity is None:
+            return np.zeros(len(similarity), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            return similarity >= self.config.veto_similarity
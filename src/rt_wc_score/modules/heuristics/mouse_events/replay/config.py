@@ -0,0 +1,31 @@
+"""Configuration for replayed trajectory analysis."""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ReplayConfig(BaseModel):
+    class Config:
+        """Pydantic configuration."""
+        frozen = True
+    min_similarity: float = Field(
+        default=0.5,
+        description="Similarity to a prior trace from which the score rises",
+    )
+    max_similarity: float = Field(
+        default=0.8,
+        description="Similarity to a prior trace from which the score is 1",
+    )
+    veto_similarity: Optional[float] = Field(
+        default=None,
+        description="Similarity settling the verdict without other checks",
+    )
+    weight: float = Field(default=1.0, description="Weight for replay analysis")
+    enabled: bool = Field(
+        default=False,
+        description=(
+            "Whether the analysis is run; it keeps an index of the traces of "
+            "prior sessions in memory"
+        ),
+    )
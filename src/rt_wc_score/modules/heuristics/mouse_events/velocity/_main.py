@@ -4,6 +4,7 @@ import math
 import logging
 from typing import Dict, Any, Optional
 from .._base import BaseHeuristicCheck
+from .._curves import ScoreCurve
 from .config import VelocityConfig
 import numpy as np
 
@@ -13,23 +14,15 @@ logger = logging.getLogger(__name__)
 class VelocityAnalyzer(BaseHeuristicCheck):
     """Analyzes mouse velocity patterns for bot detection."""
 
+    cost = 2
+    required_features = ("mouse_movement_stddev_velocity",)
+
     def __call__(self, features: Dict[str, Any]) -> float:
         """Analyze velocity features for bot detection."""
         try:
 
             stddev_velocity = features.get("mouse_movement_stddev_velocity", 0.0)
-            score = round(
-                self.scoring_function(
-                    value=stddev_velocity,
-                    min_value= self.config.min_velocity_variation,
-                    max_value= self.config.max_velocity_variation,
-                    min_score= 0.6,
-                    max_score= 0.4,
-                    min_of_min=0.3,
-                    max_of_max=1.5
-                ),
-                5,
-            )
+            score = round(self.curve(stddev_velocity), 5)
             return self.clamp_score_zero_to_one(score)
 
         except Exception as e:
@@ -39,5 +32,30 @@ class VelocityAnalyzer(BaseHeuristicCheck):
     def __init__(self, config: Optional[VelocityConfig] = None):
         """Initialize velocity analyzer."""
         self.config = config or VelocityConfig()
+        self.curve = ScoreCurve(
+            min_value=self.config.min_velocity_variation,
+            max_value=self.config.max_velocity_variation,
+            min_score=0.6,
+            max_score=0.4,
+            min_of_min=0.3,
+            max_of_max=1.5,
+        )
+        self.curves = {"stddev_velocity": self.curve}
+
+    def score_batch(self, stddev_velocity: np.ndarray) -> np.ndarray:
+        """Score velocity standard deviations of many sessions in one call.
+
+        Args:
+            stddev_velocity: Array of `mouse_movement_stddev_velocity` values
+
+        Returns:
+            Array of scores equal to calling the analyzer on each session
+        """
+        score = self.round_array(self.curve.batch(stddev_velocity), 5)
+        return np.clip(score, 0.0, 1.0)
+
+    def score_columns(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score velocity feature columns of many sessions."""
+        return self.score_batch(columns["mouse_movement_stddev_velocity"])
 
 
@@ -16,4 +16,5 @@ class VelocityConfig(BaseModel):
         description="Maximum expected velocity standard deviation",
     )
     weight: float = Field(default=1.0, description="Weight for velocity analysis")
+    enabled: bool = Field(default=True, description="Whether the analysis is run")
 
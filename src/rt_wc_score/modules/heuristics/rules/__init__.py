@@ -0,0 +1,2 @@
+from ._main import Rule, RuleEngine
+from .config import RuleConfig
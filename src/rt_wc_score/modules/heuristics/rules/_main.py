@@ -0,0 +1,376 @@
+"""Rule combination engine for heuristic analyzers."""
+
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .config import RuleConfig
+from ..mouse_events._base import round_array
+
+logger = logging.getLogger(__name__)
+
+
+class Rule(NamedTuple):
+    """A named heuristic check with its weight in the final score."""
+
+    name: str
+    check: Any
+    weight: float
+
+
+class RuleEngine:
+    """Evaluates heuristic rules and combines their scores.
+
+    Rules run in order of their check's `cost`, and decisive rules (veto)
+    settle the verdict on their own. With `early_exit` and a score threshold
+    set, the engine also stops as soon as the rules left cannot move the
+    combined score across the threshold; the verdict is then known but the
+    combined score only within `bounds`.
+    """
+
+    def __init__(
+        self,
+        config: Optional[RuleConfig] = None,
+        score_threshold: Optional[float] = None,
+    ):
+        """Initialize the rule engine.
+
+        Args:
+            config: Configuration for rule combination
+            score_threshold: Threshold for bot classification; early exit is only
+                possible when it is given
+        """
+        self.config = config or RuleConfig()
+        self.score_threshold = score_threshold
+
+    def evaluate(
+        self, rules: List[Rule], features: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Evaluate rules cheapest first, skipping those that cannot matter.
+
+        Args:
+            rules: Rules to evaluate
+            features: Dictionary of engineered features
+
+        Returns:
+            Dictionary of rule name to score and weight, in the order of `rules`.
+            Rules that were not run are marked with `skipped` and have no score,
+            and a vetoing rule is marked with `veto`.
+        """
+        ordered = sorted(rules, key=lambda rule: getattr(rule.check, "cost", 1))
+        remaining_weight = sum(rule.weight for rule in ordered)
+        results: Dict[str, Dict[str, Any]] = {}
+        evaluated = 0
+
+        for rule in ordered:
+            if self._is_decided(results, remaining_weight, evaluated):
+                break
+
+            score = rule.check(features)
+            results[rule.name] = {"score": score, "weight": rule.weight}
+            remaining_weight -= rule.weight
+            evaluated += 1
+
+            if self.config.use_veto_rules and self._is_veto(rule, features):
+                results[rule.name]["veto"] = True
+                break
+
+        for rule in ordered:
+            if rule.name not in results:
+                results[rule.name] = {
+                    "score": None,
+                    "weight": rule.weight,
+                    "skipped": True,
+                }
+
+        return {rule.name: results[rule.name] for rule in rules}
+
+    def combine(self, scores: Dict[str, Dict[str, Any]]) -> float:
+        """Combine rule scores into a single bot-likeness score.
+
+        Args:
+            scores: Dictionary containing scores and weights
+
+        Returns:
+            Combined score (0-1, higher = more bot-like)
+        """
+        if self.config.use_veto_rules and any(
+            rule_scores.get("veto") for rule_scores in scores.values()
+        ):
+            return 1.0
+
+        total_weight, weighted_sum, max_score = self._accumulate(scores)
+
+        if self.config.combination_method == "max":
+            return max_score
+
+        if total_weight == 0:
+            return 0.0
+
+        return weighted_sum / total_weight
+
+    def bounds(self, scores: Dict[str, Dict[str, Any]]) -> Tuple[float, float]:
+        """Get the range of the combined score over the outcomes of skipped rules.
+
+        Args:
+            scores: Dictionary containing scores and weights, as returned by
+                `evaluate`
+
+        Returns:
+            Lowest and highest combined score, with every skipped rule scoring
+            anywhere in [0, 1]
+        """
+        remaining_weight = sum(
+            rule_scores.get("weight", 0)
+            for rule_scores in scores.values()
+            if rule_scores.get("skipped")
+        )
+        if remaining_weight <= 0:
+            combined = self.combine(scores)
+            return combined, combined
+        return self._bounds(scores, remaining_weight)
+
+    def evaluate_columns(
+        self,
+        rules: List[Rule],
+        columns: Dict[str, np.ndarray],
+        early_exit: Optional[bool] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Array version of `evaluate` for feature columns of many sessions.
+
+        Rules are run cheapest first on the sessions that are not decided yet,
+        so every session ends up with the same rules run, skipped and vetoed as
+        with `evaluate`.
+
+        Args:
+            rules: Rules to evaluate
+            columns: Feature columns, as built by `to_feature_columns`
+            early_exit: Whether to skip rules that cannot change the verdict;
+                the configured `early_exit` if None
+
+        Returns:
+            Dictionary of rule name to per-session `score` (NaN if skipped),
+            `skipped` and `veto` arrays and the rule `weight`, in the order of
+            `rules`
+        """
+        size = len(next(iter(columns.values()), ()))
+        ordered = sorted(rules, key=lambda rule: getattr(rule.check, "cost", 1))
+        remaining_weight = sum(rule.weight for rule in ordered)
+        results: Dict[str, Dict[str, Any]] = {
+            rule.name: {
+                "score": np.full(size, np.nan),
+                "weight": rule.weight,
+                "skipped": np.ones(size, dtype=bool),
+                "veto": np.zeros(size, dtype=bool),
+            }
+            for rule in ordered
+        }
+        active = np.ones(size, dtype=bool)
+        evaluated = 0
+
+        for rule in ordered:
+            # Accumulated in evaluation order, like `evaluate`
+            evaluated_results = {
+                name: results[name] for name in list(results)[:evaluated]
+            }
+            if early_exit is not False:
+                active &= ~self._is_decided_columns(
+                    evaluated_results, remaining_weight, evaluated, size
+                )
+            if not active.any():
+                break
+
+            active_columns = {name: values[active] for name, values in columns.items()}
+            result = results[rule.name]
+            result["score"][active] = rule.check.score_columns(active_columns)
+            result["skipped"][active] = False
+            remaining_weight -= rule.weight
+            evaluated += 1
+
+            if self.config.use_veto_rules:
+                result["veto"][active] = rule.check.decisive_columns(active_columns)
+                active &= ~result["veto"]
+
+        return {rule.name: results[rule.name] for rule in rules}
+
+    def combine_columns(self, scores: Dict[str, Dict[str, Any]]) -> np.ndarray:
+        """Array version of `combine` for per-session score arrays.
+
+        Args:
+            scores: Dictionary of rule name to per-session `score` and optional
+                `skipped` and `veto` arrays and the rule `weight`
+
+        Returns:
+            Array of combined scores (0-1, higher = more bot-like)
+        """
+        if not scores:
+            return np.zeros(0)
+
+        size = len(next(iter(scores.values()))["score"])
+        total_weight, weighted_sum, max_score, veto = self._accumulate_columns(
+            scores, size
+        )
+
+        if self.config.combination_method == "max":
+            combined = max_score
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                combined = np.where(total_weight == 0, 0.0, weighted_sum / total_weight)
+
+        if self.config.use_veto_rules:
+            combined = np.where(veto, 1.0, combined)
+        return combined
+
+    def bounds_columns(
+        self, scores: Dict[str, Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Array version of `bounds`, ignoring vetoes."""
+        size = len(next(iter(scores.values()))["score"])
+        remaining_weight = np.zeros(size)
+        for rule_scores in scores.values():
+            skipped = np.asarray(rule_scores.get("skipped", False), dtype=bool)
+            remaining_weight = remaining_weight + skipped * rule_scores["weight"]
+        lowest, highest = self._bounds_columns(scores, remaining_weight, size)
+        return lowest, np.where(remaining_weight > 0, highest, lowest)
+
+    def _accumulate_columns(
+        self, scores: Dict[str, Dict[str, Any]], size: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Array version of `_accumulate`, also collecting vetoes."""
+        total_weight = np.zeros(size)
+        weighted_sum = np.zeros(size)
+        max_score = np.zeros(size)
+        veto = np.zeros(size, dtype=bool)
+
+        for rule_scores in scores.values():
+            ran = ~np.asarray(rule_scores.get("skipped", False), dtype=bool)
+            score = np.asarray(rule_scores["score"], dtype=np.float64)
+            weight = rule_scores["weight"]
+
+            weighted_sum = np.where(ran, weighted_sum + score * weight, weighted_sum)
+            total_weight = np.where(ran, total_weight + weight, total_weight)
+            if weight > 0:
+                max_score = np.where(ran, np.maximum(max_score, score), max_score)
+            veto |= ran & np.asarray(rule_scores.get("veto", False), dtype=bool)
+
+        return total_weight, weighted_sum, max_score, veto
+
+    def _is_decided_columns(
+        self,
+        results: Dict[str, Dict[str, Any]],
+        remaining_weight: float,
+        evaluated: int,
+        size: int,
+    ) -> np.ndarray:
+        """Array version of `_is_decided`."""
+        if (
+            self.score_threshold is None
+            or not self.config.early_exit
+            or evaluated < self.config.min_rules_required
+            or remaining_weight <= 0
+        ):
+            return np.zeros(size, dtype=bool)
+
+        lowest, highest = self._bounds_columns(results, remaining_weight, size)
+        return self.is_bot_columns(lowest) == self.is_bot_columns(highest)
+
+    def _bounds_columns(
+        self,
+        results: Dict[str, Dict[str, Any]],
+        remaining_weight: Union[float, np.ndarray],
+        size: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Array version of `_bounds`."""
+        total_weight, weighted_sum, max_score, _ = self._accumulate_columns(
+            results, size
+        )
+        if self.config.combination_method == "max":
+            return max_score, np.ones(size)
+
+        total_weight = total_weight + remaining_weight
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lowest = np.where(total_weight == 0, 0.0, weighted_sum / total_weight)
+            highest = np.where(
+                total_weight == 0, 0.0, (weighted_sum + remaining_weight) / total_weight
+            )
+        return lowest, highest
+
+    def _accumulate(
+        self, scores: Dict[str, Dict[str, Any]]
+    ) -> Tuple[float, float, float]:
+        """Sum weights and weighted scores and track the max of evaluated rules."""
+        total_weight = 0
+        weighted_sum = 0
+        max_score = 0.0
+
+        for rule_scores in scores.values():
+            if rule_scores.get("skipped"):
+                continue
+            score = rule_scores.get("score", 0)
+            weight = rule_scores.get("weight", 0)
+
+            weighted_sum += score * weight
+            total_weight += weight
+            if weight > 0:
+                max_score = max(max_score, score)
+
+        return total_weight, weighted_sum, max_score
+
+    def _is_veto(self, rule: Rule, features: Dict[str, Any]) -> bool:
+        """Check whether a rule settles the verdict on its own."""
+        is_decisive = getattr(rule.check, "is_decisive", None)
+        return bool(is_decisive and is_decisive(features))
+
+    def _is_decided(
+        self,
+        results: Dict[str, Dict[str, Any]],
+        remaining_weight: float,
+        evaluated: int,
+    ) -> bool:
+        """Check whether the remaining rules can still change the verdict.
+
+        If both bounds of the combined score give the same verdict the
+        remaining rules are skipped.
+        """
+        if (
+            self.score_threshold is None
+            or not self.config.early_exit
+            or evaluated < self.config.min_rules_required
+            or remaining_weight <= 0
+        ):
+            return False
+
+        lowest, highest = self._bounds(results, remaining_weight)
+        return self.is_bot(lowest) == self.is_bot(highest)
+
+    def _bounds(
+        self, results: Dict[str, Dict[str, Any]], remaining_weight: float
+    ) -> Tuple[float, float]:
+        """Bound the combined score given the weight of the rules left to run.
+
+        Remaining scores are bounded by [0, 1], which bounds the combined score.
+        """
+        total_weight, weighted_sum, max_score = self._accumulate(results)
+        if self.config.combination_method == "max":
+            return max_score, 1.0
+
+        total_weight += remaining_weight
+        lowest = weighted_sum / total_weight
+        highest = (weighted_sum + remaining_weight) / total_weight
+        return lowest, highest
+
+    def is_bot(self, combined_score: float) -> bool:
+        """Get the verdict for a combined score.
+
+        Args:
+            combined_score: Combined score (higher = more bot-like)
+
+        Returns:
+            True if the final score falls below the score threshold
+        """
+        return round(1 - combined_score, 5) < self.score_threshold
+
+    def is_bot_columns(self, combined_scores: np.ndarray) -> np.ndarray:
+        """Array version of `is_bot`."""
+        return round_array(1 - np.asarray(combined_scores), 5) < self.score_threshold
@@ -1,5 +1,7 @@
 """Configuration for rule combination."""
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -9,13 +11,20 @@ class RuleConfig(BaseModel):
         """ Pydantic configuration."""
         frozen = True
 
-    combination_method: str = Field(
+    combination_method: Literal["weighted_average", "max"] = Field(
         default="weighted_average", description="Method to combine individual scores"
     )
     min_rules_required: int = Field(
         default=2, description="Minimum number of rules needed for valid classification"
     )
-    confidence_threshold: float = Field(
-        default=0.7, description="Minimum confidence needed for classification"
+    use_veto_rules: bool = Field(
+        default=True,
+        description="Let decisive rules settle the verdict on their own",
+    )
+    early_exit: bool = Field(
+        default=False,
+        description=(
+            "Skip remaining rules once they cannot change the verdict; the "
+            "final score of such sessions is then only known within a range"
+        ),
     )
-
@@ -1,2 +1,9 @@
 from ._main import Preprocessor
 from .config import PreprocessorConfig
+from .feature_engineer import TrajectoryIndex
+from .json_flattener import (
+    InputRejectedError,
+    decode_payload,
+    encode_payload,
+    is_binary_payload,
+)
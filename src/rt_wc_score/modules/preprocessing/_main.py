@@ -1,11 +1,13 @@
 """Main preprocessing module combining flattening and feature engineering."""
 
+import time
 import logging
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Iterable, Optional, Union
 
-from .json_flattener import JsonDataFlattener
-from .feature_engineer import FeatureEngineer
+from .json_flattener import InputRejectedError, JsonDataFlattener
+from .feature_engineer import FeatureEngineer, TrajectoryIndex
 from .config import PreprocessorConfig
+from ...telemetry import STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -13,31 +15,55 @@ logger = logging.getLogger(__name__)
 class Preprocessor:
     """Main preprocessing class that handles data flattening and feature engineering."""
 
-    def __init__(self, config: Optional[PreprocessorConfig] = None):
+    def __init__(
+        self,
+        config: Optional[PreprocessorConfig] = None,
+        required_features: Optional[Iterable[str]] = None,
+        replay_index: Optional[TrajectoryIndex] = None,
+    ):
         """Initialize the preprocessor with configurations.
 
         Args:
             config: Configuration for preprocessing pipeline
+            required_features: Names of the features needed downstream; only the
+                processors producing them are run. If None, all are run.
+            replay_index: Index of prior traces for replay detection; a new
+                empty index if None
         """
         self.config = config or PreprocessorConfig()
 
         # Initialize sub-processors
         self.flattener = JsonDataFlattener(config=self.config.flattener)
-        self.feature_engineer = FeatureEngineer(config=self.config.feature_engineer)
+        self.feature_engineer = FeatureEngineer(
+            config=self.config.feature_engineer,
+            required_features=required_features,
+            replay_index=replay_index,
+        )
+        self._flatten_seconds = STAGE_SECONDS.labels(stage="flatten")
 
-    def __call__(self, data: Union[str, Dict]) -> Optional[Dict[str, Any]]:
+    def __call__(
+        self, data: Union[str, bytes, Dict], deadline: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
         """Process input data through flattening and feature engineering.
 
         Args:
-            data: Input data either as JSON string or dictionary
+            data: Input data as JSON string, binary payload or dictionary
+            deadline: `time.monotonic()` time by which the features are needed;
+                expensive processors are sampled if needed to meet it
 
         Returns:
-            Dictionary containing engineered features or None if processing fails
+            Dictionary containing engineered features, with the `degradations`
+            applied to meet the deadline, or None if processing fails
+
+        Raises:
+            InputRejectedError: If the input exceeds a configured size limit
         """
         try:
             # Step 1: Flatten the data
             logger.info("Flattening input data...")
+            start = time.perf_counter()
             flattened_data = self.flattener(data)
+            self._flatten_seconds.observe(time.perf_counter() - start)
 
             if flattened_data is None:
                 logger.error("Failed to flatten input data")
@@ -45,15 +71,21 @@ class Preprocessor:
 
             # Step 2: Engineer features
             logger.info("Engineering features...")
-            features = self.feature_engineer(flattened_data)
+            features, degradations = self.feature_engineer.process(
+                flattened_data, deadline=deadline
+            )
 
             if not features:
                 logger.error("Failed to engineer features")
                 return None
             features["user_id"] = flattened_data["user_id"]
             features["project_id"] = flattened_data["project_id"]
+            features["degradations"] = degradations
             return features
 
+        except InputRejectedError:
+            raise
+
         except Exception as e:
             logger.error(f"Error during preprocessing: {str(e)}", exc_info=True)
             return None
@@ -1,3 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from ._main import FeatureEngineer
+from ._sketch import QuantileSketch
+from .mouse_events import TrajectoryIndex
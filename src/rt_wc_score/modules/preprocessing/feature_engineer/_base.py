@@ -1,14 +1,255 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from datetime import datetime
+from typing import Dict, List, Any, NamedTuple, Optional, Set
 
 import numpy as np
+from dateutil.parser import parse
+
+
+logger = logging.getLogger(__name__)
 
 
 class BaseFeatureEngineer(ABC):
     """Abstract base class for feature engineering processors."""
 
+    # Whether the features depend on the data processed before, e.g. through
+    # an index of prior sessions; such processors only run when required
+    stateful: bool = False
+
     @abstractmethod
     def __call__(self, data: Any) -> Dict[str, Any]:
         """Process the input data and return computed features."""
         pass
+
+    @property
+    def produces(self) -> Set[str]:
+        """Names of the features this processor produces."""
+        feature_names = self.config.processing.feature_names
+        return set(feature_names.values())
+
+
+class DegradableFeatureEngineer(BaseFeatureEngineer):
+    """Feature processor whose cost grows with the number of input events.
+
+    Such processors accept `max_events` to bound their cost by looking at a
+    sample of the events, giving approximate features instead of exact ones.
+    """
+
+    @abstractmethod
+    def __call__(self, data: Any, max_events: Optional[int] = None) -> Dict[str, Any]:
+        """Process the input data, sampling at most `max_events` events."""
+        pass
+
+    @abstractmethod
+    def count_events(self, data: Any) -> int:
+        """Number of events the processing cost grows with."""
+        pass
+
+    def estimate_cost(self, data: Any) -> float:
+        """Estimate the seconds needed to process the data without sampling."""
+        return self.count_events(data) * self.config.seconds_per_event
+
+    def _estimate_movement_cost(self, movements: Any) -> float:
+        """Estimate the cost of movements, which is far lower for a decoded
+        `MovementTrace` than for a list of events."""
+        if isinstance(movements, MovementTrace):
+            return len(movements.t) * self.config.seconds_per_trace_event
+        return count_movements(movements) * self.config.seconds_per_event
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse a date string into a datetime.
+
+    ISO 8601 strings go through `datetime.fromisoformat` first and only fall back
+    to `dateutil` for anything it does not understand, which keeps the common
+    case off the slow generic parser.
+
+    Args:
+        value: Date string
+
+    Returns:
+        Parsed datetime
+
+    Raises:
+        ValueError: If the string cannot be parsed
+        TypeError: If the value is not a string
+    """
+    try:
+        if value.endswith("Z"):
+            return datetime.fromisoformat(value[:-1] + "+00:00")
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError, AttributeError):
+        pass
+    return parse(value)
+
+
+def parse_timestamp(value: Any) -> float:
+    """Parse a timestamp into seconds since epoch.
+
+    Args:
+        value: Timestamp as number (seconds) or date string
+
+    Returns:
+        Timestamp in seconds, or NaN if it cannot be parsed
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return parse_datetime(value).timestamp()
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.error(f"Error parsing timestamp {value}: {str(e)}")
+        return np.nan
+
+
+def parse_timestamps(events: List[Dict], field: str = "timestamp") -> np.ndarray:
+    """Parse the timestamp field of a list of events into a float array.
+
+    Args:
+        events: List of event dictionaries
+        field: Name of the timestamp field
+
+    Returns:
+        Array of timestamps in seconds (NaN for missing or invalid values)
+    """
+    return np.fromiter(
+        (
+            parse_timestamp(event.get(field)) if event is not None else np.nan
+            for event in events
+        ),
+        dtype=np.float64,
+        count=len(events),
+    )
+
+
+class MovementTrace(NamedTuple):
+    """Mouse movement trace as time-sorted coordinate and timestamp arrays.
+
+    Timestamps are seconds; coordinates may be stored in a compact dtype
+    such as int32 or float32, so processors compute their differences with
+    `differences` rather than in the storage dtype.
+
+    A trace may end with NaN rows standing for events without coordinates or
+    a valid timestamp, followed by rows with a NaN timestamp and infinite
+    coordinates standing for null events. They keep the trace's count of
+    events; processors that reject traces with invalid events check
+    `has_invalid_events`, which ignores null events, the others drop both
+    through `to_movement_trace`, as with lists of events.
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    t: np.ndarray
+
+
+def to_movement_trace(
+    movements: Any, fields: Optional[Dict[str, str]] = None
+) -> MovementTrace:
+    """Convert mouse movement events into a time-sorted `MovementTrace`.
+
+    Events with missing coordinates or unparsable timestamps are dropped.
+
+    Args:
+        movements: List of movement events or an existing `MovementTrace`
+        fields: Field names for x, y and timestamp in the movement events
+
+    Returns:
+        Movement trace sorted by timestamp
+    """
+    if isinstance(movements, MovementTrace):
+        if has_invalid_events(movements):
+            stop = int(np.argmax(np.isnan(movements.t)))
+            return slice_movements(movements, slice(0, stop))
+        return movements
+
+    fields = fields or {"x": "x", "y": "y", "timestamp": "timestamp"}
+    valid_movements = [
+        m
+        for m in movements or []
+        if m is not None
+        and m.get(fields["x"]) is not None
+        and m.get(fields["y"]) is not None
+    ]
+    x = np.array([m[fields["x"]] for m in valid_movements], dtype=np.float64)
+    y = np.array([m[fields["y"]] for m in valid_movements], dtype=np.float64)
+    t = parse_timestamps(valid_movements, fields["timestamp"])
+
+    valid = ~np.isnan(t)
+    order = np.argsort(t[valid], kind="stable")
+    return MovementTrace(x=x[valid][order], y=y[valid][order], t=t[valid][order])
+
+
+def has_invalid_events(trace: MovementTrace) -> bool:
+    """Whether a trace ends with NaN rows of invalid events, before any rows
+    of null events."""
+    trace = drop_null_events(trace)
+    return bool(trace.t.size) and bool(np.isnan(trace.t[-1]))
+
+
+def drop_null_events(trace: MovementTrace) -> MovementTrace:
+    """Drop the rows of null events ending a trace, without copying it."""
+    stop = len(trace.t)
+    while stop and np.isnan(trace.t[stop - 1]) and np.isinf(trace.x[stop - 1]):
+        stop -= 1
+    return trace if stop == len(trace.t) else slice_movements(trace, slice(0, stop))
+
+
+def differences(values: np.ndarray) -> np.ndarray:
+    """Get the differences of consecutive values as float64, without
+    converting the values first nor overflowing a compact integer dtype."""
+    return np.subtract(values[1:], values[:-1], dtype=np.float64)
+
+
+def count_movements(movements: Any) -> int:
+    """Get the number of movements in a list of events or a `MovementTrace`."""
+    if isinstance(movements, MovementTrace):
+        return len(movements.t)
+    return len(movements or [])
+
+
+def slice_movements(movements: Any, index: slice) -> Any:
+    """Slice a list of movement events or a `MovementTrace`, without copying
+    the arrays of a trace."""
+    if isinstance(movements, MovementTrace):
+        return MovementTrace(
+            x=movements.x[index], y=movements.y[index], t=movements.t[index]
+        )
+    return (movements or [])[index]
+
+
+def sample_stride(count: int, max_events: Optional[int]) -> int:
+    """Get the stride that keeps at most `max_events` of `count` events.
+
+    Args:
+        count: Number of events
+        max_events: Maximum number of events to keep, or None to keep all
+
+    Returns:
+        Stride of at least 1
+    """
+    if max_events is None or count <= max_events:
+        return 1
+    return -(-count // max(max_events, 1))
+
+
+def sample_blocks(count: int, max_events: int, block_size: int) -> List[slice]:
+    """Select evenly spread blocks of consecutive events.
+
+    Unlike a strided sample, consecutive events stay neighbours, so local
+    quantities such as the speed between two movements keep their distribution.
+
+    Args:
+        count: Number of events
+        max_events: Maximum number of events to keep
+        block_size: Number of consecutive events per block
+
+    Returns:
+        Slices of the selected blocks, in order
+    """
+    if count <= max_events:
+        return [slice(0, count)]
+
+    block_size = max(min(block_size, max_events), 2)
+    n_blocks = max(max_events // block_size, 1)
+    starts = np.linspace(0, count - block_size, n_blocks).astype(np.int64)
+    return [slice(int(start), int(start) + block_size) for start in starts]
@@ -1,13 +1,18 @@
 """Feature engineering module for processing mouse and keyboard events."""
 
+import time
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from .mouse_events import MouseMovementProcessor
 from .mouse_events import MouseDownUpProcessor
-from .keyboard_events import KeyboardEventsProcessor
+from .mouse_events import MouseClickProcessor
+from .mouse_events import TrajectoryIndex, TrajectoryReplayProcessor
+from .keyboard_events import KeyboardEventsProcessor, DigraphLatencyProcessor
 from .checkboxes import CheckboxEventProcessor
 from .config import FeatureEngineerConfig
+from ._base import BaseFeatureEngineer, DegradableFeatureEngineer
+from ....telemetry import DEGRADATIONS, STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +20,21 @@ logger = logging.getLogger(__name__)
 class FeatureEngineer:
     """Coordinates the processing of all mouse and keyboard features."""
 
-    def __init__(self, config: Optional[FeatureEngineerConfig] = None):
+    def __init__(
+        self,
+        config: Optional[FeatureEngineerConfig] = None,
+        required_features: Optional[Iterable[str]] = None,
+        replay_index: Optional[TrajectoryIndex] = None,
+    ):
         """Initialize feature engineering processors.
 
         Args:
             config: Configuration for feature engineering. If None, uses defaults.
+            required_features: Names of the features that are actually read
+                downstream. Only processors producing at least one of them are
+                run. If None, all processors are run except stateful ones.
+            replay_index: Index of prior traces for the replay processor; a new
+                empty index if None
         """
         self.config = config or FeatureEngineerConfig()
 
@@ -29,8 +44,28 @@ class FeatureEngineer:
         self.mouse_down_up_processor = MouseDownUpProcessor(
             config=self.config.mouse_down_up
         )
+        self.mouse_click_processor = MouseClickProcessor(config=self.config.mouse_click)
         self.keyboard_processor = KeyboardEventsProcessor(config=self.config.keyboard)
+        self.digraph_processor = DigraphLatencyProcessor(config=self.config.digraph)
         self.checkbox_processor = CheckboxEventProcessor(config=self.config.checkbox)
+        self.replay_processor = TrajectoryReplayProcessor(
+            config=self.config.replay, index=replay_index
+        )
+
+        stages = [
+            (self.mouse_movement_processor, self._get_mouse_movement_data),
+            (self.mouse_down_up_processor, self._get_mouse_down_up_data),
+            (self.mouse_click_processor, self._get_mouse_click_data),
+            (self.keyboard_processor, self._get_keyboard_data),
+            (self.digraph_processor, self._get_digraph_data),
+            (self.checkbox_processor, self._get_checkbox_data),
+            (self.replay_processor, self._get_replay_data),
+        ]
+        self.stages = self._resolve_stages(stages, required_features)
+        self._stage_seconds = [
+            STAGE_SECONDS.labels(stage=type(processor).__name__)
+            for processor, _ in self.stages
+        ]
 
     def __call__(self, data: Dict[str, List[Dict]]) -> Dict[str, Any]:
         """Process input data and engineer features.
@@ -41,36 +76,182 @@ class FeatureEngineer:
         Returns:
             Dictionary containing engineered features
         """
+        return self.process(data)[0]
+
+    def process(
+        self, data: Dict[str, List[Dict]], deadline: Optional[float] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Engineer features, sampling expensive processors to meet a deadline.
+
+        The cost of each processor that supports sampling is estimated from its
+        event count up front. If all of them together would overrun the time
+        left, each is given the same share of its events that fits, but never
+        fewer than `budget.min_events`.
+
+        Args:
+            data: Dictionary containing mouse and keyboard event data
+            deadline: `time.monotonic()` time by which the features are needed
+
+        Returns:
+            Engineered features, and the degradations applied: one dictionary
+            per sampled processor with its name, event count and `max_events`
+        """
         try:
-            mouse_movement_results = self.mouse_movement_processor(
-                data.get(self.config.mouse_movement.input_field, [])
-            )
+            inputs = [get_input(data) for _, get_input in self.stages]
+            plan = self._plan_sampling(inputs, deadline)
 
-            mouse_down_up_data = {
-                self.config.mouse_down_up.down_field: data.get(
-                    self.config.mouse_down_up.down_field, []
-                ),
-                self.config.mouse_down_up.up_field: data.get(
-                    self.config.mouse_down_up.up_field, []
-                ),
-            }
-            mouse_down_up_results = self.mouse_down_up_processor(mouse_down_up_data)
-
-            keyboard_data = {
-                field_name: data.get(field_path, [])
-                for field_name, field_path in self.config.keyboard.input_fields.items()
-            }
-            keyboard_results = self.keyboard_processor(keyboard_data)
-
-            checkbox_results = self.checkbox_processor(data)
-
-            return {
-                **mouse_movement_results,
-                **mouse_down_up_results,
-                **keyboard_results,
-                **checkbox_results,
-            }
+            results = {}
+            degradations = []
+            for index, (processor, _) in enumerate(self.stages):
+                start = time.perf_counter()
+                if index in plan:
+                    max_events, events = plan[index]
+                    results.update(processor(inputs[index], max_events=max_events))
+                    DEGRADATIONS.inc(processor=type(processor).__name__)
+                    degradations.append(
+                        {
+                            "processor": type(processor).__name__,
+                            "mode": "sampled",
+                            "events": events,
+                            "max_events": max_events,
+                        }
+                    )
+                else:
+                    results.update(processor(inputs[index]))
+                self._stage_seconds[index].observe(time.perf_counter() - start)
+            return results, degradations
 
         except Exception as e:
             logger.error(f"Error processing features: {str(e)}", exc_info=True)
+            return {}, []
+
+    def _plan_sampling(
+        self, inputs: List[Any], deadline: Optional[float]
+    ) -> Dict[int, Tuple[int, int]]:
+        """Decide which processors to sample to meet the deadline.
+
+        Args:
+            inputs: Input of each stage
+            deadline: `time.monotonic()` time by which the features are needed
+
+        Returns:
+            Stage index to `max_events` and event count, for sampled stages only
+        """
+        if deadline is None:
+            return {}
+
+        costs = {
+            index: processor.estimate_cost(inputs[index])
+            for index, (processor, _) in enumerate(self.stages)
+            if isinstance(processor, DegradableFeatureEngineer)
+        }
+        total_cost = sum(costs.values())
+        available = deadline - time.monotonic() - self.config.budget.reserve_seconds
+        if total_cost <= available:
             return {}
+
+        share = max(available, 0.0) / total_cost
+        plan = {}
+        for index in costs:
+            events = self.stages[index][0].count_events(inputs[index])
+            max_events = max(int(events * share), self.config.budget.min_events)
+            if max_events < events:
+                plan[index] = (max_events, events)
+
+        if plan:
+            logger.info(
+                f"Sampling {len(plan)} processors to meet the deadline: "
+                f"estimated {total_cost:.4f}s, available {available:.4f}s"
+            )
+        return plan
+
+    @property
+    def produces(self) -> Set[str]:
+        """Names of the features produced by the processors that are run."""
+        return set().union(*(processor.produces for processor, _ in self.stages))
+
+    def _resolve_stages(
+        self,
+        stages: List[Tuple[BaseFeatureEngineer, Callable[[Dict], Any]]],
+        required_features: Optional[Iterable[str]],
+    ) -> List[Tuple[BaseFeatureEngineer, Callable[[Dict], Any]]]:
+        """Select the processors needed to produce the required features.
+
+        Args:
+            stages: All processors with their input getters
+            required_features: Names of the features needed downstream
+
+        Returns:
+            Processors (in original order) that produce a required feature;
+            without required features, all processors that are not stateful
+        """
+        if required_features is None:
+            return [stage for stage in stages if not stage[0].stateful]
+
+        required = set(required_features)
+        selected = [stage for stage in stages if stage[0].produces & required]
+
+        produced = set().union(*(processor.produces for processor, _ in selected))
+        missing = required - produced
+        if missing:
+            logger.warning(f"No processor produces required features: {missing}")
+
+        selected_processors = [processor for processor, _ in selected]
+        skipped = [
+            type(processor).__name__
+            for processor, _ in stages
+            if processor not in selected_processors
+        ]
+        if skipped:
+            logger.debug(f"Skipping processors with unused features: {skipped}")
+
+        return selected
+
+    def _get_mouse_movement_data(self, data: Dict[str, Any]) -> Any:
+        """Get input for the mouse movement processor."""
+        return data.get(self.config.mouse_movement.input_field, [])
+
+    def _get_mouse_down_up_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get input for the mouse down/up processor."""
+        return {
+            self.config.mouse_down_up.down_field: data.get(
+                self.config.mouse_down_up.down_field, []
+            ),
+            self.config.mouse_down_up.up_field: data.get(
+                self.config.mouse_down_up.up_field, []
+            ),
+        }
+
+    def _get_mouse_click_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get input for the mouse click processor."""
+        return {
+            field: data.get(field, [])
+            for field in (
+                self.config.mouse_click.down_field,
+                self.config.mouse_click.up_field,
+                self.config.mouse_click.clicks_field,
+                self.config.mouse_click.movement_field,
+            )
+        }
+
+    def _get_keyboard_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get input for the keyboard events processor."""
+        return {
+            field_name: data.get(field_path, [])
+            for field_name, field_path in self.config.keyboard.input_fields.items()
+        }
+
+    def _get_digraph_data(self, data: Dict[str, Any]) -> Any:
+        """Get input for the digraph latency processor."""
+        return data.get(self.config.digraph.input_field, [])
+
+    def _get_checkbox_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get input for the checkbox processor."""
+        return data
+
+    def _get_replay_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get input for the trajectory replay processor."""
+        return {
+            self.config.replay.input_field: data.get(self.config.replay.input_field),
+            self.config.replay.user_field: data.get(self.config.replay.user_field),
+        }
@@ -0,0 +1,194 @@
+"""Mergeable fixed-memory quantile sketch."""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Ratio of the capacity of a level to that of the level above it
+_CAPACITY_DECAY = 2 / 3
+# Smallest capacity of a level
+_MIN_CAPACITY = 2
+
+
+class QuantileSketch:
+    """KLL quantile sketch over a stream of values, in numpy buffers.
+
+    Values are kept in levels, a value of level `h` standing for `2**h` of
+    the values seen. A level over its capacity is compacted: sorted, and
+    every other value (from a random offset) promoted to the level above.
+    Capacities shrink geometrically from `k` at the top level, and a level
+    holds at most its capacity, so the sketch never holds more than `3 * k`
+    values plus 2 per level, whatever the stream length (at most 605 for
+    `k=200` over a million values). In practice it holds between about
+    `k / 2` and `2 * k`. A quantile's rank error stays within about `3 / k`
+    of the count with high probability.
+
+    Values are taken `chunk_size` at a time, so no more than that many are
+    ever sorted together. Until `k` values are seen nothing is compacted and
+    quantiles are exact, equal to `np.quantile(values, q,
+    method="inverted_cdf")`. Sketches with the same `k` merge into a sketch
+    of both streams, e.g. of all the sessions of a project:
+
+    Example:
+        project = QuantileSketch()
+        for movements in sessions:
+            project.merge(processor.sketches(movements)["velocity"])
+        p5, p50, p95 = project.quantiles([0.05, 0.5, 0.95])
+    """
+
+    def __init__(self, k: int = 200, chunk_size: int = 2048, seed: int = 0):
+        """Initialize an empty sketch.
+
+        Args:
+            k: Capacity of the top level, trading memory for accuracy
+            chunk_size: Most values added to the bottom level at once
+            seed: Seed of the compaction offsets, making results repeatable
+
+        Raises:
+            ValueError: If `k` or `chunk_size` is below 2
+        """
+        if k < 2 or chunk_size < 2:
+            raise ValueError("k and chunk_size must be at least 2")
+        self.k = k
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.count = 0
+        self.min = math.nan
+        self.max = math.nan
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._rng: Optional[np.random.Generator] = None
+
+    def __len__(self) -> int:
+        """Number of values held, not the number seen (see `count`)."""
+        return sum(len(level) for level in self._levels)
+
+    def update(self, values: Iterable[float]) -> "QuantileSketch":
+        """Add values, ignoring NaN.
+
+        Args:
+            values: Array-like of values
+
+        Returns:
+            The sketch itself
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+
+        self.count += values.size
+        self.min = float(np.fmin(self.min, values.min()))
+        self.max = float(np.fmax(self.max, values.max()))
+        for start in range(0, values.size, self.chunk_size):
+            chunk = values[start : start + self.chunk_size]
+            self._levels[0] = np.concatenate((self._levels[0], chunk))
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add the values summarized by another sketch.
+
+        Args:
+            other: Sketch with the same `k`
+
+        Returns:
+            The sketch itself
+
+        Raises:
+            ValueError: If the sketches have different `k`
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and {other.k}")
+        if not other.count:
+            return self
+
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, values in enumerate(other._levels):
+            self._levels[level] = np.concatenate((self._levels[level], values))
+        self.count += other.count
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Get the value at a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, NaN if the sketch is empty
+        """
+        return float(self.quantiles([q])[0])
+
+    def quantiles(self, qs: Iterable[float]) -> np.ndarray:
+        """Get the values at several quantiles.
+
+        Args:
+            qs: Quantiles between 0 and 1
+
+        Returns:
+            Estimated value of each quantile, NaN if the sketch is empty
+        """
+        qs = np.asarray(list(qs), dtype=np.float64)
+        if not self.count:
+            return np.full(qs.shape, np.nan)
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**h) for h, level in enumerate(self._levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        ranks = np.cumsum(weights[order])
+        index = np.searchsorted(ranks, qs * ranks[-1], side="left")
+        return values[order][np.minimum(index, len(values) - 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the sketch as JSON-serializable data, e.g. to store aggregates."""
+        return {
+            "k": self.k,
+            "chunk_size": self.chunk_size,
+            "seed": self.seed,
+            "count": self.count,
+            "min": None if math.isnan(self.min) else self.min,
+            "max": None if math.isnan(self.max) else self.max,
+            "levels": [level.tolist() for level in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        """Rebuild a sketch from `to_dict` data."""
+        sketch = cls(k=data["k"], chunk_size=data["chunk_size"], seed=data["seed"])
+        sketch.count = data["count"]
+        sketch.min = math.nan if data["min"] is None else data["min"]
+        sketch.max = math.nan if data["max"] is None else data["max"]
+        sketch._levels = [np.asarray(level, dtype=np.float64) for level in data["levels"]]
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        """Get the capacity of a level given the current number of levels."""
+        depth = len(self._levels) - 1 - level
+        return max(math.ceil(self.k * _CAPACITY_DECAY**depth), _MIN_CAPACITY)
+
+    def _compress(self) -> None:
+        """Compact every level over its capacity, from the bottom up."""
+        level = 0
+        while level < len(self._levels):
+            values = self._levels[level]
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                values = np.sort(values)
+                # An odd value out stays behind
+                kept, values = values[: len(values) % 2], values[len(values) % 2 :]
+                if self._rng is None:
+                    self._rng = np.random.default_rng(self.seed)
+                offset = int(self._rng.integers(2))
+                self._levels[level] = kept
+                self._levels[level + 1] = np.concatenate(
+                    (self._levels[level + 1], values[offset::2])
+                )
+            level += 1
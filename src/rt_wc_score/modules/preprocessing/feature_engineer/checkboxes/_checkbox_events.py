@@ -1,110 +1,137 @@
 """Checkbox event feature engineering."""
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
+
 import numpy as np
-from dateutil.parser import parse
-from .._base import BaseFeatureEngineer
+
+from .._base import (
+    DegradableFeatureEngineer,
+    count_movements,
+    parse_datetime,
+    sample_stride,
+    slice_movements,
+    to_movement_trace,
+)
 from .config import CheckboxFeatureConfig
 
 logger = logging.getLogger(__name__)
 
 
-class CheckboxEventProcessor(BaseFeatureEngineer):
-    """Processes checkbox interactions to extract features."""
+class CheckboxEventProcessor(DegradableFeatureEngineer):
+    """Processes checkbox interactions to extract features.
+
+    The movements between two consecutive checkboxes are located in the
+    time-sorted movement trace by binary search, so the cost is O(n log n) in
+    the number of movements regardless of the number of checkboxes. With
+    `max_events`, only every k-th movement is used: movement counts are scaled
+    up from the sample and paths are measured on the sampled points.
+    """
 
     def __init__(self, config: Optional[CheckboxFeatureConfig] = None):
         """Initialize the processor."""
         self.config = config or CheckboxFeatureConfig()
 
-    def __call__(self, data: Dict[str, List[Dict]]) -> Dict[str, Any]:
+    @property
+    def produces(self) -> Set[str]:
+        """Names of the features this processor produces."""
+        return {"is_valid", "checkbox"}
+
+    def __call__(
+        self, data: Dict[str, List[Dict]], max_events: Optional[int] = None
+    ) -> Dict[str, Any]:
         """Process checkbox events and extract features.
 
         Args:
             data: Dictionary containing checkbox and mouse movement data
+            max_events: Maximum number of movements to use
 
         Returns:
             Dictionary containing extracted features
         """
         try:
             checkboxes = data.get(self.config.input_field, [])
-            mouse_movements = data.get("mouse_movements", [])
+            mouse_movements = data.get(self.config.movement_field, [])
             if not checkboxes:
                 logger.warning("No checkbox events found")
                 return {}
 
-            return self._process_checkbox_sequence(checkboxes, mouse_movements)
+            return self._process_checkbox_sequence(
+                checkboxes, mouse_movements, max_events
+            )
 
         except Exception as e:
             logger.warning(f"Error processing checkbox events: {str(e)}")
             return {}
 
-    def _calculate_path_linearity(self, path: List[Dict[str, Any]]) -> tuple[float, float]:
+    def count_events(self, data: Dict[str, List[Dict]]) -> int:
+        """Number of movements searched for the checkbox paths."""
+        if not data.get(self.config.input_field):
+            return 0
+        return count_movements(data.get(self.config.movement_field))
+
+    def estimate_cost(self, data: Dict[str, List[Dict]]) -> float:
+        """Estimate the seconds needed to process the data without sampling."""
+        if not data.get(self.config.input_field):
+            return 0.0
+        return self._estimate_movement_cost(data.get(self.config.movement_field))
+
+    def _calculate_path_linearity(self, points: np.ndarray) -> Tuple[float, float]:
+        """Measure how straight a path is.
+
+        Args:
+            points: Time-sorted (x, y) points of the path
+
+        Returns:
+            Linearity score (0-1, 1 = straight) and average turning angle in
+            radians
+        """
         # Need at least 5 points for the new calculation method
-        if len(path) < 5:
+        if len(points) < 5:
             return 1.0, 0.0
-        points = np.array([[p["x"], p["y"]] for p in path])
-
-        # Calculate angles between consecutive segments using 5 points
-        angles = []
-        for i in range(len(points) - 2):
-            p1, p2, p3 = points[i : i + 3]
-
-            # Vectors between points
-            v1 = p2 - p1
-            v2 = p3 - p2
-
-            # Calculate angle between vectors
-            dot_product = np.dot(v1, v2)
-            norms = np.linalg.norm(v1) * np.linalg.norm(v2)
-
-            if norms > 0:
-                cos_angle = dot_product / norms
-                # Ensure cos_angle is within [-1, 1] to avoid numerical errors
-                cos_angle = min(1, max(-1, cos_angle))
-                angle = np.arccos(cos_angle)
-                angles.append(abs(angle))
-            else:
-                angles.append(1.0)
 
-        # Calculate point-to-line distances
+        # Angles between consecutive segments
+        segments = np.diff(points, axis=0)
+        v1 = segments[:-1]
+        v2 = segments[1:]
+        dot_products = v1[:, 0] * v2[:, 0] + v1[:, 1] * v2[:, 1]
+        segment_norms = np.sqrt(segments[:, 0] ** 2 + segments[:, 1] ** 2)
+        norms = segment_norms[:-1] * segment_norms[1:]
+
+        has_norm = norms > 0
+        angles = np.ones(len(norms))
+        # Clip to [-1, 1] to avoid numerical errors
+        cos_angles = np.clip(dot_products[has_norm] / norms[has_norm], -1, 1)
+        angles[has_norm] = np.abs(np.arccos(cos_angles))
+
+        # Point-to-line distances
         start_point = points[0]
         end_point = points[-1]
         path_vector = end_point - start_point
-        path_length = np.linalg.norm(path_vector)
+        path_length = np.sqrt(path_vector[0] ** 2 + path_vector[1] ** 2)
 
         if path_length < 1e-10:  # Add small threshold
             return 0.0, 0.0
 
-        # Calculate perpendicular distances from points to the line
-        distances = []
-        for point in points[1:-1]:
-            v = point - start_point
-            proj = np.dot(v, path_vector) / path_length
-            parallel_point = start_point + (proj / path_length) * path_vector
-            distance = np.linalg.norm(point - parallel_point)
-            distances.append(distance)
-
-        # Safely calculate angle consistency
-        if angles:  # Check if angles list is not empty
-            angle_consistency = 1 - (np.mean(angles) / np.pi)
-            avg_angle = np.mean(angles)
-        else:
-            angle_consistency = 1.0
-            avg_angle = 0.0
+        # Perpendicular distances from points to the line
+        inner = points[1:-1] - start_point
+        projections = (
+            inner[:, 0] * path_vector[0] + inner[:, 1] * path_vector[1]
+        ) / path_length
+        parallel_points = (
+            start_point + (projections / path_length)[:, np.newaxis] * path_vector
+        )
+        offsets = points[1:-1] - parallel_points
+        distances = np.sqrt(offsets[:, 0] ** 2 + offsets[:, 1] ** 2)
 
-        # Safely calculate distance score
-        if distances:  # Check if distances list is not empty
-            max_allowed_distance = max(path_length * 0.1, 1e-10)  # Add minimum threshold
-            distance_score = 1 - min(1, np.mean(distances) / max_allowed_distance)
-        else:
-            distance_score = 1.0
+        angle_consistency = 1 - (np.mean(angles) / np.pi)
+        avg_angle = np.mean(angles)
 
-        # Calculate straightness with safety check
-        total_segment_length = sum(
-            np.linalg.norm(points[i + 1] - points[i]) for i in range(len(points) - 1)
-        )
+        max_allowed_distance = max(path_length * 0.1, 1e-10)  # Add minimum threshold
+        distance_score = 1 - min(1, np.mean(distances) / max_allowed_distance)
 
+        # Straightness, summing segment lengths in order
+        total_segment_length = np.cumsum(segment_norms)[-1]
         if total_segment_length > 1e-10:  # Add small threshold
             straightness = path_length / total_segment_length
         else:
@@ -118,58 +145,59 @@ class CheckboxEventProcessor(BaseFeatureEngineer):
         return linearity_score, avg_angle
 
     def _process_checkbox_sequence(
-        self, checkboxes: List[Dict], mouse_movements: List[Dict]
+        self,
+        checkboxes: List[Dict],
+        mouse_movements: List[Dict],
+        max_events: Optional[int] = None,
     ) -> Dict[str, Any]:
         """Process sequence of checkbox interactions.
+
         Args:
             checkboxes: List of checkbox interactions
             mouse_movements: List of mouse movements
+            max_events: Maximum number of movements to use
 
         Returns:
             Dictionary of extracted features
         """
-        sorted_checkboxes = sorted(checkboxes, key=lambda x: parse(x["timestamp"]))
-        features = {
-            "is_valid" : False,
-            "checkbox":[]
-        }
-        if len(sorted_checkboxes) < 3:
+        checkbox_times = sorted(parse_datetime(c["timestamp"]) for c in checkboxes)
+        features = {"is_valid": False, "checkbox": []}
+        if len(checkbox_times) < 3:
             return features
-        for i in range(len(sorted_checkboxes) - 1):
-            checkbox = {}
-            current = sorted_checkboxes[i]
-            next_cb = sorted_checkboxes[i + 1]
 
-            t1 = parse(current["timestamp"])
-            t2 = parse(next_cb["timestamp"])
+        stride = sample_stride(count_movements(mouse_movements), max_events)
+        trace = to_movement_trace(
+            slice_movements(mouse_movements, slice(None, None, stride))
+        )
 
-            time_diff = (t2 - t1).total_seconds()
+        # Movements between consecutive checkboxes, both ends included
+        bounds = np.array([t.timestamp() for t in checkbox_times])
+        starts = np.searchsorted(trace.t, bounds[:-1], side="left")
+        ends = np.searchsorted(trace.t, bounds[1:], side="right")
 
-            movements_between = [
-                m for m in mouse_movements if t1 <= parse(m["timestamp"]) <= t2
-            ]
+        # Products of compact integer coordinates could overflow
+        points = np.empty((len(trace.t), 2))
+        points[:, 0] = trace.x
+        points[:, 1] = trace.y
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            time_diff = (checkbox_times[i + 1] - checkbox_times[i]).total_seconds()
+            count = int(end - start)
 
-            if movements_between:
-                sorted_movements = sorted(
-                    movements_between, key=lambda x: parse(x["timestamp"])
-                )
+            if count:
                 linearity, avg_angle_degrees = self._calculate_path_linearity(
-                    sorted_movements
+                    points[start:end]
                 )
             else:
-                linearity, avg_angle_degrees = 1.0 ,0.0 # Default to 1 if no movements and 0 to no angles
-
-            # Store features for this pair
-
+                # Default to 1 if no movements and 0 to no angles
+                linearity, avg_angle_degrees = 1.0, 0.0
 
-            checkbox.update(
+            features["checkbox"].append(
                 {
                     "time_diff": time_diff,
                     "path_linearity": linearity,
-                    "movement_count": len(movements_between),
+                    "movement_count": count * stride,
                     "avg_angle_degrees": avg_angle_degrees,
                 }
             )
-            features["checkbox"].append(checkbox)
             features["is_valid"] = True
         return features
@@ -9,6 +9,19 @@ class CheckboxFeatureConfig(BaseModel):
     input_field: str = Field(
         default="checkboxes", description="Field name for checkbox interactions"
     )
+    movement_field: str = Field(
+        default="mouse_movements", description="Field name for mouse movement data"
+    )
+    seconds_per_event: float = Field(
+        default=1.5e-6,
+        ge=0,
+        description="Estimated processing seconds per movement, used for budgeting",
+    )
+    seconds_per_trace_event: float = Field(
+        default=3e-8,
+        ge=0,
+        description="Estimated seconds per movement of a decoded binary trace",
+    )
 
     class Config:
         """ Pydantic configuration."""
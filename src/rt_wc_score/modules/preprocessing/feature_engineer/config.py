@@ -2,11 +2,35 @@
 
 from pydantic import BaseModel, Field
 
-from .keyboard_events import KeyboardConfig
-from .mouse_events import MouseDownUpConfig, MouseMovementConfig
+from .keyboard_events import KeyboardConfig, DigraphLatencyConfig
+from .mouse_events import (
+    MouseDownUpConfig,
+    MouseMovementConfig,
+    MouseClickConfig,
+    TrajectoryReplayConfig,
+)
 from .checkboxes import CheckboxFeatureConfig
 
 
+class BudgetConfig(BaseModel):
+    """Configuration for meeting a deadline by sampling expensive processors."""
+
+    reserve_seconds: float = Field(
+        default=0.002,
+        ge=0,
+        description="Seconds of the budget kept for the rest of the pipeline",
+    )
+    min_events: int = Field(
+        default=1000,
+        gt=0,
+        description="Fewest events a processor is sampled down to",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
 class FeatureEngineerConfig(BaseModel):
     """Main configuration for feature engineering."""
 
@@ -18,14 +42,30 @@ class FeatureEngineerConfig(BaseModel):
         default_factory=MouseDownUpConfig,
         description="Mouse down/up processing configuration",
     )
+    mouse_click: MouseClickConfig = Field(
+        default_factory=MouseClickConfig,
+        description="Mouse click timing processing configuration",
+    )
     keyboard: KeyboardConfig = Field(
         default_factory=KeyboardConfig,
         description="Keyboard events processing configuration",
     )
+    digraph: DigraphLatencyConfig = Field(
+        default_factory=DigraphLatencyConfig,
+        description="Digraph latency processing configuration",
+    )
     checkbox: CheckboxFeatureConfig = Field(
         default_factory=CheckboxFeatureConfig,
         description="Checkbox events processing configuration",
     )
+    replay: TrajectoryReplayConfig = Field(
+        default_factory=TrajectoryReplayConfig,
+        description="Replayed trajectory detection configuration",
+    )
+    budget: BudgetConfig = Field(
+        default_factory=BudgetConfig,
+        description="Sampling of expensive processors under a deadline",
+    )
 
     class Config:
         """ Pydantic configuration."""
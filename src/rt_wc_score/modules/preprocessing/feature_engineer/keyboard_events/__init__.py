@@ -1,8 +1,11 @@
 from ._keyboard_events import KeyboardEventsProcessor
-from .config import KeyboardConfig
+from ._digraph_latency import DigraphLatencyProcessor
+from .config import KeyboardConfig, DigraphLatencyConfig
 
 
 __all__ = [
     "KeyboardEventsProcessor",
+    "DigraphLatencyProcessor",
     "KeyboardConfig",
+    "DigraphLatencyConfig",
 ]
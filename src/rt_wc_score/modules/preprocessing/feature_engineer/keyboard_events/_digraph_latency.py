@@ -0,0 +1,208 @@
+"""Digraph latency processor for extracting keystroke timing features."""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .._base import BaseFeatureEngineer, parse_timestamp
+from .config import DigraphLatencyConfig
+
+logger = logging.getLogger(__name__)
+
+
+class _DigraphTable:
+    """Fixed-capacity table of per-digraph streaming latency accumulators.
+
+    Each tracked digraph owns one slot of preallocated Welford accumulators
+    (count, mean, M2), so memory never grows past `capacity` entries. When the
+    table is full, a new digraph takes over the slot of the least recently
+    seen digraph with fewer than `min_samples` samples. Digraphs that reached
+    `min_samples` are never evicted, and a new digraph is kept long enough to
+    gather samples instead of being pushed out by the next one; if every
+    digraph is protected, samples of untracked digraphs are dropped.
+
+    Distinct digraphs are counted apart from the table, in `seen`, so the
+    count includes evicted and dropped ones; it holds one entry per distinct
+    digraph, which the input size limits bound.
+    """
+
+    def __init__(self, capacity: int, min_samples: int):
+        self.capacity = capacity
+        self.min_samples = min_samples
+        self.slots: Dict[Tuple[Any, Any], int] = {}
+        self.keys: List[Optional[Tuple[Any, Any]]] = [None] * capacity
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.means = np.zeros(capacity, dtype=np.float64)
+        self.m2 = np.zeros(capacity, dtype=np.float64)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+        self.seen: Set[Tuple[Any, Any]] = set()
+        self.samples = 0
+        self.evicted = 0
+        self.dropped = 0
+
+    def add(self, digraph: Tuple[Any, Any], latency: float) -> None:
+        """Add one latency sample for a digraph."""
+        self.samples += 1
+        slot = self.slots.get(digraph)
+        if slot is None:
+            # Tracked digraphs were added when they got their slot
+            self.seen.add(digraph)
+            slot = self._allocate(digraph)
+            if slot is None:
+                self.dropped += 1
+                return
+
+        self.last_seen[slot] = self.samples
+        count = self.counts[slot] + 1
+        delta = latency - self.means[slot]
+        self.means[slot] += delta / count
+        self.m2[slot] += delta * (latency - self.means[slot])
+        self.counts[slot] = count
+
+    def _allocate(self, digraph: Tuple[Any, Any]) -> Optional[int]:
+        """Get a slot for a new digraph, or None if every digraph is protected."""
+        if len(self.slots) < self.capacity:
+            slot = len(self.slots)
+        else:
+            candidates = np.flatnonzero(self.counts < self.min_samples)
+            if not candidates.size:
+                return None
+            slot = int(candidates[np.argmin(self.last_seen[candidates])])
+            del self.slots[self.keys[slot]]
+            self.evicted += 1
+
+        self.slots[digraph] = slot
+        self.keys[slot] = digraph
+        self.counts[slot] = 0
+        self.means[slot] = 0.0
+        self.m2[slot] = 0.0
+        return slot
+
+    def coefficients_of_variation(self) -> np.ndarray:
+        """Get latency coefficient of variation of digraphs with enough samples.
+
+        Standard deviations are population ones, like `std_latency`.
+        """
+        used = len(self.slots)
+        counts = self.counts[:used]
+        means = self.means[:used]
+        mask = (counts >= self.min_samples) & (means > 0)
+        if not mask.any():
+            return np.empty(0, dtype=np.float64)
+
+        stds = np.sqrt(self.m2[:used][mask] / counts[mask])
+        return stds / means[mask]
+
+
+class DigraphLatencyProcessor(BaseFeatureEngineer):
+    """Processes specific key events to extract digraph latency features."""
+
+    def __init__(self, config: Optional[DigraphLatencyConfig] = None):
+        """Initialize the processor with configuration.
+
+        Args:
+            config: Configuration for digraph latency processing
+        """
+        self.config = config or DigraphLatencyConfig()
+
+    def __call__(self, key_events: List[Dict]) -> Dict[str, Any]:
+        """Process specific key events and compute digraph latency features.
+
+        Events are consumed in a single pass; only a bounded table of digraph
+        accumulators is kept, however many events the session contains.
+
+        Args:
+            key_events: List of specific key events
+
+        Returns:
+            Dictionary containing computed digraph features
+        """
+        try:
+            if not isinstance(key_events, list) or not key_events:
+                logger.warning("No specific key events to compute digraph latency")
+                return self._get_default_results()
+
+            return self._compute_features(key_events)
+
+        except Exception as e:
+            logger.error(f"Error processing digraph latency: {str(e)}")
+            return self._get_default_results()
+
+    def _compute_features(self, key_events: List[Dict]) -> Dict[str, Any]:
+        """Stream key events through the digraph table and summarize it.
+
+        Args:
+            key_events: List of specific key events
+
+        Returns:
+            Dictionary containing computed digraph features
+        """
+        processing = self.config.processing
+        key_field = processing.fields["key"]
+        timestamp_field = processing.fields["timestamp"]
+        type_field = processing.fields["type"]
+
+        table = _DigraphTable(processing.max_digraphs, processing.min_samples)
+        count, mean, m2 = 0, 0.0, 0.0
+        previous_key, previous_time = None, None
+
+        for event in key_events:
+            if not isinstance(event, dict):
+                continue
+            if (
+                processing.event_type is not None
+                and event.get(type_field) != processing.event_type
+            ):
+                continue
+
+            key = event.get(key_field)
+            timestamp = parse_timestamp(event.get(timestamp_field))
+            if key is None or math.isnan(timestamp):
+                continue
+
+            if previous_key is not None:
+                latency = timestamp - previous_time
+                if 0 <= latency <= processing.max_latency:
+                    table.add((previous_key, key), latency)
+
+                    count += 1
+                    delta = latency - mean
+                    mean += delta / count
+                    m2 += delta * (latency - mean)
+
+            previous_key, previous_time = key, timestamp
+
+        results = self._get_default_results()
+        feature_names = processing.feature_names
+        results[feature_names["count"]] = count
+        results[feature_names["unique"]] = len(table.seen)
+        if count == 0:
+            return results
+
+        results[feature_names["mean_latency"]] = mean
+        results[feature_names["std_latency"]] = math.sqrt(m2 / count)
+
+        cvs = table.coefficients_of_variation()
+        if cvs.size:
+            results[feature_names["mean_cv"]] = float(np.mean(cvs))
+
+        if table.evicted or table.dropped:
+            logger.debug(
+                f"Evicted {table.evicted} rare digraphs, dropped {table.dropped} "
+                f"samples of untracked digraphs"
+            )
+
+        return results
+
+    def _get_default_results(self) -> Dict[str, Any]:
+        """Get dictionary of default feature values.
+
+        Returns:
+            Dictionary with default values for all features
+        """
+        return {
+            feature_name: self.config.processing.default_value
+            for feature_name in self.config.processing.feature_names.values()
+        }
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -13,7 +13,7 @@ class KeyboardProcessingConfig(BaseModel):
         },
         description="Names of the output count features",
     )
-    default_value: float = Field(
+    default_value: Optional[float] = Field(
         default=None, description="Default value for invalid/missing data"
     )
 
@@ -40,3 +40,68 @@ class KeyboardConfig(BaseModel):
     class Config:
         """ Pydantic configuration."""
         frozen = True
+
+
+class DigraphLatencyProcessingConfig(BaseModel):
+    """Processing-specific configuration for digraph latency statistics."""
+
+    fields: Dict[str, str] = Field(
+        default={"key": "key", "timestamp": "timestamp", "type": "type"},
+        description="Field names in the specific key event data",
+    )
+    event_type: Optional[str] = Field(
+        default=None,
+        description="Only use events of this type (e.g. 'keydown'), None uses all",
+    )
+    max_digraphs: int = Field(
+        default=64,
+        gt=0,
+        description="Maximum number of digraphs tracked at once",
+    )
+    max_latency: float = Field(
+        default=2.0,
+        gt=0,
+        description="Latencies above this (seconds) are treated as typing pauses",
+    )
+    min_samples: int = Field(
+        default=3,
+        gt=1,
+        description=(
+            "Minimum samples for a digraph to count towards regularity and to "
+            "be kept when the table is full"
+        ),
+    )
+    feature_names: Dict[str, str] = Field(
+        default={
+            "count": "keyboard_digraph_count",
+            "unique": "keyboard_digraph_unique",
+            "mean_latency": "keyboard_digraph_mean_latency",
+            "std_latency": "keyboard_digraph_std_latency",
+            "mean_cv": "keyboard_digraph_mean_cv",
+        },
+        description="Names of the output digraph features",
+    )
+    default_value: Optional[float] = Field(
+        default=None, description="Default value for invalid/missing data"
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+class DigraphLatencyConfig(BaseModel):
+    """Complete configuration for digraph latency module."""
+
+    input_field: str = Field(
+        default="keyboard_specificKeyEvents",
+        description="Field name for specific key event data",
+    )
+    processing: DigraphLatencyProcessingConfig = Field(
+        default_factory=DigraphLatencyProcessingConfig,
+        description="Processing-specific configuration",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
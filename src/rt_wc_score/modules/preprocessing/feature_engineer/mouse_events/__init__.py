@@ -1,10 +1,27 @@
 from ._mouse_movement import MouseMovementProcessor
 from ._mouse_down_up import MouseDownUpProcessor
-from .config import MouseMovementConfig, MouseDownUpConfig
+from ._mouse_clicks import MouseClickProcessor
+from ._trajectory_replay import (
+    TrajectoryIndex,
+    TrajectoryReplayProcessor,
+    trajectory_shingles,
+)
+from .config import (
+    MouseMovementConfig,
+    MouseDownUpConfig,
+    MouseClickConfig,
+    TrajectoryReplayConfig,
+)
 
 __all__ = [
     "MouseMovementProcessor",
     "MouseDownUpProcessor",
+    "MouseClickProcessor",
+    "TrajectoryIndex",
+    "TrajectoryReplayProcessor",
+    "trajectory_shingles",
     "MouseMovementConfig",
     "MouseDownUpConfig",
+    "MouseClickConfig",
+    "TrajectoryReplayConfig",
 ]
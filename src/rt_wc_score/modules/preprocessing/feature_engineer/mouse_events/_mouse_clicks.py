@@ -0,0 +1,170 @@
+"""Mouse click processor for extracting hold-duration and approach features."""
+
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from .._base import (
+    BaseFeatureEngineer,
+    MovementTrace,
+    differences,
+    parse_timestamps,
+    to_movement_trace,
+)
+from .config import MouseClickConfig
+
+logger = logging.getLogger(__name__)
+
+
+class MouseClickProcessor(BaseFeatureEngineer):
+    """Processes mouse down/up/click events against the movement trace.
+
+    Downs are matched to ups with a sorted merge-join to get hold durations, and
+    every click is located in the movement timestamps by binary search to get the
+    pause and the speed profile right before it. Everything is O(n log n).
+    """
+
+    def __init__(self, config: Optional[MouseClickConfig] = None):
+        """Initialize the processor with configuration.
+
+        Args:
+            config: Configuration for mouse click processing
+        """
+        self.config = config or MouseClickConfig()
+
+    def __call__(self, mouse_data: Dict[str, List[Dict]]) -> Dict[str, Any]:
+        """Process mouse click events and compute timing features.
+
+        Args:
+            mouse_data: Dictionary containing mouse down, up, click and movement data
+
+        Returns:
+            Dictionary containing computed features
+        """
+        try:
+            results = self._get_default_results()
+            feature_names = self.config.processing.feature_names
+
+            downs = self._sorted_timestamps(mouse_data.get(self.config.down_field))
+            ups = self._sorted_timestamps(mouse_data.get(self.config.up_field))
+            clicks = self._sorted_timestamps(mouse_data.get(self.config.clicks_field))
+            if not downs.size and not clicks.size:
+                logger.warning("No mouse click events found")
+                return results
+
+            trace = to_movement_trace(
+                mouse_data.get(self.config.movement_field), self.config.fields
+            )
+
+            if downs.size:
+                holds, matched = self._match_holds(downs, ups)
+                results[feature_names["hold_count"]] = int(holds.size)
+                if holds.size:
+                    zero_hold = holds <= self.config.processing.zero_hold_threshold
+                    _, decelerated = self._analyze_approach(downs[matched], trace)
+                    results[feature_names["hold_mean"]] = float(np.mean(holds))
+                    results[feature_names["hold_std"]] = float(np.std(holds))
+                    results[feature_names["hold_min"]] = float(np.min(holds))
+                    results[feature_names["zero_hold_ratio"]] = float(
+                        np.mean(zero_hold)
+                    )
+                    results[feature_names["instant_ratio"]] = float(
+                        np.mean(zero_hold & ~decelerated)
+                    )
+
+            click_times = clicks if clicks.size else downs
+            pauses, decelerated = self._analyze_approach(click_times, trace)
+            if pauses.size and not np.isnan(pauses).all():
+                results[feature_names["pause_mean"]] = float(np.nanmean(pauses))
+            results[feature_names["no_decel_ratio"]] = float(np.mean(~decelerated))
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error processing mouse click events: {str(e)}")
+            return self._get_default_results()
+
+    def _sorted_timestamps(self, events: Optional[List[Dict]]) -> np.ndarray:
+        """Parse and sort event timestamps, dropping invalid ones."""
+        if not isinstance(events, list) or not events:
+            return np.empty(0, dtype=np.float64)
+
+        timestamps = parse_timestamps(events, self.config.fields["timestamp"])
+        return np.sort(timestamps[~np.isnan(timestamps)])
+
+    def _match_holds(
+        self, downs: np.ndarray, ups: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Match each mouse down to its mouse up with a sorted merge-join.
+
+        A down is paired with the first up at or after it, provided that up comes
+        before the next down; otherwise the down has no matching up.
+
+        Args:
+            downs: Sorted mouse down timestamps
+            ups: Sorted mouse up timestamps
+
+        Returns:
+            Hold durations of matched downs and the boolean mask of matched downs
+        """
+        if not ups.size:
+            return np.empty(0, dtype=np.float64), np.zeros(downs.size, dtype=bool)
+
+        up_index = np.searchsorted(ups, downs, side="left")
+        has_up = up_index < ups.size
+        up_times = ups[np.minimum(up_index, ups.size - 1)]
+        next_downs = np.append(downs[1:], np.inf)
+
+        matched = has_up & (up_times < next_downs)
+        return up_times[matched] - downs[matched], matched
+
+    def _analyze_approach(
+        self, click_times: np.ndarray, trace: MovementTrace
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Analyze the movement leading up to each click.
+
+        Args:
+            click_times: Sorted click timestamps
+            trace: Time-sorted movement trace
+
+        Returns:
+            Pause since the last movement (NaN if none) and a boolean mask of
+            clicks preceded by a deceleration
+        """
+        pauses = np.full(click_times.size, np.nan)
+        decelerated = np.zeros(click_times.size, dtype=bool)
+        if not click_times.size or not trace.t.size:
+            return pauses, decelerated
+
+        last = np.searchsorted(trace.t, click_times, side="right") - 1
+        has_movement = last >= 0
+        pauses[has_movement] = click_times[has_movement] - trace.t[last[has_movement]]
+
+        # speeds[k] is the speed of the segment arriving at movement k
+        dt = differences(trace.t)
+        distances = np.hypot(differences(trace.x), differences(trace.y))
+        speeds = np.zeros(trace.t.size)
+        np.divide(distances, dt, out=speeds[1:], where=dt > 0)
+        cumulative = np.concatenate(([0.0], np.cumsum(speeds)))
+
+        window = self.config.processing.decel_window
+        has_window = last - window >= 1
+        end = last[has_window]
+        preceding = (cumulative[end] - cumulative[end - window]) / window
+        final = speeds[end]
+        decelerated[has_window] = (preceding > 0) & (
+            final < self.config.processing.decel_ratio * preceding
+        )
+        return pauses, decelerated
+
+    def _get_default_results(self) -> Dict[str, Any]:
+        """Get dictionary of default feature values.
+
+        Returns:
+            Dictionary with default values for all features
+        """
+        return {
+            feature_name: self.config.processing.default_value
+            for feature_name in self.config.processing.feature_names.values()
+        }
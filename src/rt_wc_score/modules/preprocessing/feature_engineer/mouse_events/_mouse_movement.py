@@ -1,152 +1,225 @@
 """Mouse movement processor for extracting velocity features."""
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 import numpy as np
-from dateutil.parser import parse
 
-from .._base import BaseFeatureEngineer
+from .._base import (
+    DegradableFeatureEngineer,
+    MovementTrace,
+    count_movements,
+    differences,
+    drop_null_events,
+    has_invalid_events,
+    parse_timestamps,
+    sample_blocks,
+    slice_movements,
+)
+from .._sketch import QuantileSketch
 from .config import MouseMovementConfig
 
 logger = logging.getLogger(__name__)
 
 
-class MouseMovementProcessor(BaseFeatureEngineer):
-    """Processes mouse movement data to extract velocity features."""
+class MouseMovementProcessor(DegradableFeatureEngineer):
+    """Processes mouse movement data to extract velocity features.
+
+    With `max_events`, velocities are computed over evenly spread blocks of
+    consecutive movements only; the movement count stays exact.
+
+    Quantiles of the velocities and of the intervals between movements come
+    from `QuantileSketch`es fed block by block, so they take fixed memory
+    however long the trace. `sketches` returns them for merging, e.g. into
+    the distributions of a whole project.
+    """
 
     def __init__(self, config: Optional[MouseMovementConfig] = None):
         """Initialize the processor with configuration."""
         self.config = config or MouseMovementConfig()
 
-    def __call__(self, mouse_movement_data: List[Dict]) -> Dict[str, float]:
-        """Process mouse movement data and compute velocity features."""
+    @property
+    def produces(self) -> Set[str]:
+        """Names of the features this processor produces."""
+        return {
+            self.config.processing.velocity_feature_name,
+            self.config.processing.movements_count_feature_name,
+            *self.quantile_feature_names().values(),
+        }
+
+    def quantile_feature_names(self) -> Dict[Tuple[str, float], str]:
+        """Name of the feature of each sketch and quantile.
+
+        Returns:
+            Feature names by sketch name ("velocity" or "interval") and
+            quantile, e.g. `mouse_movement_velocity_p95` for 0.95
+        """
+        processing = self.config.processing
+        prefixes = {
+            "velocity": processing.velocity_quantile_prefix,
+            "interval": processing.interval_quantile_prefix,
+        }
+        return {
+            (name, quantile): f"{prefix}{quantile * 100:g}"
+            for name, prefix in prefixes.items()
+            for quantile in processing.quantiles
+        }
+
+    def __call__(
+        self, mouse_movement_data: List[Dict], max_events: Optional[int] = None
+    ) -> Dict[str, float]:
+        """Process mouse movement data and compute velocity features.
+
+        Args:
+            mouse_movement_data: List of mouse movement events
+            max_events: Maximum number of movements to compute velocities from
+
+        Returns:
+            Dictionary containing computed features
+        """
         try:
-            velocities = self._compute_velocity(mouse_movement_data)
+            sketches = self._new_sketches()
+            velocities = self._compute_velocity(
+                mouse_movement_data, max_events, sketches
+            )
             count = self._compute_count(mouse_movement_data)
-            return {
+            results = {
                 self.config.processing.velocity_feature_name: (
-                    np.std(velocities) if velocities else 0
+                    np.std(velocities) if velocities.size else 0
                 ),
                 self.config.processing.movements_count_feature_name: count,
             }
+            quantiles = self.config.processing.quantiles
+            feature_names = self.quantile_feature_names()
+            for name, sketch in sketches.items():
+                for quantile, value in zip(quantiles, sketch.quantiles(quantiles)):
+                    results[feature_names[(name, quantile)]] = float(value)
+            return results
         except Exception as e:
             logger.error(f"Error computing mouse movement features: {str(e)}")
             return {self.config.processing.velocity_feature_name: np.nan}
 
-    def _parse_timestamp(self, timestamp_str: str) -> float:
-        """Parse timestamp string to float."""
-        try:
-            if isinstance(timestamp_str, (int, float)):
-                return float(timestamp_str)
-            return parse(timestamp_str).timestamp()
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error parsing timestamp {timestamp_str}: {str(e)}")
-            return np.nan
-
-    def _compute_velocity(self, mouse_movements: List[Dict]) -> List[float]:
-        """Compute velocities from mouse movement data."""
-        self.x_vel(mouse_movements)
-        if not mouse_movements:
+    def sketches(
+        self, mouse_movement_data: List[Dict], max_events: Optional[int] = None
+    ) -> Dict[str, QuantileSketch]:
+        """Sketch the velocity and interval distributions of mouse movements.
+
+        Args:
+            mouse_movement_data: List of mouse movement events
+            max_events: Maximum number of movements to compute velocities from
+
+        Returns:
+            Sketches of the velocities ("velocity") and of the seconds between
+            consecutive movements ("interval"), empty if velocities cannot be
+            computed
+        """
+        sketches = self._new_sketches()
+        self._compute_velocity(mouse_movement_data, max_events, sketches)
+        return sketches
+
+    def count_events(self, mouse_movement_data: List[Dict]) -> int:
+        """Number of movements the velocity computation goes through."""
+        return count_movements(mouse_movement_data)
+
+    def estimate_cost(self, mouse_movement_data: List[Dict]) -> float:
+        """Estimate the seconds needed to process the movements without sampling."""
+        return self._estimate_movement_cost(mouse_movement_data)
+
+    def _new_sketches(self) -> Dict[str, QuantileSketch]:
+        """Create empty velocity and interval sketches."""
+        return {
+            name: QuantileSketch(k=self.config.processing.sketch_size)
+            for name in ("velocity", "interval")
+        }
+
+    def _compute_velocity(
+        self,
+        mouse_movements: List[Dict],
+        max_events: Optional[int] = None,
+        sketches: Optional[Dict[str, QuantileSketch]] = None,
+    ) -> np.ndarray:
+        """Compute velocities from mouse movement data.
+
+        Args:
+            mouse_movements: List of mouse movement events
+            max_events: Maximum number of movements to use
+            sketches: Velocity and interval sketches updated with each block,
+                left empty if velocities cannot be computed
+
+        Returns:
+            Velocities between time-sorted consecutive movements
+        """
+        empty = np.empty(0, dtype=np.float64)
+        if not count_movements(mouse_movements):
             logger.warning("Empty mouse movement data to compute velocity")
-            return []
+            return empty
 
         try:
-            valid_movements = [m for m in mouse_movements if m is not None]
-
-            if len(valid_movements) < self.config.processing.min_movements_required:
-                return []
-            valid_movements = sorted(valid_movements,  key=lambda x: parse(x["timestamp"]))
-
-            x_coords = np.array(
-                [m.get(self.config.processing.fields["x"]) for m in valid_movements]
-            )
-            y_coords = np.array(
-                [m.get(self.config.processing.fields["y"]) for m in valid_movements]
-            )
-            timestamps = np.array(
-                [
-                    self._parse_timestamp(
-                        m.get(self.config.processing.fields["timestamp"])
+            if isinstance(mouse_movements, MovementTrace):
+                valid_movements = drop_null_events(mouse_movements)
+            else:
+                valid_movements = [m for m in mouse_movements if m is not None]
+
+            count = count_movements(valid_movements)
+            if count < self.config.processing.min_movements_required:
+                return empty
+
+            if max_events is None:
+                blocks = [slice(0, count)]
+            else:
+                blocks = sample_blocks(
+                    count, max_events, self.config.processing.sample_block_size
+                )
+
+            velocities = []
+            for block in blocks:
+                trace = self._to_trace(slice_movements(valid_movements, block))
+                if trace is None:
+                    logger.warning("Invalid values found in movement data")
+                    if sketches is not None:
+                        sketches.update(self._new_sketches())
+                    return empty
+
+                dx = differences(trace.x)
+                dy = differences(trace.y)
+                dt = differences(trace.t)
+                distances = np.sqrt(dx**2 + dy**2)
+                velocities.append(
+                    np.divide(
+                        distances, dt, out=np.zeros_like(distances), where=dt != 0
                     )
-                    for m in valid_movements
-                ]
-            )
-
-            if (
-                np.isnan(x_coords).any()
-                or np.isnan(y_coords).any()
-                or np.isnan(timestamps).any()
-            ):
-                logger.warning("Invalid values found in movement data")
-                return []
-
-            dx = np.diff(x_coords)
-            dy = np.diff(y_coords)
-            dt = np.diff(timestamps)
-
-            distances = np.sqrt(dx**2 + dy**2)
-
-            # Get count of zero distances
-            zero_distance_count = len(distances[distances == 0])
+                )
+                if sketches is not None:
+                    sketches["velocity"].update(velocities[-1])
+                    sketches["interval"].update(dt)
 
-            velocities = np.divide(
-                distances, dt, out=np.zeros_like(distances), where=dt != 0
-            )
-
-            return velocities.tolist()
+            return np.concatenate(velocities)
 
         except Exception as e:
             logger.error(f"Error in velocity computation: {str(e)}")
-            return []
-    def x_vel(self,mouse_movements: List[Dict]) -> List[float]:
-        if not mouse_movements:
-            logger.warning("Empty mouse movement data to compute velocity")
-            return []
-        try:
-            valid_movements = [m for m in mouse_movements if m is not None]
+            if sketches is not None:
+                sketches.update(self._new_sketches())
+            return empty
+
+    def _to_trace(self, movements: List[Dict]) -> Optional[MovementTrace]:
+        """Convert movements to a time-sorted trace, or None if any is invalid."""
+        if isinstance(movements, MovementTrace):
+            return None if has_invalid_events(movements) else movements
+        fields = self.config.processing.fields
+        x = np.array([m.get(fields["x"]) for m in movements], dtype=np.float64)
+        y = np.array([m.get(fields["y"]) for m in movements], dtype=np.float64)
+        t = parse_timestamps(movements, fields["timestamp"])
+        if np.isnan(x).any() or np.isnan(y).any() or np.isnan(t).any():
+            return None
+
+        order = np.argsort(t, kind="stable")
+        return MovementTrace(x=x[order], y=y[order], t=t[order])
 
-            if len(valid_movements) < self.config.processing.min_movements_required:
-                return []
-            valid_movements = sorted(valid_movements,  key=lambda x: parse(x["timestamp"]))
-            x_coords = np.array(
-                [m.get(self.config.processing.fields["x"]) for m in valid_movements]
-            )
-            y_coords = np.array(
-                [m.get(self.config.processing.fields["y"]) for m in valid_movements]
-            )
-            timestamps = np.array(
-                [
-                    self._parse_timestamp(
-                        m.get(self.config.processing.fields["timestamp"])
-                    )
-                    for m in valid_movements
-                ]
-            )
-
-            if (
-                np.isnan(x_coords).any()
-                or np.isnan(y_coords).any()
-                or np.isnan(timestamps).any()
-            ):
-                logger.warning("Invalid values found in movement data")
-                return []
-            # Calculate x coordinate differences
-            distances = np.diff(x_coords).astype(float)
-            # Calculate time differences
-            dt = np.diff(timestamps)
-            # Compute x velocity by dividing distance by time, handling zero time differences
-            velocities = np.divide(
-                distances, dt, out=np.zeros_like(distances, dtype=float), where=dt != 0
-            )
-            return velocities.tolist()
-        except Exception as e:
-            logger.error(f"Error in velocity computation: {str(e)}")
-            return []
     def _compute_count(self, mouse_movements: List[Dict]) -> List[float]:
         """Compute velocities from mouse movement data."""
-        if not mouse_movements:
+        count = count_movements(mouse_movements)
+        if not count:
             logger.warning("Empty mouse movement data to compute count")
             return []
         else:
-            return len(mouse_movements)
+            return count
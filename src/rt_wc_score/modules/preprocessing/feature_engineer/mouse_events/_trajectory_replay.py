@@ -0,0 +1,291 @@
+"""Trajectory replay processor matching movement traces across sessions."""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .._base import BaseFeatureEngineer, MovementTrace, to_movement_trace
+from .config import TrajectoryReplayConfig, TrajectoryReplayProcessingConfig
+
+logger = logging.getLogger(__name__)
+
+# Odd multiplier combining the cells of a shingle into one 64-bit value
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def trajectory_shingles(
+    trace: MovementTrace, config: Optional[TrajectoryReplayProcessingConfig] = None
+) -> np.ndarray:
+    """Normalize and quantize a movement trace into a set of shingles.
+
+    Positions are taken relative to the trace's centroid and snapped to a grid
+    of `grid_size` pixels, so a replay shifted on the page or jittered by a
+    few pixels visits mostly the same cells. Repeated cells are dropped,
+    making the shingles independent of the sampling rate and timing, and each
+    run of `shingle_size` consecutive cells is hashed into a shingle.
+
+    Args:
+        trace: Time-sorted movement trace
+        config: Quantization settings
+
+    Returns:
+        Distinct shingles as uint64, sorted
+    """
+    config = config or TrajectoryReplayProcessingConfig()
+    if not len(trace.x):
+        return np.empty(0, dtype=np.uint64)
+
+    cells = np.column_stack(
+        (
+            np.floor((trace.x - np.mean(trace.x)) / config.grid_size),
+            np.floor((trace.y - np.mean(trace.y)) / config.grid_size),
+        )
+    ).astype(np.int64)
+    changed = np.concatenate(([True], np.diff(cells, axis=0).any(axis=1)))
+    cells = cells[changed].astype(np.uint64)
+    count = len(cells) - config.shingle_size + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+
+    with np.errstate(over="ignore"):
+        tokens = cells[:, 0] * _SHINGLE_MULTIPLIER + cells[:, 1]
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(config.shingle_size):
+            shingles = shingles * _SHINGLE_MULTIPLIER + tokens[offset : offset + count]
+    return np.unique(shingles)
+
+
+class TrajectoryIndex:
+    """Bounded MinHash/LSH index of trajectory signatures.
+
+    A signature holds the lowest 16 bits of `bands * rows_per_band` MinHash
+    values, whose share of equal values estimates the Jaccard similarity of
+    two shingle sets. Each band of a signature hashes to a bucket of its band
+    table, and a lookup only compares the traces sharing a bucket, walking at
+    most `max_bucket_size` of them per band from the most recent, so its cost
+    does not grow with the size of the index.
+
+    The index is a ring of `capacity` slots held in preallocated arrays: a
+    full index evicts the oldest trace by overwriting its slot. Bucket chains
+    are linked through the slots in insertion order, so evicted traces end
+    the walk without having to be unlinked. The index is not thread-safe:
+    callers sharing it hold its `lock` around queries and additions.
+    """
+
+    def __init__(self, config: Optional[TrajectoryReplayProcessingConfig] = None):
+        """Initialize an empty index.
+
+        Args:
+            config: Signature, capacity and bucket settings
+        """
+        self.config = config or TrajectoryReplayProcessingConfig()
+        self.num_permutations = self.config.bands * self.config.rows_per_band
+
+        rng = np.random.default_rng(self.config.seed)
+        # Multiply-shift hashing: odd multipliers, taking the high 32 bits
+        self._multipliers = rng.integers(
+            0, 2**63, self.num_permutations, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+        self._increments = rng.integers(
+            0, 2**63, self.num_permutations, dtype=np.uint64
+        )
+        self._row_multipliers = rng.integers(
+            0, 2**63, self.config.rows_per_band, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+
+        # As many buckets per band as slots, rounded up to a power of two
+        bucket_bits = max(self.config.capacity - 1, 1).bit_length()
+        self._bucket_shift = np.uint64(64 - bucket_bits)
+        self._band_columns = np.arange(self.config.bands)
+
+        capacity = self.config.capacity
+        self._signatures = np.zeros((capacity, self.num_permutations), np.uint16)
+        self._added_at = np.full(capacity, -1, dtype=np.int64)
+        self._keys: List[Optional[str]] = [None] * capacity
+        self._heads = np.full((1 << bucket_bits, self.config.bands), -1, np.int32)
+        self._next = np.full((capacity, self.config.bands), -1, dtype=np.int32)
+        self._added = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._added, self.config.capacity)
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        """Compute the MinHash signature of a shingle set.
+
+        Args:
+            shingles: Distinct shingles as uint64
+
+        Returns:
+            Signature of `bands * rows_per_band` uint16 values
+        """
+        with np.errstate(over="ignore"):
+            hashed = shingles[:, None] * self._multipliers + self._increments
+        minimum = (hashed >> np.uint64(32)).min(axis=0)
+        return (minimum & np.uint64(0xFFFF)).astype(np.uint16)
+
+    def query(
+        self, signature: np.ndarray, exclude_key: Optional[str] = None
+    ) -> List[Tuple[Optional[str], float]]:
+        """Find the indexed traces most similar to a signature.
+
+        Args:
+            signature: Signature from `signature`
+            exclude_key: Key of traces left out of the matches
+
+        Returns:
+            Keys and estimated similarities of the nearest traces at or above
+            `min_similarity`, most similar first, at most `max_matches`
+        """
+        buckets = self._bucket_index(signature[None])[0]
+        heads = self._heads[buckets, self._band_columns]
+        bands = np.flatnonzero(heads >= 0)
+        # A head overwritten by a trace of another bucket ends its chain
+        head_buckets = self._bucket_index(self._signatures[heads[bands]])
+        bands = bands[head_buckets[np.arange(len(bands)), bands] == buckets[bands]]
+
+        candidates = set()
+        for band in bands.tolist():
+            slot = int(heads[band])
+            for _ in range(self.config.max_bucket_size):
+                candidates.add(slot)
+                following = int(self._next[slot, band])
+                # Chains run from newer to older traces; a slot that is not
+                # older was overwritten, so the rest of the chain is evicted
+                if following < 0 or (self._added_at[following] >= self._added_at[slot]):
+                    break
+                slot = following
+
+        if exclude_key is not None:
+            candidates = {
+                slot for slot in candidates if self._keys[slot] != exclude_key
+            }
+        if not candidates:
+            return []
+
+        slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarities = (self._signatures[slots] == signature).mean(axis=1)
+        keep = similarities >= self.config.min_similarity
+        slots, similarities = slots[keep], similarities[keep]
+        # Most similar first, the most recently added first among ties
+        order = np.lexsort((-self._added_at[slots], -similarities))
+        order = order[: self.config.max_matches]
+        return [
+            (self._keys[slot], float(similarity))
+            for slot, similarity in zip(slots[order], similarities[order])
+        ]
+
+    def add(self, signature: np.ndarray, key: Optional[str] = None) -> None:
+        """Add a signature, evicting the oldest trace if the index is full.
+
+        Args:
+            signature: Signature from `signature`
+            key: Key reported with matches of the trace, e.g. its `user_id`
+        """
+        slot = self._added % self.config.capacity
+        buckets = self._bucket_index(signature[None])[0]
+        self._signatures[slot] = signature
+        self._added_at[slot] = self._added
+        self._keys[slot] = key
+        self._next[slot] = self._heads[buckets, self._band_columns]
+        self._heads[buckets, self._band_columns] = slot
+        self._added += 1
+
+    def _bucket_index(self, signatures: np.ndarray) -> np.ndarray:
+        """Get the bucket of each band of some signatures.
+
+        Args:
+            signatures: Array of shape (traces, bands * rows_per_band)
+
+        Returns:
+            Array of shape (traces, bands)
+        """
+        rows = signatures.reshape(
+            len(signatures), self.config.bands, self.config.rows_per_band
+        ).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            keys = (rows * self._row_multipliers).sum(axis=2, dtype=np.uint64)
+            keys *= _SHINGLE_MULTIPLIER
+        return (keys >> self._bucket_shift).astype(np.int64)
+
+
+class TrajectoryReplayProcessor(BaseFeatureEngineer):
+    """Matches each session's movement trace against the traces seen before.
+
+    Bot farms replay one recorded trajectory across many sessions, shifted
+    and jittered by a few pixels. Each trace is fingerprinted with
+    `trajectory_shingles` and a MinHash signature, looked up in a bounded
+    `TrajectoryIndex` of prior sessions and then added to it. The features
+    are the estimated similarity of the nearest prior trace (0.0 without a
+    match) and the nearest matches with their `user_id`.
+
+    The features depend on the sessions processed before, so the processor is
+    only run when an analyzer reads them (see `stateful`). The index lives in
+    memory and is shared by the threads using the processor, but not by
+    separate processes. It can be passed in to outlive the processor, e.g. to
+    keep the history when the pipeline is rebuilt for a new configuration.
+    """
+
+    stateful = True
+
+    def __init__(
+        self,
+        config: Optional[TrajectoryReplayConfig] = None,
+        index: Optional[TrajectoryIndex] = None,
+    ):
+        """Initialize the processor.
+
+        Args:
+            config: Configuration for replayed trajectory detection
+            index: Index of prior traces, built for `config.processing`; a new
+                empty index if None
+        """
+        self.config = config or TrajectoryReplayConfig()
+        if index is None:
+            index = TrajectoryIndex(config=self.config.processing)
+        elif index.config != self.config.processing:
+            raise ValueError("Index was built for another replay configuration")
+        self.index = index
+
+    def __call__(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Match the movement trace of a session and add it to the index.
+
+        Args:
+            data: Dictionary with the movement data and the session's user ID
+
+        Returns:
+            Dictionary containing the similarity and the nearest matches
+        """
+        feature_names = self.config.processing.feature_names
+        results: Dict[str, Any] = {
+            feature_names["similarity"]: 0.0,
+            feature_names["matches"]: [],
+        }
+        try:
+            trace = to_movement_trace(
+                data.get(self.config.input_field), self.config.fields
+            )
+            shingles = trajectory_shingles(trace, self.config.processing)
+            if shingles.size < self.config.processing.min_shingles:
+                return results
+
+            user_id = data.get(self.config.user_field)
+            signature = self.index.signature(shingles)
+            exclude = user_id if self.config.processing.ignore_same_user else None
+            with self.index.lock:
+                matches = self.index.query(signature, exclude_key=exclude)
+                self.index.add(signature, key=user_id)
+
+            if matches:
+                results[feature_names["similarity"]] = matches[0][1]
+                results[feature_names["matches"]] = [
+                    {"user_id": key, "similarity": similarity}
+                    for key, similarity in matches
+                ]
+            return results
+
+        except Exception as e:
+            logger.error(f"Error computing trajectory replay features: {str(e)}")
+            return {feature_names["similarity"]: np.nan, feature_names["matches"]: []}
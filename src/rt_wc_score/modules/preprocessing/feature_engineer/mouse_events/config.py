@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -21,6 +21,28 @@ class MouseMovementProcessingConfig(BaseModel):
         default="mouse_movement_count",
         description="Name of the output mouse movement count feature",
     )
+    sample_block_size: int = Field(
+        default=64,
+        gt=1,
+        description="Consecutive movements per block when velocities are sampled",
+    )
+    quantiles: List[float] = Field(
+        default=[0.05, 0.5, 0.95],
+        description="Quantiles of the velocities and intervals output as features",
+    )
+    sketch_size: int = Field(
+        default=200,
+        ge=2,
+        description="Capacity of the quantile sketches, trading memory for accuracy",
+    )
+    velocity_quantile_prefix: str = Field(
+        default="mouse_movement_velocity_p",
+        description="Prefix of the velocity quantile features, before the percent",
+    )
+    interval_quantile_prefix: str = Field(
+        default="mouse_movement_interval_p",
+        description="Prefix of the interval quantile features, before the percent",
+    )
 
     class Config:
         """ Pydantic configuration."""
@@ -33,6 +55,16 @@ class MouseMovementConfig(BaseModel):
     input_field: str = Field(
         default="mouse_movements", description="Field name for mouse movement data"
     )
+    seconds_per_event: float = Field(
+        default=1.5e-6,
+        ge=0,
+        description="Estimated processing seconds per movement, used for budgeting",
+    )
+    seconds_per_trace_event: float = Field(
+        default=3e-8,
+        ge=0,
+        description="Estimated seconds per movement of a decoded binary trace",
+    )
     processing: MouseMovementProcessingConfig = Field(
         default_factory=MouseMovementProcessingConfig,
         description="Processing-specific configuration",
@@ -53,7 +85,7 @@ class MouseDownUpProcessingConfig(BaseModel):
         },
         description="Names of the output features",
     )
-    default_value: float = Field(
+    default_value: Optional[float] = Field(
         default=None, description="Default value for invalid/missing data"
     )
 
@@ -79,3 +111,161 @@ class MouseDownUpConfig(BaseModel):
     class Config:
         """ Pydantic configuration."""
         frozen = True
+
+
+class MouseClickProcessingConfig(BaseModel):
+    """Processing-specific configuration for mouse click timing features."""
+
+    zero_hold_threshold: float = Field(
+        default=0.01,
+        description="Hold durations at or below this (seconds) count as zero-hold",
+    )
+    decel_window: int = Field(
+        default=5,
+        gt=0,
+        description="Number of movement segments before a click to compare speed with",
+    )
+    decel_ratio: float = Field(
+        default=0.5,
+        description="Final/preceding speed ratio below which a click is decelerated",
+    )
+    feature_names: Dict[str, str] = Field(
+        default={
+            "hold_count": "mouse_click_hold_count",
+            "hold_mean": "mouse_click_hold_mean",
+            "hold_std": "mouse_click_hold_std",
+            "hold_min": "mouse_click_hold_min",
+            "zero_hold_ratio": "mouse_click_zero_hold_ratio",
+            "pause_mean": "mouse_click_pause_mean",
+            "no_decel_ratio": "mouse_click_no_decel_ratio",
+            "instant_ratio": "mouse_click_instant_ratio",
+        },
+        description="Names of the output features",
+    )
+    default_value: Optional[float] = Field(
+        default=None, description="Default value for invalid/missing data"
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+class MouseClickConfig(BaseModel):
+    """Complete configuration for mouse click module."""
+
+    down_field: str = Field(
+        default="mouse_mouseDowns", description="Field name for mouse down events"
+    )
+    up_field: str = Field(
+        default="mouse_mouseUps", description="Field name for mouse up events"
+    )
+    clicks_field: str = Field(
+        default="mouse_clicks", description="Field name for mouse click events"
+    )
+    movement_field: str = Field(
+        default="mouse_movements", description="Field name for mouse movement data"
+    )
+    fields: Dict[str, str] = Field(
+        default={"x": "x", "y": "y", "timestamp": "timestamp"},
+        description="Field names in the mouse event data",
+    )
+    processing: MouseClickProcessingConfig = Field(
+        default_factory=MouseClickProcessingConfig,
+        description="Processing-specific configuration",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+class TrajectoryReplayProcessingConfig(BaseModel):
+    """Processing-specific configuration for replayed trajectory detection."""
+
+    grid_size: float = Field(
+        default=16.0,
+        gt=0,
+        description="Side in pixels of the grid cells movements are quantized to",
+    )
+    shingle_size: int = Field(
+        default=2,
+        gt=0,
+        description="Consecutive distinct grid cells hashed together into a shingle",
+    )
+    min_shingles: int = Field(
+        default=16,
+        gt=0,
+        description="Fewest distinct shingles a trace needs to be fingerprinted",
+    )
+    bands: int = Field(
+        default=24, gt=0, description="Number of LSH bands of a MinHash signature"
+    )
+    rows_per_band: int = Field(
+        default=3, gt=0, description="MinHash values hashed together into a band"
+    )
+    seed: int = Field(default=0, description="Seed of the MinHash functions")
+    capacity: int = Field(
+        default=100_000,
+        gt=0,
+        description=(
+            "Traces kept in the index, the oldest evicted first; each takes "
+            "2 bytes per MinHash value and 8 to 16 bytes per band"
+        ),
+    )
+    max_bucket_size: int = Field(
+        default=32,
+        gt=0,
+        description="Most recent traces compared per LSH bucket, bounding lookup time",
+    )
+    min_similarity: float = Field(
+        default=0.3,
+        ge=0,
+        le=1,
+        description="Estimated Jaccard similarity from which a prior trace matches",
+    )
+    max_matches: int = Field(
+        default=5, gt=0, description="Nearest prior matches reported per session"
+    )
+    ignore_same_user: bool = Field(
+        default=False,
+        description=(
+            "Do not match prior traces of the same `user_id`, e.g. retries; the "
+            "`user_id` comes from the client, so a bot farm sending a constant "
+            "one would never be matched"
+        ),
+    )
+    feature_names: Dict[str, str] = Field(
+        default={
+            "similarity": "mouse_replay_similarity",
+            "matches": "mouse_replay_matches",
+        },
+        description="Names of the output features",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+class TrajectoryReplayConfig(BaseModel):
+    """Complete configuration for replayed trajectory detection."""
+
+    input_field: str = Field(
+        default="mouse_movements", description="Field name for mouse movement data"
+    )
+    user_field: str = Field(
+        default="user_id", description="Field name for the session's user ID"
+    )
+    fields: Dict[str, str] = Field(
+        default={"x": "x", "y": "y", "timestamp": "timestamp"},
+        description="Field names in the movement data",
+    )
+    processing: TrajectoryReplayProcessingConfig = Field(
+        default_factory=TrajectoryReplayProcessingConfig,
+        description="Processing-specific configuration",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
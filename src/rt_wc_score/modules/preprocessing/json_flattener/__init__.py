@@ -1,2 +1,11 @@
 from ._main import JsonDataFlattener
-from .config import JsonDataFlattenerConfigPM
+from ._exceptions import InputRejectedError
+from .config import JsonDataFlattenerConfigPM, InputLimitsConfig
+from ._binary import (
+    BINARY_MEDIA_TYPE,
+    ENCODING_RAW,
+    ENCODING_VARINT,
+    decode_payload,
+    encode_payload,
+    is_binary_payload,
+)
@@ -0,0 +1,340 @@
+"""Compact binary encoding of payloads with long movement traces.
+
+Mouse movements make up most of a payload, and as JSON every movement repeats
+its keys and carries its timestamp as a date string. The binary format keeps
+the rest of the payload as JSON and stores each movement list as three integer
+streams: x and y in pixels and timestamps in milliseconds since the epoch.
+
+Layout, version 1 (varints are unsigned LEB128):
+
+    magic       4 bytes   b"RTWC"
+    version     1 byte    1
+    flags       1 byte    0, reserved
+    json_size   varint    size of the JSON document
+    json        bytes     UTF-8 payload without the encoded movement lists
+    n_traces    varint    number of movement lists
+    per movement list:
+        name_size   varint    size of the name
+        name        bytes     UTF-8 dotted path of the list, e.g.
+                              `metrics.mouse.movements`
+        encoding    1 byte    ENCODING_VARINT or ENCODING_RAW
+        count       varint    number of movements
+        data_size   varint    size of the data
+        data        bytes     the x, y and t streams, one after the other
+
+With `ENCODING_VARINT`, each stream holds the zigzag-encoded difference of
+every value to the previous one (the first to zero) as varints. With
+`ENCODING_RAW`, x and y are little-endian int32 and t little-endian int64,
+which decodes without copying the coordinates.
+
+The encoding is lossy: coordinates are rounded to whole pixels and timestamps
+to whole milliseconds, and decoded timestamps are float seconds. Payloads with
+integer pixel coordinates and millisecond timestamps, as sent by browsers,
+decode to the same values as their JSON. With `ENCODING_RAW`, coordinates must
+fit in int32.
+
+Decoded movement lists are `MovementTrace`s, sorted by time, which the feature
+processors take in place of the list of movement dictionaries.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+from ...._utils import group_ranks
+from ..feature_engineer._base import MovementTrace, parse_timestamps
+
+# Leading bytes of every binary payload
+MAGIC = b"RTWC"
+# Media type of binary payloads in HTTP requests
+BINARY_MEDIA_TYPE = "application/x-rtwc"
+FORMAT_VERSION = 1
+
+ENCODING_VARINT = 0
+ENCODING_RAW = 1
+
+_HEADER_SIZE = len(MAGIC) + 2
+# A 64-bit value takes at most 10 varint bytes
+_MAX_VARINT_SIZE = 10
+
+
+def is_binary_payload(data: Any) -> bool:
+    """Check whether input is a binary payload rather than JSON text."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and (
+        bytes(data[: len(MAGIC)]) == MAGIC
+    )
+
+
+def encode_payload(
+    payload: Dict[str, Any],
+    traces: Iterable[str] = ("metrics.mouse.movements",),
+    encoding: int = ENCODING_VARINT,
+) -> bytes:
+    """Encode a payload in the binary format.
+
+    Args:
+        payload: Payload in the `InputData` format
+        traces: Dotted paths of the movement lists to encode; missing or empty
+            lists are left in the JSON document
+        encoding: `ENCODING_VARINT` for the smallest size or `ENCODING_RAW` for
+            the fastest decoding
+
+    Returns:
+        Binary payload
+
+    Raises:
+        ValueError: If a movement lacks a coordinate or a valid timestamp, has
+            coordinates out of range of the encoding, or the encoding is
+            unknown
+    """
+    if encoding not in (ENCODING_VARINT, ENCODING_RAW):
+        raise ValueError(f"Unknown trace encoding {encoding}")
+
+    document = _copy_containers(payload)
+    sections = []
+    for name in traces:
+        path = name.split(".")
+        parent = _get_parent(document, path)
+        movements = parent.get(path[-1]) if parent is not None else None
+        if not isinstance(movements, list) or not movements:
+            continue
+
+        x, y, t = _movement_arrays(movements, name)
+        if encoding == ENCODING_VARINT:
+            # Each stream is delta-encoded on its own, starting from zero
+            data = encode_varints(
+                np.concatenate(
+                    [zigzag_encode(np.diff(v, prepend=0)) for v in (x, y, t)]
+                )
+            )
+        else:
+            limit = np.iinfo(np.int32).max
+            if np.abs(x).max() > limit or np.abs(y).max() > limit:
+                raise ValueError(f"Coordinates of {name} out of range of int32")
+            data = (
+                x.astype("<i4").tobytes()
+                + y.astype("<i4").tobytes()
+                + t.astype("<i8").tobytes()
+            )
+
+        encoded_name = name.encode("utf-8")
+        sections.append(
+            encode_varints([len(encoded_name)])
+            + encoded_name
+            + bytes([encoding])
+            + encode_varints([len(x), len(data)])
+            + data
+        )
+        del parent[path[-1]]
+
+    text = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    return b"".join(
+        [
+            MAGIC,
+            bytes([FORMAT_VERSION, 0]),
+            encode_varints([len(text)]),
+            text,
+            encode_varints([len(sections)]),
+            *sections,
+        ]
+    )
+
+
+def decode_payload(data: Union[bytes, bytearray, memoryview]) -> Dict[str, Any]:
+    """Decode a binary payload.
+
+    Args:
+        data: Binary payload
+
+    Returns:
+        Payload with a `MovementTrace` in place of every encoded movement list
+
+    Raises:
+        ValueError: If the data is not a valid binary payload
+    """
+    buffer = memoryview(data).cast("B")
+    if bytes(buffer[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary payload")
+    if len(buffer) < _HEADER_SIZE or buffer[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError("Unsupported binary payload version")
+
+    position = _HEADER_SIZE
+    size, position = _read_varint(buffer, position)
+    payload = json.loads(bytes(_read_bytes(buffer, position, size)))
+    position += size
+    if not isinstance(payload, dict):
+        raise ValueError("Binary payload document must be an object")
+
+    n_traces, position = _read_varint(buffer, position)
+    for _ in range(n_traces):
+        size, position = _read_varint(buffer, position)
+        name = bytes(_read_bytes(buffer, position, size)).decode("utf-8")
+        position += size
+        encoding = _read_bytes(buffer, position, 1)[0]
+        count, position = _read_varint(buffer, position + 1)
+        size, position = _read_varint(buffer, position)
+        section = _read_bytes(buffer, position, size)
+        position += size
+
+        trace = _decode_trace(section, encoding, count, name)
+        path = name.split(".")
+        parent = payload
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+            if not isinstance(parent, dict):
+                raise ValueError(f"Movement list path {name} is not in an object")
+        parent[path[-1]] = trace
+
+    if position != len(buffer):
+        raise ValueError("Trailing data after the binary payload")
+    return payload
+
+
+def zigzag_encode(values: np.ndarray) -> np.ndarray:
+    """Map signed integers to unsigned ones, small magnitudes to small values."""
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def zigzag_decode(values: np.ndarray) -> np.ndarray:
+    """Invert `zigzag_encode`."""
+    values = np.asarray(values, dtype=np.uint64)
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(
+        np.int64
+    )
+
+
+def encode_varints(values: Union[np.ndarray, List[int]]) -> bytes:
+    """Encode unsigned integers as consecutive varints.
+
+    Args:
+        values: Non-negative integers below 2**64
+
+    Returns:
+        Encoded bytes
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    if not values.size:
+        return b""
+
+    # Bytes per value: one per started group of 7 bits, at least one
+    sizes = np.ones(values.shape, dtype=np.int64)
+    remaining = values >> np.uint64(7)
+    while remaining.any():
+        sizes += remaining != 0
+        remaining >>= np.uint64(7)
+
+    rank = group_ranks(sizes)
+    repeated = np.repeat(values, sizes)
+    out = (repeated >> (7 * rank).astype(np.uint64)) & np.uint64(0x7F)
+    continuation = rank < np.repeat(sizes, sizes) - 1
+    out |= continuation.astype(np.uint64) << np.uint64(7)
+    return out.astype(np.uint8).tobytes()
+
+
+def decode_varints(
+    data: Union[bytes, memoryview, np.ndarray], count: int
+) -> np.ndarray:
+    """Decode exactly `count` consecutive varints filling `data`.
+
+    Args:
+        data: Encoded bytes
+        count: Number of values
+
+    Returns:
+        Decoded values as uint64
+
+    Raises:
+        ValueError: If the data does not hold exactly `count` valid varints
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    if len(ends) != count or (count and ends[-1] != len(raw) - 1):
+        raise ValueError(f"Expected {count} varints in {len(raw)} bytes")
+    if not count:
+        return np.empty(0, dtype=np.uint64)
+
+    sizes = np.diff(ends, prepend=-1)
+    if sizes.max() > _MAX_VARINT_SIZE:
+        raise ValueError("Varint longer than 64 bits")
+    shifts = (7 * group_ranks(sizes)).astype(np.uint64)
+    chunks = (raw & 0x7F).astype(np.uint64) << shifts
+    return np.add.reduceat(chunks, ends - sizes + 1)
+
+
+def _decode_trace(
+    section: memoryview, encoding: int, count: int, name: str
+) -> MovementTrace:
+    """Decode the streams of one movement list into a time-sorted trace."""
+    if encoding == ENCODING_VARINT:
+        deltas = zigzag_decode(decode_varints(section, 3 * count))
+        x, y, t = np.cumsum(deltas.reshape(3, count), axis=1)
+    elif encoding == ENCODING_RAW:
+        if len(section) != 16 * count:
+            raise ValueError(f"Expected {16 * count} bytes for {name}")
+        x = np.frombuffer(section, dtype="<i4", count=count)
+        y = np.frombuffer(section, dtype="<i4", count=count, offset=4 * count)
+        t = np.frombuffer(section, dtype="<i8", count=count, offset=8 * count)
+    else:
+        raise ValueError(f"Unknown trace encoding {encoding} for {name}")
+
+    seconds = t / 1000.0
+    if count > 1 and (np.diff(t) < 0).any():
+        order = np.argsort(t, kind="stable")
+        return MovementTrace(x=x[order], y=y[order], t=seconds[order])
+    return MovementTrace(x=x, y=y, t=seconds)
+
+
+def _movement_arrays(
+    movements: List[Dict[str, Any]], name: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the integer x, y and millisecond timestamps of movements."""
+    try:
+        x = np.array([m["x"] for m in movements], dtype=np.float64)
+        y = np.array([m["y"] for m in movements], dtype=np.float64)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid movement coordinates in {name}: {str(e)}")
+    t = parse_timestamps(movements)
+    if np.isnan(x).any() or np.isnan(y).any() or np.isnan(t).any():
+        raise ValueError(f"Invalid movement values in {name}")
+    return (
+        np.rint(x).astype(np.int64),
+        np.rint(y).astype(np.int64),
+        np.rint(t * 1000.0).astype(np.int64),
+    )
+
+
+def _copy_containers(value: Any) -> Any:
+    """Copy the dictionaries of a payload, sharing everything else."""
+    if isinstance(value, dict):
+        return {key: _copy_containers(item) for key, item in value.items()}
+    return value
+
+
+def _get_parent(document: Dict[str, Any], path: List[str]) -> Any:
+    """Get the dictionary holding the last key of a path, or None."""
+    parent = document
+    for key in path[:-1]:
+        parent = parent.get(key) if isinstance(parent, dict) else None
+    return parent if isinstance(parent, dict) else None
+
+
+def _read_varint(buffer: memoryview, position: int) -> Tuple[int, int]:
+    """Read one varint, returning it and the position after it."""
+    value = 0
+    for i in range(_MAX_VARINT_SIZE):
+        if position + i >= len(buffer):
+            break
+        byte = buffer[position + i]
+        value |= (byte & 0x7F) << (7 * i)
+        if byte < 0x80:
+            return value, position + i + 1
+    raise ValueError("Truncated or invalid varint")
+
+
+def _read_bytes(buffer: memoryview, position: int, size: int) -> memoryview:
+    """Get `size` bytes at a position without copying them."""
+    if position + size > len(buffer):
+        raise ValueError("Truncated binary payload")
+    return buffer[position : position + size]
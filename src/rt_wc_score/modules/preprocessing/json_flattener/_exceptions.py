@@ -0,0 +1,34 @@
+"""Exceptions raised while flattening input data."""
+
+from typing import Any, Dict, Optional
+
+
+class InputRejectedError(ValueError):
+    """Input exceeds a configured size limit and is not processed.
+
+    Attributes:
+        reason: Name of the limit that was exceeded, e.g. `max_bytes`
+        field: Flattened field that exceeded the limit, if any
+        limit: Configured limit
+        actual: Observed size, or a lower bound of it
+    """
+
+    def __init__(
+        self, reason: str, limit: int, actual: int, field: Optional[str] = None
+    ):
+        self.reason = reason
+        self.field = field
+        self.limit = limit
+        self.actual = actual
+
+        target = f" in {field}" if field else ""
+        super().__init__(f"Input rejected: {reason}{target} is {actual}, limit {limit}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the rejection as a JSON-serializable dictionary."""
+        return {
+            "reason": self.reason,
+            "field": self.field,
+            "limit": self.limit,
+            "actual": self.actual,
+        }
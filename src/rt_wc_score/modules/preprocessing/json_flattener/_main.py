@@ -1,47 +1,180 @@
 """Module for flattening nested JSON data structures."""
 
+import re
 import json
 import logging
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from functools import reduce
 from operator import getitem
 
 from pydantic import ValidationError
 from .._base import BasePreprocessor
+from ....telemetry import INPUT_REJECTIONS, PAYLOAD_EVENTS
+from ..feature_engineer._base import MovementTrace
+from ._binary import decode_payload, is_binary_payload
+from ._exceptions import InputRejectedError
 from .config import JsonDataFlattenerConfigPM
 
 logger = logging.getLogger(__name__)
 
+# JSON strings, opening and closing brackets, and commas, as groups 1 to 4
+_TOKENS = r'("(?:[^"\\]|\\.)*")|([\[{])|([\]}])|(,)'
+_TEXT_TOKENS = re.compile(_TOKENS)
+_BYTES_TOKENS = re.compile(_TOKENS.encode("ascii"))
+
 
 class JsonDataFlattener(BasePreprocessor):
-    """Preprocessor for flattening nested JSON data."""
+    """Preprocessor for flattening nested JSON data.
+
+    Input over the configured limits is rejected with `InputRejectedError`
+    before any costly work: the size of JSON text is checked before it is
+    decoded, and so is the length of its event lists when the text could hold
+    lists over their limit (see `_scan_event_counts`). The length of every
+    event list is checked again after decoding, before validation and feature
+    engineering, which also covers dictionary input. Rejections are counted in `rejections` by reason and field,
+    and the length of every non-empty event list is recorded in
+    `PAYLOAD_EVENTS`.
+
+    Besides JSON, input can be a binary payload (see `encode_payload`), whose
+    movement lists are decoded into `MovementTrace`s and passed on as such.
+    """
 
     def __init__(self, config: Optional[JsonDataFlattenerConfigPM] = None) -> None:
         super().__init__()
-        self._flattened_data: Optional[Dict[str, Any]] = None
         self.config = config or JsonDataFlattenerConfigPM()
+        self.rejections = INPUT_REJECTIONS
+        self._events: Dict[str, Any] = {}
+
+    def __call__(
+        self, data: Union[str, bytes, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Process input data and return flattened structure.
 
-    def __call__(self, data: Union[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        """Process input data and return flattened structure."""
+        Args:
+            data: Input data as JSON text, binary payload or dictionary
+
+        Returns:
+            Flattened data, or None if the input cannot be processed
+
+        Raises:
+            InputRejectedError: If the input exceeds a configured limit
+        """
         try:
-            if isinstance(data, str):
+            if is_binary_payload(data):
+                self._check_size(data)
+                data = decode_payload(data)
+                logger.debug("Successfully decoded binary payload")
+            elif isinstance(data, (str, bytes, bytearray)):
+                self._check_size(data)
+                self._scan_event_counts(data)
                 data = json.loads(data)
                 logger.debug("Successfully parsed JSON string")
 
+            self._check_event_counts(data)
+
+            traces = {}
             if self.config.is_validate:
+                # Decoded traces are valid by construction; validate the rest
+                data, traces = self._take_traces(data)
                 parsed_data = self.config.input_data.model_validate(data).model_dump()
                 logger.debug("Successfully validated input data")
             else:
                 parsed_data = data
 
             logger.debug("Starting metrics extraction")
-            self._flattened_data = self._extract_metrics(parsed_data)
-            return self._flattened_data
+            flattened = self._extract_metrics(parsed_data)
+            flattened.update(traces)
+            return flattened
+
+        except InputRejectedError as e:
+            self.rejections.inc(reason=e.reason, field=e.field or "")
+            logger.warning(str(e))
+            raise
 
         except Exception as e:
             logger.error(f"Error during flattening: {str(e)}")
             return None
 
+    def _check_size(self, data: Union[str, bytes, bytearray]) -> None:
+        """Reject JSON text larger than `max_bytes` without decoding it."""
+        max_bytes = self.config.limits.max_bytes
+        if max_bytes is None:
+            return
+
+        size = len(data)
+        # A character takes 1 to 4 bytes in UTF-8; only count bytes if it matters
+        if isinstance(data, str) and size <= max_bytes < 4 * size:
+            size = len(data.encode("utf-8"))
+        if size > max_bytes:
+            raise InputRejectedError("max_bytes", max_bytes, size)
+
+    def _scan_event_counts(self, text: Union[str, bytes, bytearray]) -> None:
+        """Reject JSON text with an event list over its limit, without decoding it.
+
+        A list of objects holds at most as many events as the text has `{`, so
+        only fields whose limit is below that are scanned: every array under
+        the last key of their path is tokenized, stopping once it is over the
+        limit. Arrays under the same key elsewhere in the payload count too.
+        Lists of scalars are left to the check after decoding.
+        """
+        limits = self.config.limits
+        objects = text.count("{" if isinstance(text, str) else b"{")
+        for field_name, path in self.config.field_mapping.items():
+            limit = limits.max_events_per_field.get(field_name, limits.max_events)
+            if limit is None or objects <= limit:
+                continue
+            count = _longest_array(text, path[-1], limit)
+            if count > limit:
+                raise InputRejectedError("max_events", limit, count, field_name)
+
+    def _check_event_counts(self, data: Any) -> None:
+        """Reject event lists longer than their limit, before validating them."""
+        limits = self.config.limits
+        for field_name, path in self.config.field_mapping.items():
+            value = self._get_nested_value(data, path, field_name)
+            if isinstance(value, MovementTrace):
+                count = len(value.t)
+            elif isinstance(value, list):
+                count = len(value)
+            else:
+                continue
+
+            limit = limits.max_events_per_field.get(field_name, limits.max_events)
+            if limit is not None and count > limit:
+                raise InputRejectedError("max_events", limit, count, field_name)
+            if count:
+                self._get_events_series(field_name).observe(count)
+
+    def _take_traces(
+        self, data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, MovementTrace]]:
+        """Take the decoded traces out of the data.
+
+        Args:
+            data: Payload, left unchanged
+
+        Returns:
+            Copy of the payload with empty lists in place of the traces, which
+            shares everything but the dictionaries on their paths, and the
+            traces by field
+        """
+        traces = {}
+        for field_name, path in self.config.field_mapping.items():
+            value = self._get_nested_value(data, path, field_name)
+            if isinstance(value, MovementTrace):
+                traces[field_name] = value
+                data = _replace_path(data, path, [])
+        return data, traces
+
+    def _get_events_series(self, field_name: str) -> Any:
+        """Get the event count series of a field, bound on first use."""
+        series = self._events.get(field_name)
+        if series is None:
+            series = self._events.setdefault(
+                field_name, PAYLOAD_EVENTS.labels(type=field_name)
+            )
+        return series
+
     def _get_nested_value(
         self, data: Dict[str, Any], path: List[str], field_name: str
     ) -> Any:
@@ -72,3 +205,52 @@ class JsonDataFlattener(BasePreprocessor):
         except Exception as e:
             logger.error(f"Error in _extract_metrics: {str(e)}")
             raise
+
+
+def _replace_path(data: Dict[str, Any], path: List[str], value: Any) -> Dict[str, Any]:
+    """Copy the dictionaries along a path, setting its last key to a value."""
+    data = dict(data)
+    parent = data
+    for key in path[:-1]:
+        parent[key] = dict(parent[key])
+        parent = parent[key]
+    parent[path[-1]] = value
+    return data
+
+
+def _longest_array(text: Union[str, bytes, bytearray], key: str, limit: int) -> int:
+    """Get the most elements of an array under a key in JSON text.
+
+    Args:
+        text: JSON text
+        key: Key of the arrays
+        limit: Count from which to stop scanning an array
+
+    Returns:
+        Number of elements of the longest array, at most `limit + 1` and 1 for
+        an empty array
+    """
+    start = re.escape(json.dumps(key)) + r"\s*:\s*\["
+    if isinstance(text, str):
+        starts, tokens = re.compile(start), _TEXT_TOKENS
+    else:
+        starts, tokens = re.compile(start.encode("utf-8")), _BYTES_TOKENS
+
+    longest = 0
+    for match in starts.finditer(text):
+        depth = 1
+        commas = 0
+        for token in tokens.finditer(text, match.end()):
+            kind = token.lastindex
+            if kind == 2:
+                depth += 1
+            elif kind == 3:
+                depth -= 1
+                if not depth:
+                    break
+            elif kind == 4 and depth == 1:
+                commas += 1
+                if commas >= limit:
+                    break
+        longest = max(longest, commas + 1)
+    return longest
@@ -76,8 +76,31 @@ _FIELD_MAPPING = {
 }
 
 
+class InputLimitsConfig(BaseModel):
+    """ Size limits checked before the input is processed."""
+    max_bytes: Optional[int] = Field(
+        default=4 * 1024 * 1024,
+        gt=0,
+        description="Maximum size of JSON text input, checked before decoding",
+    )
+    max_events: Optional[int] = Field(
+        default=100_000,
+        gt=0,
+        description="Maximum number of events in any flattened event list",
+    )
+    max_events_per_field: Dict[str, int] = Field(
+        default_factory=lambda: {"checkboxes": 1_000},
+        description="Maximum number of events of specific flattened fields",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
 class JsonDataFlattenerConfigPM(ExtraBaseModel):
     """ Configuration for JSON data flattening."""
     field_mapping: Dict[str, List[str]] = Field(default_factory=lambda: _FIELD_MAPPING)
+    limits: InputLimitsConfig = Field(default_factory=InputLimitsConfig)
     input_data: InputData = Field(default_factory=InputData)
     is_validate: bool = Field(default=False)
@@ -0,0 +1,2 @@
+from ._main import ScoringServer
+from .config import ServerConfig
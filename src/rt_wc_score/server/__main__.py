@@ -0,0 +1,48 @@
+"""Run the scoring server: `python -m rt_wc_score.server`."""
+
+import sys
+import logging
+import argparse
+
+from ._main import ScoringServer
+from .config import ServerConfig
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="rt_wc_score scoring server")
+    parser.add_argument("--host", default=ServerConfig().host)
+    parser.add_argument("--port", type=int, default=ServerConfig().port)
+    parser.add_argument("--workers", type=int, default=ServerConfig().workers)
+    parser.add_argument(
+        "--executor", choices=["thread", "process"], default=ServerConfig().executor
+    )
+    parser.add_argument("--max-queue", type=int, default=ServerConfig().max_queue)
+    parser.add_argument("--config", dest="config_path", default=None)
+    parser.add_argument(
+        "--metrics",
+        dest="expose_metrics",
+        action="store_true",
+        help="Serve Prometheus metrics at /metrics",
+    )
+    parser.add_argument(
+        "--metrics-file", default=None, help="Write Prometheus metrics to this file"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    server = ScoringServer(ServerConfig(**vars(args)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""HTTP scoring server built on the standard library."""
+
+import json
+import time
+import logging
+import threading
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError,
+)
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .._main import MetricsProcessor, MetricsProcessorConfig
+from .._reloading import ReloadingMetricsProcessor
+from .._utils import json_compatible
+from ..modules.preprocessing.json_flattener import BINARY_MEDIA_TYPE
+from ..telemetry import REGISTRY, MetricsFileWriter, send_metrics
+from .config import ServerConfig
+
+logger = logging.getLogger(__name__)
+
+# Pipeline of a process pool worker, built once by `_init_worker`
+_worker_processor: Optional[Callable[..., Dict[str, Any]]] = None
+
+
+def _build_processor(
+    config_path: Optional[str], pipeline_config: Optional[MetricsProcessorConfig]
+) -> Callable[..., Dict[str, Any]]:
+    """Build the scoring pipeline."""
+    if config_path:
+        return ReloadingMetricsProcessor(config_path)
+    return MetricsProcessor(config=pipeline_config)
+
+
+def _init_worker(
+    config_path: Optional[str], pipeline_config: Optional[MetricsProcessorConfig]
+) -> None:
+    """Build the pipeline of a process pool worker."""
+    global _worker_processor
+    _worker_processor = _build_processor(config_path, pipeline_config)
+
+
+def _score_payloads(
+    processor: Callable[..., Dict[str, Any]],
+    payloads: List[Any],
+    deadline: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Score payloads, in one columnar pass if there are several."""
+    if len(payloads) <= 1:
+        return [processor(payload, deadline=deadline) for payload in payloads]
+    return processor.batch(payloads, deadline=deadline)
+
+
+def _score_in_worker(
+    payloads: List[Any], deadline: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Score payloads with the pipeline of a process pool worker."""
+    return _score_payloads(_worker_processor, payloads, deadline)
+
+
+def _parse_content_length(value: Optional[str]) -> Optional[int]:
+    """Parse a `Content-Length` header, None if it is missing or invalid."""
+    if value is None:
+        return None
+    value = value.strip()
+    if not (value.isascii() and value.isdigit()):
+        return None
+    return int(value)
+
+
+class ScoringServer:
+    """HTTP server scoring payloads with `MetricsProcessor`.
+
+    Connections are served by one thread each and kept alive (HTTP/1.1), while
+    scoring runs in a bounded pool of thread or process workers. At most
+    `workers + max_queue` requests are admitted at a time; further requests get
+    503 right away instead of piling up, which keeps latency bounded at
+    saturation; admission is checked before the body is decoded, so rejected
+    requests cost no decoding. Scoring gets `request_timeout` as its deadline,
+    so huge payloads are scored on a sample of their events rather than timing
+    out.
+
+    Endpoints:
+        POST /score: Score one payload, as JSON or, with the `Content-Type`
+            `application/x-rtwc`, in the binary format of `encode_payload`
+        POST /score/batch: Score a JSON list of payloads, in one columnar pass
+        GET /healthz: Liveness check
+        GET /readyz: Readiness check; 503 while saturated
+        GET /metrics: Prometheus metrics, if `expose_metrics` is set
+
+    Pipeline metrics are recorded where the pipeline runs; with the process
+    executor they stay in the worker processes and are not exported.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ServerConfig] = None,
+        pipeline_config: Optional[MetricsProcessorConfig] = None,
+    ):
+        """Initialize the server and its worker pool.
+
+        Args:
+            config: Configuration for the server
+            pipeline_config: Configuration for the scoring pipeline, used when
+                no `config_path` is set
+        """
+        self.config = config or ServerConfig()
+        self.pipeline_config = pipeline_config
+
+        self._capacity = self.config.workers + self.config.max_queue
+        self._admission = threading.BoundedSemaphore(self._capacity)
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._ready = threading.Event()
+
+        self.executor = self._create_executor()
+        self.httpd = _HTTPServer((self.config.host, self.config.port), self)
+        self.metrics_writer = (
+            MetricsFileWriter(self.config.metrics_file, self.config.metrics_interval)
+            if self.config.metrics_file
+            else None
+        )
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port the server listens on."""
+        return self.httpd.server_address[:2]
+
+    @property
+    def in_flight(self) -> int:
+        """Number of admitted requests that have not finished yet."""
+        return self._in_flight
+
+    def serve_forever(self) -> None:
+        """Serve requests until `shutdown` is called."""
+        self._ready.set()
+        if self.metrics_writer is not None:
+            self.metrics_writer.start()
+        host, port = self.address
+        logger.info(f"Scoring server listening on http://{host}:{port}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._ready.clear()
+
+    def start(self) -> threading.Thread:
+        """Serve requests in a background thread.
+
+        Returns:
+            The thread running the server
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        """Stop serving and release the worker pool."""
+        self._ready.clear()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.executor.shutdown(wait=True)
+        if self.metrics_writer is not None:
+            self.metrics_writer.stop()
+
+    def is_ready(self) -> bool:
+        """Check whether the server accepts more scoring requests."""
+        return self._ready.is_set() and self._in_flight < self._capacity
+
+    def score(self, payloads: List[Any]) -> Tuple[int, Dict[str, Any]]:
+        """Score payloads if there is capacity.
+
+        Args:
+            payloads: Raw payloads to score
+
+        Returns:
+            HTTP status and response body
+        """
+        if not self.admit():
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server is saturated"}
+        return self.score_admitted(payloads)
+
+    def admit(self) -> bool:
+        """Take an admission slot if there is capacity.
+
+        An admitted request must be passed to `score_admitted` or given up
+        with `release`.
+
+        Returns:
+            True if the request was admitted
+        """
+        if not self._admission.acquire(blocking=False):
+            return False
+        with self._in_flight_lock:
+            self._in_flight += 1
+        return True
+
+    def score_admitted(self, payloads: List[Any]) -> Tuple[int, Dict[str, Any]]:
+        """Score payloads of an admitted request, releasing its slot when done.
+
+        Args:
+            payloads: Raw payloads to score
+
+        Returns:
+            HTTP status and response body
+        """
+        deadline = time.monotonic() + self.config.request_timeout
+        try:
+            future = self.executor.submit(self._score_batch, payloads, deadline)
+        except Exception as e:
+            self.release()
+            logger.error(f"Error submitting payloads: {str(e)}")
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+
+        # The slot is held until the work is done, even if the caller gives up
+        future.add_done_callback(lambda _: self.release())
+        try:
+            return HTTPStatus.OK, {
+                "results": future.result(self.config.request_timeout)
+            }
+
+        except TimeoutError:
+            logger.error(f"Scoring timed out after {self.config.request_timeout}s")
+            return HTTPStatus.GATEWAY_TIMEOUT, {"error": "Scoring timed out"}
+
+        except Exception as e:
+            logger.error(f"Error scoring payloads: {str(e)}", exc_info=True)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+    def release(self) -> None:
+        """Release the admission slot of a finished or abandoned request."""
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self._admission.release()
+
+    def _create_executor(self) -> Executor:
+        """Create the worker pool."""
+        if self.config.executor == "process":
+            self._score_batch = _score_in_worker
+            return ProcessPoolExecutor(
+                max_workers=self.config.workers,
+                initializer=_init_worker,
+                initargs=(self.config.config_path, self.pipeline_config),
+            )
+
+        # The pipeline keeps no per-call state, so the threads share one instance
+        processor = _build_processor(self.config.config_path, self.pipeline_config)
+        self._score_batch = lambda payloads, deadline: _score_payloads(
+            processor, payloads, deadline
+        )
+        return ThreadPoolExecutor(
+            max_workers=self.config.workers, thread_name_prefix="scoring"
+        )
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """Threading HTTP server holding a reference to the scoring server."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], scoring: ScoringServer):
+        self.scoring = scoring
+        super().__init__(address, _RequestHandler)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Handles scoring, health and readiness requests."""
+
+    protocol_version = "HTTP/1.1"
+    server: _HTTPServer
+
+    def setup(self) -> None:
+        # Idle keep-alive connections are closed after this many seconds
+        self.timeout = self.server.scoring.config.keep_alive_timeout
+        super().setup()
+
+    def do_GET(self) -> None:
+        scoring = self.server.scoring
+        if self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/readyz":
+            ready = scoring.is_ready()
+            self._send_json(
+                HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE,
+                {"ready": ready, "in_flight": scoring.in_flight},
+            )
+        elif self.path == "/metrics" and scoring.config.expose_metrics:
+            send_metrics(self, REGISTRY)
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        scoring = self.server.scoring
+        if self.path not in ("/score", "/score/batch"):
+            self._discard_body()
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+
+        length = _parse_content_length(self.headers.get("Content-Length"))
+        if length is None:
+            # Without a valid length the end of the body is unknown
+            self.close_connection = True
+            if self.headers.get("Content-Length") is None:
+                self._send_json(
+                    HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length is required"}
+                )
+            else:
+                self._send_json(
+                    HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+                )
+            return
+        if length > scoring.config.max_body_bytes:
+            self.close_connection = True
+            self._send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request too large"}
+            )
+            return
+
+        # Admit before decoding, so a saturated server does no work on the
+        # body; it is still drained, as closing a connection with unread data
+        # resets it and the client could lose the response
+        if not scoring.admit():
+            self._discard_body()
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server is saturated"}
+            )
+            return
+
+        submitted = False
+        try:
+            status, response = self._read_payloads(length)
+            if status == HTTPStatus.OK:
+                submitted = True
+                status, response = scoring.score_admitted(response)
+                if self.path == "/score" and status == HTTPStatus.OK:
+                    response = response["results"][0]
+                    if "rejection" in response:
+                        status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            self._send_json(status, response)
+        finally:
+            if not submitted:
+                scoring.release()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _read_payloads(self, length: int) -> Tuple[int, Any]:
+        """Read and decode the payloads of a scoring request.
+
+        Args:
+            length: Length of the request body
+
+        Returns:
+            OK and the list of payloads, or an error status and response body
+        """
+        scoring = self.server.scoring
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0]
+        if content_type.strip().lower() == BINARY_MEDIA_TYPE:
+            body = self.rfile.read(length)
+            if self.path != "/score":
+                return HTTPStatus.BAD_REQUEST, {
+                    "error": "Binary payloads are only accepted by /score"
+                }
+        else:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError as e:
+                return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {e}"}
+
+        if self.path == "/score":
+            return HTTPStatus.OK, [body]
+
+        if not isinstance(body, list) or len(body) > scoring.config.max_batch_size:
+            return HTTPStatus.BAD_REQUEST, {
+                "error": "Batch must be a list of at most "
+                f"{scoring.config.max_batch_size} payloads"
+            }
+        return HTTPStatus.OK, body
+
+    def _discard_body(self) -> None:
+        """Read and drop the request body to keep the connection usable."""
+        value = self.headers.get("Content-Length")
+        length = 0 if value is None else _parse_content_length(value)
+        if length is None or length > self.server.scoring.config.max_body_bytes:
+            self.close_connection = True
+        else:
+            self.rfile.read(length)
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        """Send a JSON response, with non-finite numbers as null."""
+        data = json.dumps(json_compatible(body), allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+        if self.close_connection:
+            # Tell the client not to reuse a connection with an unread body
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
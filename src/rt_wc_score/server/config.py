@@ -0,0 +1,52 @@
+"""Configuration for the scoring server."""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ServerConfig(BaseModel):
+    """Configuration for the scoring server."""
+
+    host: str = Field(default="127.0.0.1", description="Address to listen on")
+    port: int = Field(default=8080, ge=0, description="Port to listen on")
+    executor: Literal["thread", "process"] = Field(
+        default="thread",
+        description="Worker pool type; processes avoid the GIL for CPU-bound scoring",
+    )
+    workers: int = Field(default=4, gt=0, description="Number of scoring workers")
+    max_queue: int = Field(
+        default=64,
+        ge=0,
+        description="Requests allowed to wait for a worker before returning 503",
+    )
+    max_body_bytes: int = Field(
+        default=4 * 1024 * 1024, gt=0, description="Maximum request body size"
+    )
+    max_batch_size: int = Field(
+        default=256, gt=0, description="Maximum number of payloads per batch request"
+    )
+    request_timeout: float = Field(
+        default=30.0, gt=0, description="Seconds to wait for a scoring result"
+    )
+    keep_alive_timeout: float = Field(
+        default=15.0, gt=0, description="Seconds an idle connection is kept open"
+    )
+    config_path: Optional[str] = Field(
+        default=None,
+        description="Pipeline configuration file, reloaded on change if given",
+    )
+    expose_metrics: bool = Field(
+        default=False, description="Serve Prometheus metrics at GET /metrics"
+    )
+    metrics_file: Optional[str] = Field(
+        default=None,
+        description="File the Prometheus metrics are periodically written to",
+    )
+    metrics_interval: float = Field(
+        default=15.0, gt=0, description="Seconds between writes of the metrics file"
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
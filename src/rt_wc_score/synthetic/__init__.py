@@ -0,0 +1,2 @@
+from .config import SessionGeneratorConfig
+from ._generator import STYLES, SessionGenerator, SyntheticSession
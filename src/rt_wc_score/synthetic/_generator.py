@@ -0,0 +1,440 @@
+"""Generation of synthetic sessions in the `InputData` format."""
+
+import json
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from .._utils import group_ranks
+from .config import SessionGeneratorConfig
+
+# Motion styles; bot sessions use one of the configured bot styles
+STYLES = ("human", "line", "bezier")
+
+# Suffix appended to the millisecond timestamps of each format
+_TIMESTAMP_FORMATS = ("iso_z", "iso_offset", "iso_naive")
+_TIMESTAMP_SUFFIXES = ("Z", "+00:00", "")
+
+# Typed keys, weighted towards the frequent letters of English text
+_KEYS = np.array(list("etaoinshrdlucmfwypvbgkjqxz"))
+_KEY_WEIGHTS = np.linspace(2.0, 0.2, len(_KEYS))
+_KEY_WEIGHTS /= _KEY_WEIGHTS.sum()
+
+# Vertical distance between stacked checkboxes, in pixels
+_CHECKBOX_SPACING = 40.0
+
+# Fitts' law movement time in seconds: intercept + slope * log2(D / W + 1)
+_FITTS_INTERCEPT = 0.15
+_FITTS_SLOPE = 0.12
+
+
+class SyntheticSession(NamedTuple):
+    """Generated session with its ground truth."""
+
+    payload: Dict[str, Any]
+    is_bot: bool
+    style: str
+
+
+class SessionGenerator:
+    """Generates reproducible synthetic sessions at scale.
+
+    Each session types a few keys, then moves the mouse from a random point
+    to each checkbox of a column and finally to the sign-in button, clicking
+    every target. Human sessions move along gently curved paths with a
+    bell-shaped speed profile, miss each target slightly and correct with a
+    second sub-movement, and have jittered positions and irregular event
+    intervals. Bot sessions move along straight lines or smooth Bezier curves
+    at constant speed and constant event intervals, and click and type with
+    fixed timings.
+
+    Sessions are generated in chunks of `chunk_size`, with all the events of a
+    chunk drawn as arrays at once. Session `index` only depends on the seed and
+    the chunk size, so any range of sessions can be regenerated on its own.
+
+    Example:
+        generator = SessionGenerator(SessionGeneratorConfig(seed=7))
+        for session in generator.generate(1000):
+            processor(session.payload)
+    """
+
+    def __init__(self, config: Optional[SessionGeneratorConfig] = None):
+        """Initialize the generator.
+
+        Args:
+            config: Configuration of the generated sessions
+
+        Raises:
+            ValueError: If a count range is invalid or there are no bot styles
+        """
+        self.config = config or SessionGeneratorConfig()
+        for name in ("movements", "checkboxes", "keystrokes"):
+            low, high = getattr(self.config, name)
+            if low < 0 or low > high:
+                raise ValueError(
+                    f"Range of {name} must be non-negative and ordered, "
+                    f"got {(low, high)}"
+                )
+        if not self.config.bot_styles:
+            raise ValueError("At least one bot style is needed")
+
+        start_time = self.config.start_time
+        if start_time.tzinfo is not None:
+            start_time = start_time.astimezone(timezone.utc).replace(tzinfo=None)
+        self._epoch = np.datetime64(start_time, "ms")
+        self._bot_styles = np.array(
+            [STYLES.index(style) for style in self.config.bot_styles]
+        )
+
+    def generate(self, count: int, start: int = 0) -> Iterator[SyntheticSession]:
+        """Generate consecutive sessions.
+
+        Args:
+            count: Number of sessions
+            start: Index of the first session
+
+        Yields:
+            Sessions `start` to `start + count - 1`
+        """
+        chunk_size = self.config.chunk_size
+        stop = start + count
+        for chunk_index in range(start // chunk_size, -(-stop // chunk_size)):
+            first = chunk_index * chunk_size
+            sessions = self._chunk(chunk_index)
+            yield from sessions[max(start - first, 0) : stop - first]
+
+    def session(self, index: int) -> SyntheticSession:
+        """Generate the session with the given index."""
+        return next(self.generate(1, start=index))
+
+    def write_jsonl(
+        self, path: Union[str, Path], count: int, start: int = 0
+    ) -> np.ndarray:
+        """Write generated payloads to a file, one JSON document per line.
+
+        Args:
+            path: Destination file
+            count: Number of sessions
+            start: Index of the first session
+
+        Returns:
+            Whether each written session is a bot
+        """
+        labels = np.zeros(count, dtype=bool)
+        with open(path, "w", encoding="utf-8") as f:
+            for i, session in enumerate(self.generate(count, start=start)):
+                f.write(json.dumps(session.payload, separators=(",", ":")))
+                f.write("\n")
+                labels[i] = session.is_bot
+        return labels
+
+    def _chunk(self, chunk_index: int) -> List[SyntheticSession]:
+        """Generate all sessions of a chunk."""
+        config = self.config
+        size = config.chunk_size
+        rng = np.random.default_rng([config.seed, chunk_index])
+        width, height = config.viewport
+
+        # Per-session draws
+        is_bot = rng.random(size) < config.bot_ratio
+        bot_style = self._bot_styles[rng.integers(0, len(self._bot_styles), size)]
+        style = np.where(is_bot, bot_style, 0)
+        n_moves = rng.integers(config.movements[0], config.movements[1] + 1, size)
+        n_boxes = rng.integers(config.checkboxes[0], config.checkboxes[1] + 1, size)
+        n_keys = rng.integers(config.keystrokes[0], config.keystrokes[1] + 1, size)
+        session_start = rng.uniform(0, config.time_span, size)
+        if config.timestamp_format == "mixed":
+            formats = rng.integers(0, len(_TIMESTAMP_FORMATS), size)
+        else:
+            formats = np.full(size, _TIMESTAMP_FORMATS.index(config.timestamp_format))
+
+        # Fixed timings of bots
+        bot_interval = rng.choice([0.008, 0.010, 0.016, 0.020], size)
+        bot_reaction = rng.choice([0.0, 0.02], size)
+        bot_hold = rng.choice([0.0, 0.001, 0.05], size)
+        bot_pause = rng.choice([0.0, 0.05, 0.1], size)
+        bot_key_interval = rng.choice([0.03, 0.05, 0.1], size)
+
+        keys = self._keystrokes(rng, n_keys, is_bot, session_start, bot_key_interval)
+        key_down, key_up, key_char, key_offsets, typing_end = keys
+
+        # Targets: a column of checkboxes, then the sign-in button below it
+        n_targets = n_boxes + 1
+        target_session = np.repeat(np.arange(size), n_targets)
+        target_rank = group_ranks(n_targets)
+        is_button = target_rank == n_boxes[target_session]
+        column_x = rng.uniform(0.2, 0.5, size) * width
+        column_top = rng.uniform(0.15, 0.35, size) * height
+        target_xy = np.column_stack(
+            (
+                column_x[target_session],
+                column_top[target_session] + _CHECKBOX_SPACING * target_rank,
+            )
+        )
+        target_xy[is_button, 0] += rng.uniform(0.0, 0.2, is_button.sum()) * width
+        target_xy[is_button, 1] += rng.uniform(20.0, 60.0, is_button.sum())
+        target_human = ~is_bot[target_session]
+        # Humans aim anywhere on the target, bots at its center
+        target_xy[target_human] += rng.normal(0.0, 3.0, (target_human.sum(), 2))
+
+        # Click timings of each target
+        n_target_total = len(target_session)
+        reaction = np.where(
+            target_human,
+            rng.uniform(0.04, 0.15, n_target_total),
+            bot_reaction[target_session],
+        )
+        hold = np.where(
+            target_human,
+            np.clip(rng.normal(0.095, 0.025, n_target_total), 0.03, None),
+            bot_hold[target_session],
+        )
+        pause = np.where(
+            target_human,
+            rng.uniform(0.1, 0.6, n_target_total),
+            bot_pause[target_session],
+        )
+
+        # Segments: humans reach each target with a primary sub-movement ending
+        # near it and a corrective one; bots with a single movement
+        segments_per_target = np.where(target_human, 2, 1)
+        segment_target = np.repeat(np.arange(n_target_total), segments_per_target)
+        segment_session = target_session[segment_target]
+        is_final = (
+            group_ranks(segments_per_target) == segments_per_target[segment_target] - 1
+        )
+        segment_end = target_xy[segment_target].copy()
+        is_primary = ~is_final
+        segment_end[is_primary] += rng.normal(0.0, 8.0, (is_primary.sum(), 2))
+        segments_per_session = np.bincount(segment_session, minlength=size)
+        is_first = group_ranks(segments_per_session) == 0
+        segment_begin = np.roll(segment_end, 1, axis=0)
+        segment_begin[is_first] = rng.uniform((0, 0), (width, height), (size, 2))
+
+        # Pause before each segment: after a click or between sub-movements
+        previous_target = np.roll(segment_target, 1)
+        previous_final = np.roll(is_final, 1)
+        dwell = np.where(
+            previous_final,
+            (reaction + hold + pause)[previous_target],
+            rng.uniform(0.03, 0.12, len(segment_target)),
+        )
+        dwell[is_first] = 0.0
+
+        # Movements per segment, at least one, the rest by segment length
+        delta = segment_end - segment_begin
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        n_moves = np.maximum(n_moves, segments_per_session)
+        moves_per_segment = _allocate(
+            distance + 20.0, segments_per_session, n_moves - segments_per_session
+        )
+        segment_style = style[segment_session]
+
+        # Curvature of each segment as perpendicular offsets of the Bezier
+        # control points, relative to the segment length
+        n_segments = len(segment_target)
+        curvature = rng.normal(0.0, 0.12, n_segments)
+        bend = np.select(
+            [segment_style[:, None] == 0, segment_style[:, None] == 2],
+            [
+                np.column_stack(
+                    (curvature, curvature * rng.uniform(0.5, 1.0, n_segments))
+                ),
+                rng.uniform(-0.5, 0.5, (n_segments, 2)),
+            ],
+            default=0.0,
+        )
+        normal = np.column_stack((-delta[:, 1], delta[:, 0]))
+        control_1 = segment_begin + delta / 3 + normal * bend[:, :1]
+        control_2 = segment_begin + 2 * delta / 3 + normal * bend[:, 1:]
+
+        # Positions of all movements along their segment
+        move_segment = np.repeat(np.arange(n_segments), moves_per_segment)
+        tau = (group_ranks(moves_per_segment) + 1) / moves_per_segment[move_segment]
+        move_human = segment_style[move_segment] == 0
+        # Minimum-jerk profile for humans, constant speed for bots
+        s = np.where(move_human, tau**3 * (10 - 15 * tau + 6 * tau**2), tau)[:, None]
+        points = (
+            (1 - s) ** 3 * segment_begin[move_segment]
+            + 3 * (1 - s) ** 2 * s * control_1[move_segment]
+            + 3 * (1 - s) * s**2 * control_2[move_segment]
+            + s**3 * segment_end[move_segment]
+        )
+        n_move_total = len(move_segment)
+        points[move_human] += rng.normal(0.0, 0.7, (move_human.sum(), 2))
+        move_xy = np.rint(points).astype(np.int64)
+
+        # Timestamps: humans take the time given by Fitts' law for each
+        # segment, spread irregularly over its movements; bots move at
+        # constant intervals
+        move_session = segment_session[move_segment]
+        duration = (
+            _FITTS_INTERCEPT + _FITTS_SLOPE * np.log2(distance / 16.0 + 1.0)
+        ) * (rng.lognormal(0.0, 0.15, n_segments))
+        interval = np.where(
+            move_human,
+            (duration / moves_per_segment)[move_segment]
+            * rng.lognormal(-0.06, 0.35, n_move_total),
+            bot_interval[move_session],
+        )
+        segment_first_move = np.cumsum(moves_per_segment) - moves_per_segment
+        interval[segment_first_move] += dwell
+        move_t = _segmented_cumsum(interval, n_moves) + np.repeat(typing_end, n_moves)
+
+        # Clicks on each target once its final segment ends
+        segment_last_move = np.cumsum(moves_per_segment) - 1
+        arrival = move_t[segment_last_move[is_final]]
+        down_t = arrival + reaction
+        up_t = down_t + hold
+        click_xy = move_xy[segment_last_move[is_final]]
+
+        stamps = self._format(np.concatenate((move_t, down_t, up_t, key_down, key_up)))
+        move_stamps, stamps = stamps[:n_move_total], stamps[n_move_total:]
+        down_stamps, stamps = stamps[:n_target_total], stamps[n_target_total:]
+        up_stamps, stamps = stamps[:n_target_total], stamps[n_target_total:]
+        key_down_stamps, key_up_stamps = (
+            stamps[: len(key_down)],
+            stamps[len(key_down) :],
+        )
+
+        move_x, move_y = move_xy[:, 0].tolist(), move_xy[:, 1].tolist()
+        click_x, click_y = click_xy[:, 0].tolist(), click_xy[:, 1].tolist()
+        hover_ms = ((up_t - arrival) * 1000.0).tolist()
+        key_chars = key_char.tolist()
+        leave_counts = np.where(is_bot, 0, rng.poisson(0.3, size)).tolist()
+        move_offsets = np.concatenate(([0], np.cumsum(n_moves)))
+        target_offsets = np.concatenate(([0], np.cumsum(n_targets)))
+
+        sessions = []
+        first_index = chunk_index * size
+        for i in range(size):
+            suffix = _TIMESTAMP_SUFFIXES[formats[i]]
+            a, b = move_offsets[i], move_offsets[i + 1]
+            movements = [
+                {"x": x, "y": y, "timestamp": stamp + suffix}
+                for x, y, stamp in zip(move_x[a:b], move_y[a:b], move_stamps[a:b])
+            ]
+
+            a, b = target_offsets[i], target_offsets[i + 1]
+            downs = [
+                {"x": x, "y": y, "timestamp": stamp + suffix}
+                for x, y, stamp in zip(click_x[a:b], click_y[a:b], down_stamps[a:b])
+            ]
+            ups = [
+                {"x": x, "y": y, "timestamp": stamp + suffix}
+                for x, y, stamp in zip(click_x[a:b], click_y[a:b], up_stamps[a:b])
+            ]
+            checkboxes = [
+                {"id": f"checkbox-{j}", "checked": True, "timestamp": up["timestamp"]}
+                for j, up in enumerate(ups[:-1])
+            ]
+
+            a, b = key_offsets[i], key_offsets[i + 1]
+            keydowns = [
+                {"key": key, "timestamp": stamp + suffix}
+                for key, stamp in zip(key_chars[a:b], key_down_stamps[a:b])
+            ]
+            keyups = [
+                {"key": key, "timestamp": stamp + suffix}
+                for key, stamp in zip(key_chars[a:b], key_up_stamps[a:b])
+            ]
+            key_events = sorted(
+                [dict(event, type="keydown") for event in keydowns]
+                + [dict(event, type="keyup") for event in keyups],
+                key=lambda event: event["timestamp"],
+            )
+
+            payload = {
+                "project_id": config.project_id,
+                "user_id": f"synthetic-{first_index + i}",
+                "metrics": {
+                    "mouse": {
+                        "movements": movements,
+                        "clicks": ups,
+                        "mouseDowns": downs,
+                        "mouseUps": ups,
+                    },
+                    "keyboard": {
+                        "keypresses": keydowns,
+                        "keydowns": keydowns,
+                        "keyups": keyups,
+                        "specificKeyEvents": key_events,
+                    },
+                    "signInButton": {
+                        "hoverToClickTime": hover_ms[target_offsets[i + 1] - 1],
+                        "mouseLeaveCount": leave_counts[i],
+                    },
+                },
+                "additional": {"checkbox_interactions": checkboxes},
+            }
+            sessions.append(
+                SyntheticSession(payload, bool(is_bot[i]), STYLES[style[i]])
+            )
+        return sessions
+
+    def _keystrokes(
+        self,
+        rng: np.random.Generator,
+        n_keys: np.ndarray,
+        is_bot: np.ndarray,
+        session_start: np.ndarray,
+        bot_key_interval: np.ndarray,
+    ):
+        """Draw the keystrokes typed at the start of each session.
+
+        Returns:
+            Key down and up times, typed keys, key offsets of each session and
+            the time each session starts moving the mouse
+        """
+        total = int(n_keys.sum())
+        key_session = np.repeat(np.arange(len(n_keys)), n_keys)
+        key_human = ~is_bot[key_session]
+        interval = np.where(
+            key_human,
+            rng.lognormal(np.log(0.17), 0.45, total),
+            bot_key_interval[key_session],
+        )
+        key_down = _segmented_cumsum(interval, n_keys) + np.repeat(
+            session_start, n_keys
+        )
+        hold = np.where(
+            key_human, np.clip(rng.normal(0.09, 0.025, total), 0.02, None), 0.001
+        )
+        key_up = key_down + hold
+        key_char = rng.choice(_KEYS, total, p=_KEY_WEIGHTS)
+
+        key_offsets = np.concatenate(([0], np.cumsum(n_keys)))
+        typing_end = session_start.copy()
+        typed = n_keys > 0
+        typing_end[typed] = key_up[key_offsets[1:][typed] - 1]
+        typing_end += np.where(is_bot, 0.1, rng.uniform(0.3, 1.5, len(n_keys)))
+        return key_down, key_up, key_char, key_offsets, typing_end
+
+    def _format(self, seconds: np.ndarray) -> List[str]:
+        """Format times since the start time as millisecond ISO 8601 strings."""
+        offsets = np.rint(seconds * 1000.0).astype("timedelta64[ms]")
+        return np.datetime_as_string(self._epoch + offsets, unit="ms").tolist()
+
+
+def _segmented_cumsum(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Cumulative sums restarting at each of the consecutive groups."""
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    starts = np.cumsum(counts) - counts
+    return sums[1:] - np.repeat(sums[starts], counts)
+
+
+def _allocate(weights: np.ndarray, counts: np.ndarray, extra: np.ndarray) -> np.ndarray:
+    """Split `extra[i] + counts[i]` items over the groups of session `i`.
+
+    Every element gets one item, and the extra items of a session are split
+    over its elements in proportion to their weights.
+    """
+    group = np.repeat(np.arange(len(counts)), counts)
+    totals = np.bincount(group, weights=weights, minlength=len(counts))
+    share = weights / totals[group] * extra[group]
+    cumulative = np.floor(np.round(_segmented_cumsum(share, counts), 6))
+    previous = np.concatenate(([0.0], cumulative[:-1]))
+    previous[group_ranks(counts) == 0] = 0.0
+    return (cumulative - previous).astype(np.int64) + 1
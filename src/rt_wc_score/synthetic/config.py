@@ -0,0 +1,60 @@
+"""Configuration for synthetic session generation."""
+
+from datetime import datetime, timezone
+from typing import List, Literal, Tuple
+
+from pydantic import BaseModel, Field
+
+
+class SessionGeneratorConfig(BaseModel):
+    """Configuration for synthetic session generation."""
+
+    seed: int = Field(default=0, description="Seed of the generated sessions")
+    bot_ratio: float = Field(
+        default=0.5, ge=0, le=1, description="Share of bot sessions"
+    )
+    bot_styles: List[Literal["line", "bezier"]] = Field(
+        default=["line", "bezier"],
+        description="Motion styles of bot sessions, picked uniformly",
+    )
+    movements: Tuple[int, int] = Field(
+        default=(100, 1000),
+        description="Inclusive range of mouse movements per session",
+    )
+    checkboxes: Tuple[int, int] = Field(
+        default=(3, 5), description="Inclusive range of checkboxes per session"
+    )
+    keystrokes: Tuple[int, int] = Field(
+        default=(0, 30), description="Inclusive range of keystrokes per session"
+    )
+    timestamp_format: Literal["iso_z", "iso_offset", "iso_naive", "mixed"] = Field(
+        default="iso_z",
+        description=(
+            "Timestamp strings: `iso_z` as JavaScript `toISOString`, `iso_offset` "
+            "with `+00:00`, `iso_naive` without zone, or `mixed` per session"
+        ),
+    )
+    viewport: Tuple[int, int] = Field(
+        default=(1280, 800), description="Width and height of the page in pixels"
+    )
+    start_time: datetime = Field(
+        default=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        description="Earliest session start",
+    )
+    time_span: float = Field(
+        default=30 * 24 * 3600.0,
+        ge=0,
+        description="Sessions start uniformly within this many seconds of start_time",
+    )
+    project_id: str = Field(
+        default="synthetic", description="Project ID of the generated sessions"
+    )
+    chunk_size: int = Field(
+        default=256,
+        gt=0,
+        description="Sessions generated together; part of what the seed reproduces",
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
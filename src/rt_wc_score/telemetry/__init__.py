@@ -0,0 +1,29 @@
+from ._metrics import (
+    DEFAULT_BUCKETS,
+    Counter,
+    CounterSeries,
+    Histogram,
+    HistogramSeries,
+    exponential_buckets,
+    linear_buckets,
+)
+from ._registry import REGISTRY, MetricsRegistry
+from ._exporters import MetricsFileWriter, MetricsServer, send_metrics, write_metrics
+from ._pipeline import (
+    DEGRADATIONS,
+    INPUT_REJECTIONS,
+    PAYLOAD_EVENTS,
+    PIPELINE_CACHE,
+    PROFILES,
+    RESULTS,
+    SCORES,
+    STAGE_SECONDS,
+    VERDICTS,
+)
+from ._profiling import (
+    ProfilingConfig,
+    SamplingProfiler,
+    list_profiles,
+    payload_metadata,
+    summarize_profiles,
+)
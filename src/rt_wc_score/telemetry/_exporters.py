@@ -0,0 +1,161 @@
+"""Exporting metrics over HTTP or to a file."""
+
+import os
+import logging
+import tempfile
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+from ._registry import REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def write_metrics(
+    path: Union[str, Path], registry: Optional[MetricsRegistry] = None
+) -> None:
+    """Write the metrics to a file, replacing it atomically.
+
+    The file can be picked up by the node exporter textfile collector.
+
+    Args:
+        path: Destination file
+        registry: Registry to export; the pipeline registry by default
+    """
+    path = Path(path)
+    text = (registry or REGISTRY).to_prometheus()
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class MetricsFileWriter:
+    """Writes the metrics to a file periodically from a background thread."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        interval: float = 15.0,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """Initialize the writer.
+
+        Args:
+            path: Destination file
+            interval: Seconds between writes
+            registry: Registry to export; the pipeline registry by default
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = registry or REGISTRY
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start writing in the background."""
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop writing, after writing the metrics one last time."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            stopped = self._stopped.wait(self.interval)
+            try:
+                write_metrics(self.path, self.registry)
+            except OSError as e:
+                logger.error(f"Error writing metrics to {self.path}: {str(e)}")
+            if stopped:
+                return
+
+
+class MetricsServer:
+    """Serves the metrics at `GET /metrics` for scraping."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """Initialize the server.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+            registry: Registry to export; the pipeline registry by default
+        """
+        self.registry = registry or REGISTRY
+        self.httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.registry = self.registry
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port the server listens on."""
+        return self.httpd.server_address[:2]
+
+    def start(self) -> threading.Thread:
+        """Serve in a background thread.
+
+        Returns:
+            The thread running the server
+        """
+        thread = threading.Thread(
+            target=self.httpd.serve_forever, name="metrics-server", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        """Stop serving."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the exposition text of the server's registry."""
+
+    def do_GET(self) -> None:
+        if self.path != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        send_metrics(self, self.server.registry)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def send_metrics(handler: BaseHTTPRequestHandler, registry: MetricsRegistry) -> None:
+    """Send the exposition text of a registry as an HTTP response.
+
+    Args:
+        handler: Handler of the request
+        registry: Registry to export
+    """
+    data = registry.to_prometheus().encode("utf-8")
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", CONTENT_TYPE)
+    handler.send_header("Content-Length", str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
@@ -0,0 +1,449 @@
+"""Metric primitives with per-thread aggregation.
+
+Every thread records into its own cells, so the hot path takes no lock: the
+cells of a series are only ever written by the thread that owns them. Reading a
+metric merges the cells of all threads, which is cheap and only done when the
+metrics are exported. When a thread exits, its cells are folded into a retired
+cell of their series, so threads started per connection do not pile up cells.
+"""
+
+import weakref
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Label set of a series, as (name, value) pairs in label name order
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Latency buckets in seconds, from 100us to 10s
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _ThreadToken:
+    """Object held only by a thread's local storage, dropped when it exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Series(ABC):
+    """One labeled series, holding one cell per live recording thread.
+
+    The cells of exited threads are merged into a single retired cell.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: List[Any] = []
+        self._retired: Optional[Any] = None
+
+    def _cell(self) -> Any:
+        """Get the cell of the current thread, creating it on first use."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._new_cell()
+            token = _ThreadToken()
+            self._local.cell = cell
+            self._local.token = token
+            with self._lock:
+                self._cells.append(cell)
+            # Runs when the thread's local storage is cleared on exit
+            finalizer = weakref.finalize(token, self._retire, cell)
+            finalizer.atexit = False
+            return cell
+
+    def _retire(self, cell: Any) -> None:
+        """Merge the cell of an exited thread into the retired cell."""
+        with self._lock:
+            if self._retired is None:
+                self._retired = self._new_cell()
+                self._cells.append(self._retired)
+            self._merge(self._retired, cell)
+            self._cells.remove(cell)
+
+    def _all_cells(self) -> List[Any]:
+        with self._lock:
+            return list(self._cells)
+
+    @abstractmethod
+    def _new_cell(self) -> Any:
+        """Create the cell of a new recording thread."""
+        pass
+
+    @abstractmethod
+    def _merge(self, target: Any, cell: Any) -> None:
+        """Add the values of a cell no longer written to another cell."""
+        pass
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Zero the cells of all threads."""
+        pass
+
+
+class CounterSeries(_Series):
+    """Series of a counter with fixed label values."""
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the count.
+
+        Args:
+            amount: Non-negative amount to add
+
+        Raises:
+            ValueError: If the amount is negative
+        """
+        if amount < 0:
+            raise ValueError("Counters cannot decrease")
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += amount
+
+    def value(self) -> float:
+        """Get the current count."""
+        # Under the lock, so a retiring cell is not counted twice
+        with self._lock:
+            return sum(cell[0] for cell in self._cells)
+
+    def _new_cell(self) -> List[float]:
+        return [0.0]
+
+    def _merge(self, target: List[float], cell: List[float]) -> None:
+        target[0] += cell[0]
+
+    def _reset(self) -> None:
+        for cell in self._all_cells():
+            cell[0] = 0.0
+
+
+class _HistogramCell:
+    """Values recorded by one thread: folded bucket counts and a buffer."""
+
+    __slots__ = ("counts", "total", "buffer", "lock")
+
+    def __init__(self, size: int):
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.total = 0.0
+        self.buffer: List[float] = []
+        self.lock = threading.Lock()
+
+
+class HistogramSeries(_Series):
+    """Series of a histogram with fixed label values.
+
+    Observed values are appended to a per-thread buffer, which the owning
+    thread folds into the bucket counts with numpy once it holds
+    `FOLD_SIZE` values. This keeps `observe` to a list append.
+    """
+
+    FOLD_SIZE = 256
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        super().__init__()
+        self._buckets = buckets
+        self._bounds = np.asarray(buckets, dtype=np.float64)
+
+    def observe(self, value: float) -> None:
+        """Record one value.
+
+        Args:
+            value: Observed value
+        """
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        buffer = cell.buffer
+        buffer.append(value)
+        if len(buffer) >= self.FOLD_SIZE:
+            self._fold(cell)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the merged histogram.
+
+        Returns:
+            Dictionary with `buckets` (upper bound to cumulative count, ending
+            with `inf`), `count` and `sum`
+        """
+        counts = np.zeros(len(self._buckets) + 1, dtype=np.int64)
+        total = 0.0
+        pending: List[float] = []
+        # Under the lock, so a retiring cell is not counted twice
+        with self._lock:
+            for cell in self._cells:
+                with cell.lock:
+                    pending.extend(cell.buffer)
+                    counts += cell.counts
+                    total += cell.total
+        counts += self._bucket_counts(pending)
+        total += sum(pending)
+
+        cumulative = np.cumsum(counts)
+        return {
+            "buckets": {
+                bound: int(count)
+                for bound, count in zip(self._buckets + (float("inf"),), cumulative)
+            },
+            "count": int(cumulative[-1]),
+            "sum": total,
+        }
+
+    def _fold(self, cell: _HistogramCell) -> None:
+        """Move the buffered values of a cell into its bucket counts."""
+        with cell.lock:
+            values = cell.buffer
+            cell.counts += self._bucket_counts(values)
+            cell.total += sum(values)
+            cell.buffer = []
+
+    def _bucket_counts(self, values: List[float]) -> np.ndarray:
+        """Count values per bucket; a value equal to a bound is in its bucket."""
+        indices = np.searchsorted(self._bounds, values, side="left")
+        return np.bincount(indices, minlength=len(self._buckets) + 1)
+
+    def _new_cell(self) -> _HistogramCell:
+        return _HistogramCell(len(self._buckets) + 1)
+
+    def _merge(self, target: _HistogramCell, cell: _HistogramCell) -> None:
+        self._fold(cell)
+        with target.lock:
+            target.counts += cell.counts
+            target.total += cell.total
+
+    def _reset(self) -> None:
+        for cell in self._all_cells():
+            with cell.lock:
+                cell.counts[:] = 0
+                cell.total = 0.0
+                cell.buffer = []
+
+
+class _Metric(ABC):
+    """Metric family: series of the same metric with different label values."""
+
+    type_name = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str]):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        # Unlabeled metrics have a single series, exported even while zero
+        self._default = None if self.labelnames else self.labels()
+
+    def labels(self, **labels: Any) -> Any:
+        """Get the series with the given label values.
+
+        Keep the returned series to record into it without any label lookup.
+
+        Args:
+            **labels: Value of every label name
+
+        Returns:
+            Series of the label values
+
+        Raises:
+            ValueError: If the label names do not match
+        """
+        try:
+            key = tuple([str(labels[name]) for name in self.labelnames])
+        except KeyError:
+            key = None
+        if key is None or len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} takes labels {list(self.labelnames)}, "
+                f"got {sorted(labels)}"
+            )
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def series(self) -> Dict[LabelSet, Any]:
+        """Get all series by label set."""
+        with self._lock:
+            items = list(self._series.items())
+        return {tuple(zip(self.labelnames, key)): series for key, series in items}
+
+    def reset(self) -> None:
+        """Zero all series."""
+        with self._lock:
+            for series in self._series.values():
+                series._reset()
+
+    @abstractmethod
+    def _new_series(self) -> Any:
+        """Create the series of a new label set."""
+        pass
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(
+        self, name: str, description: str = "", labelnames: Sequence[str] = ()
+    ):
+        """Initialize a counter at zero.
+
+        Args:
+            name: Name of the metric
+            description: Human-readable description of the metric
+            labelnames: Names of the labels splitting the count
+        """
+        super().__init__(name, description, labelnames)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the count of a series.
+
+        Args:
+            amount: Non-negative amount to add
+            **labels: Label values identifying the series
+
+        Raises:
+            ValueError: If the amount is negative or the labels do not match
+        """
+        series = self._default if not labels else None
+        (series or self.labels(**labels)).inc(amount)
+
+    def value(self, **labels: Any) -> float:
+        """Get the count of a series.
+
+        Args:
+            **labels: Label values identifying the series
+
+        Returns:
+            Count of the series
+        """
+        return self.labels(**labels).value()
+
+    def snapshot(self) -> Dict[LabelSet, float]:
+        """Get the counts of all series.
+
+        Returns:
+            Label set to count
+        """
+        return {labels: series.value() for labels, series in self.series().items()}
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets.
+
+    Buckets are given by their inclusive upper bounds; values above the last
+    bound fall into an implicit `+Inf` bucket.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        description: str = "",
+        labelnames: Sequence[str] = (),
+    ):
+        """Initialize an empty histogram.
+
+        Args:
+            name: Name of the metric
+            buckets: Increasing upper bounds of the buckets
+            description: Human-readable description of the metric
+            labelnames: Names of the labels splitting the distribution
+
+        Raises:
+            ValueError: If the buckets are empty or not increasing
+        """
+        bounds = tuple(float(bound) for bound in buckets)
+        if not bounds or any(a >= b for a, b in zip(bounds, bounds[1:])):
+            raise ValueError(f"Buckets of {name} must be non-empty and increasing")
+
+        self.buckets = bounds
+        super().__init__(name, description, labelnames)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one value in a series.
+
+        Args:
+            value: Observed value
+            **labels: Label values identifying the series
+        """
+        series = self._default if not labels else None
+        (series or self.labels(**labels)).observe(value)
+
+    def snapshot(self, **labels: Any) -> Dict[str, Any]:
+        """Get the distribution of a series.
+
+        Args:
+            **labels: Label values identifying the series
+
+        Returns:
+            Dictionary with `buckets` (upper bound to cumulative count, ending
+            with `inf`), `count` and `sum`
+        """
+        return self.labels(**labels).snapshot()
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+
+def linear_buckets(start: float, width: float, count: int) -> Tuple[float, ...]:
+    """Get `count` evenly spaced bucket bounds.
+
+    Args:
+        start: First upper bound
+        width: Distance between bounds
+        count: Number of bounds
+
+    Returns:
+        Bucket upper bounds
+    """
+    return tuple(round(start + i * width, 10) for i in range(count))
+
+
+def exponential_buckets(
+    start: float, factor: float, count: int, limit: Optional[float] = None
+) -> Tuple[float, ...]:
+    """Get `count` bucket bounds growing by `factor`.
+
+    Args:
+        start: First upper bound
+        factor: Ratio between consecutive bounds
+        count: Number of bounds
+        limit: Bounds above this value are dropped
+
+    Returns:
+        Bucket upper bounds
+    """
+    bounds = [start * factor**i for i in range(count)]
+    if limit is not None:
+        bounds = [bound for bound in bounds if bound < limit] + [limit]
+    return tuple(bounds)
@@ -0,0 +1,52 @@
+"""Metrics recorded by the scoring pipeline."""
+
+from ._metrics import DEFAULT_BUCKETS, exponential_buckets, linear_buckets
+from ._registry import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "rt_wc_score_stage_seconds",
+    DEFAULT_BUCKETS,
+    "Seconds spent in each pipeline stage",
+    labelnames=("stage",),
+)
+PAYLOAD_EVENTS = REGISTRY.histogram(
+    "rt_wc_score_payload_events",
+    exponential_buckets(1, 4, 10),
+    "Events per payload by event type",
+    labelnames=("type",),
+)
+INPUT_REJECTIONS = REGISTRY.counter(
+    "rt_wc_score_input_rejections_total",
+    "Inputs rejected for exceeding a size limit",
+    labelnames=("reason", "field"),
+)
+DEGRADATIONS = REGISTRY.counter(
+    "rt_wc_score_degradations_total",
+    "Processors sampled to meet a deadline",
+    labelnames=("processor",),
+)
+PIPELINE_CACHE = REGISTRY.counter(
+    "rt_wc_score_pipeline_cache_total",
+    "Lookups of built pipelines when the configuration changes",
+    labelnames=("result",),
+)
+RESULTS = REGISTRY.counter(
+    "rt_wc_score_results_total",
+    "Processed payloads by outcome",
+    labelnames=("outcome",),
+)
+VERDICTS = REGISTRY.counter(
+    "rt_wc_score_verdicts_total",
+    "Analyzed sessions by verdict",
+    labelnames=("is_bot",),
+)
+SCORES = REGISTRY.histogram(
+    "rt_wc_score_score",
+    linear_buckets(0.05, 0.05, 20),
+    "Final heuristic scores (lower = more bot-like)",
+)
+PROFILES = REGISTRY.counter(
+    "rt_wc_score_profiles_total",
+    "Calls captured by the sampling profiler",
+    labelnames=("reason",),
+)
@@ -0,0 +1,365 @@
+"""Sampled profiling of pipeline calls.
+
+A small share of the calls is run under `cProfile` and `tracemalloc`, and the
+captures are kept in a bounded directory for later analysis with
+`summarize_profiles`. One call out of every `every_n` is captured, and with a
+`latency_threshold` one call out of every `armed_every_n` is run under the
+profilers and kept if it turns out slower than the threshold. Calls are only
+ever captured while they run: the pipeline keeps state across calls (e.g. the
+trajectory index) and records metrics, so a rerun would change both.
+"""
+
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+import itertools
+import tempfile
+import threading
+import tracemalloc
+from collections import Counter as _Tally
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from ._pipeline import PROFILES
+
+logger = logging.getLogger(__name__)
+
+# Files of one capture, sharing the capture name as stem
+_STATS_SUFFIX = ".prof"
+_MEMORY_SUFFIX = ".tracemalloc"
+_META_SUFFIX = ".json"
+
+
+class ProfilingConfig(BaseModel):
+    """Configuration for sampled profiling of pipeline calls."""
+
+    enabled: bool = Field(default=False, description="Whether to profile calls")
+    every_n: int = Field(
+        default=1000, gt=0, description="Profile one call out of this many"
+    )
+    latency_threshold: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Keep armed calls slower than this (seconds, under profiling)",
+    )
+    armed_every_n: int = Field(
+        default=20,
+        gt=0,
+        description=(
+            "With a latency threshold, run one call out of this many under the "
+            "profilers, keeping it if it is slow"
+        ),
+    )
+    directory: Optional[str] = Field(
+        default=None,
+        description="Directory of the captures; under the temp directory if None",
+    )
+    max_profiles: int = Field(
+        default=100, gt=0, description="Captures kept, dropping the oldest"
+    )
+    trace_memory: bool = Field(
+        default=True, description="Also capture a tracemalloc snapshot"
+    )
+    memory_frames: int = Field(
+        default=1, gt=0, description="Stack frames stored per traced allocation"
+    )
+
+    class Config:
+        """ Pydantic configuration."""
+        frozen = True
+
+
+def default_profile_directory() -> Path:
+    """Get the directory of the captures when none is configured."""
+    return Path(tempfile.gettempdir()) / "rt-wc-score-profiles"
+
+
+class SamplingProfiler:
+    """Profiles a sample of the calls made through it.
+
+    Only one call is captured at a time per process; a call due for capture
+    while another capture is running is run normally. Armed calls are timed
+    with the profilers on, which slows them down, so their threshold should
+    leave room for that overhead. `tracemalloc` traces the
+    allocations of all threads, so under concurrency a memory snapshot also
+    holds allocations made by other calls.
+
+    Example:
+        profiler = SamplingProfiler(ProfilingConfig(enabled=True, every_n=100))
+        result = profiler(processor._process, raw_data, None)
+    """
+
+    def __init__(self, config: Optional[ProfilingConfig] = None):
+        """Initialize the profiler.
+
+        Args:
+            config: Configuration of the sampling and of the captures
+        """
+        self.config = config or ProfilingConfig(enabled=True)
+        self.directory = Path(self.config.directory or default_profile_directory())
+
+        self._calls = itertools.count(1)
+        self._capturing = threading.Lock()
+
+    def __call__(
+        self,
+        fn: Callable[..., Any],
+        raw_data: Any,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Run `fn(raw_data, deadline)`, profiling it if it is sampled or armed.
+
+        Args:
+            fn: Function processing one payload
+            raw_data: Payload of the call
+            deadline: `time.monotonic()` time passed on to `fn`
+
+        Returns:
+            Return value of `fn`
+        """
+        call = next(self._calls)
+        if call % self.config.every_n == 0:
+            reason = "sampled"
+        elif (
+            self.config.latency_threshold is not None
+            and call % self.config.armed_every_n == 0
+        ):
+            reason = "slow"
+        else:
+            return fn(raw_data, deadline)
+
+        if not self._capturing.acquire(blocking=False):
+            return fn(raw_data, deadline)
+        try:
+            return self._capture(fn, raw_data, deadline, reason)
+        finally:
+            self._capturing.release()
+
+    def _capture(
+        self,
+        fn: Callable[..., Any],
+        raw_data: Any,
+        deadline: Optional[float],
+        reason: str,
+    ) -> Any:
+        """Run one call under the profilers and store the capture, unless it
+        is a `slow` capture of a call within the latency threshold."""
+        trace_memory = self.config.trace_memory
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.config.memory_frames)
+        if trace_memory:
+            tracemalloc.reset_peak()
+
+        profile = cProfile.Profile()
+        start = time.monotonic()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in this thread
+            if started_tracing:
+                tracemalloc.stop()
+            return fn(raw_data, deadline)
+
+        try:
+            result = fn(raw_data, deadline)
+        finally:
+            profile.disable()
+            elapsed = time.monotonic() - start
+            keep = reason != "slow" or elapsed > self.config.latency_threshold
+            snapshot = None
+            peak_bytes = None
+            if trace_memory and keep:
+                snapshot = tracemalloc.take_snapshot()
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+
+        if not keep:
+            return result
+
+        metadata = {
+            "reason": reason,
+            "captured_at": time.time(),
+            "pid": os.getpid(),
+            "seconds": elapsed,
+            "memory_peak_bytes": peak_bytes,
+            **payload_metadata(raw_data),
+        }
+        try:
+            self._store(profile, snapshot, metadata)
+        except OSError as e:
+            logger.error(f"Error storing profile in {self.directory}: {str(e)}")
+        else:
+            PROFILES.inc(reason=reason)
+        return result
+
+    def _store(
+        self,
+        profile: cProfile.Profile,
+        snapshot: Optional[tracemalloc.Snapshot],
+        metadata: Dict[str, Any],
+    ) -> None:
+        """Write a capture and drop the oldest ones over the limit."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.time_ns():020d}-{os.getpid()}-{metadata['reason']}"
+        base = self.directory / stem
+
+        profile.dump_stats(str(base) + _STATS_SUFFIX)
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces(
+                (
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                )
+            )
+            snapshot.dump(str(base) + _MEMORY_SUFFIX)
+        # Metadata is written last: a capture is complete once it exists
+        with open(str(base) + _META_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        for stale in list_profiles(self.directory)[: -self.config.max_profiles]:
+            for suffix in (_META_SUFFIX, _STATS_SUFFIX, _MEMORY_SUFFIX):
+                try:
+                    os.unlink(str(stale) + suffix)
+                except FileNotFoundError:
+                    pass
+
+
+def payload_metadata(raw_data: Any) -> Dict[str, Any]:
+    """Describe the size of a payload.
+
+    Args:
+        raw_data: Payload as JSON text or decoded
+
+    Returns:
+        Dictionary with the `payload_bytes` of its JSON text and the number of
+        `events` in each list, by dotted path
+    """
+    if isinstance(raw_data, (str, bytes, bytearray)):
+        payload_bytes = len(raw_data)
+        try:
+            raw_data = json.loads(raw_data)
+        except ValueError:
+            return {"payload_bytes": payload_bytes, "events": {}}
+    else:
+        try:
+            payload_bytes = len(json.dumps(raw_data, separators=(",", ":")))
+        except (TypeError, ValueError):
+            payload_bytes = None
+
+    events: Dict[str, int] = {}
+    pending = [("", raw_data)]
+    while pending:
+        path, value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend((f"{path}{key}.", item) for key, item in value.items())
+        elif isinstance(value, list):
+            events[path[:-1]] = len(value)
+    return {"payload_bytes": payload_bytes, "events": dict(sorted(events.items()))}
+
+
+def list_profiles(directory: Union[str, Path, None] = None) -> List[Path]:
+    """Get the complete captures in a directory, oldest first.
+
+    Args:
+        directory: Directory of the captures; the default one if None
+
+    Returns:
+        Path of each capture without suffix
+    """
+    directory = Path(directory or default_profile_directory())
+    if not directory.is_dir():
+        return []
+    return sorted(path.with_suffix("") for path in directory.glob("*" + _META_SUFFIX))
+
+
+def summarize_profiles(
+    directory: Union[str, Path, None] = None,
+    top: int = 20,
+    sort: str = "cumulative",
+) -> Dict[str, Any]:
+    """Merge the captures in a directory and summarize their hot spots.
+
+    Args:
+        directory: Directory of the captures; the default one if None
+        top: Number of functions and allocation sites to list
+        sort: Function ordering, `cumulative` or `total` seconds
+
+    Returns:
+        Dictionary with the number of `profiles`, their `reasons`, the total
+        `seconds` and `payload_bytes` of the captured calls, the `functions`
+        taking the most time over all captures and the `allocations` holding
+        the most memory at the end of the captured calls
+
+    Raises:
+        ValueError: If the sort order is unknown
+    """
+    sort_keys = {"cumulative": "cumulative_seconds", "total": "total_seconds"}
+    if sort not in sort_keys:
+        raise ValueError(f"Unknown sort order {sort}, use one of {list(sort_keys)}")
+
+    captures = list_profiles(directory)
+    reasons: _Tally = _Tally()
+    seconds = 0.0
+    payload_bytes = 0
+    stats: Optional[pstats.Stats] = None
+    allocations: Dict[str, List[int]] = {}
+    for base in captures:
+        try:
+            with open(str(base) + _META_SUFFIX, encoding="utf-8") as f:
+                metadata = json.load(f)
+            if stats is None:
+                stats = pstats.Stats(str(base) + _STATS_SUFFIX)
+            else:
+                stats.add(str(base) + _STATS_SUFFIX)
+        except (OSError, ValueError, TypeError) as e:
+            # Dropped from the ring buffer while reading
+            logger.warning(f"Skipping profile {base}: {str(e)}")
+            continue
+
+        reasons[metadata["reason"]] += 1
+        seconds += metadata["seconds"]
+        payload_bytes += metadata.get("payload_bytes") or 0
+        memory_path = str(base) + _MEMORY_SUFFIX
+        if os.path.exists(memory_path):
+            snapshot = tracemalloc.Snapshot.load(memory_path)
+            for stat in snapshot.statistics("lineno"):
+                frame = stat.traceback[0]
+                site = allocations.setdefault(
+                    f"{frame.filename}:{frame.lineno}", [0, 0]
+                )
+                site[0] += stat.size
+                site[1] += stat.count
+
+    functions = []
+    if stats is not None:
+        for (filename, lineno, name), row in stats.stats.items():
+            _, calls, total, cumulative, _ = row
+            functions.append(
+                {
+                    "function": f"{filename}:{lineno}({name})",
+                    "calls": calls,
+                    "total_seconds": total,
+                    "cumulative_seconds": cumulative,
+                }
+            )
+        functions.sort(key=lambda item: item[sort_keys[sort]], reverse=True)
+
+    top_allocations = sorted(allocations.items(), key=lambda item: -item[1][0])[:top]
+    return {
+        "profiles": sum(reasons.values()),
+        "reasons": dict(reasons),
+        "seconds": seconds,
+        "payload_bytes": payload_bytes,
+        "functions": functions[:top],
+        "allocations": [
+            {"site": site, "bytes": size, "blocks": count}
+            for site, (size, count) in top_allocations
+        ],
+    }
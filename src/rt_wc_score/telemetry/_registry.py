@@ -0,0 +1,166 @@
+"""Registry of metrics and their Prometheus text exposition."""
+
+import math
+import threading
+from typing import Dict, List, Sequence
+
+from ._metrics import DEFAULT_BUCKETS, Counter, Histogram, LabelSet, _Metric
+
+
+class MetricsRegistry:
+    """Collection of metrics exported together."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric.
+
+        Args:
+            metric: Metric to export with the registry
+
+        Returns:
+            The metric
+
+        Raises:
+            ValueError: If another metric has the same name
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and existing is not metric:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, metric: _Metric) -> None:
+        """Remove a metric if it is registered."""
+        with self._lock:
+            if self._metrics.get(metric.name) is metric:
+                del self._metrics[metric.name]
+
+    def counter(
+        self, name: str, description: str = "", labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Get the counter with the given name, creating it if needed.
+
+        Args:
+            name: Name of the metric
+            description: Human-readable description of the metric
+            labelnames: Names of the labels splitting the count
+
+        Returns:
+            Registered counter
+        """
+        return self._get_or_create(Counter, name, description, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        description: str = "",
+        labelnames: Sequence[str] = (),
+    ) -> Histogram:
+        """Get the histogram with the given name, creating it if needed.
+
+        Args:
+            name: Name of the metric
+            buckets: Increasing upper bounds of the buckets
+            description: Human-readable description of the metric
+            labelnames: Names of the labels splitting the distribution
+
+        Returns:
+            Registered histogram
+        """
+        return self._get_or_create(
+            Histogram, name, description, labelnames, buckets=buckets
+        )
+
+    def metrics(self) -> List[_Metric]:
+        """Get the registered metrics, sorted by name."""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def reset(self) -> None:
+        """Zero all registered metrics."""
+        for metric in self.metrics():
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text, version 0.0.4
+        """
+        lines: List[str] = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for labels, series in sorted(metric.series().items()):
+                if isinstance(metric, Counter):
+                    lines.append(
+                        f"{metric.name}{_format_labels(labels)} "
+                        f"{_format_value(series.value())}"
+                    )
+                    continue
+
+                snapshot = series.snapshot()
+                for bound, count in snapshot["buckets"].items():
+                    bucket_labels = labels + (("le", _format_value(bound)),)
+                    lines.append(
+                        f"{metric.name}_bucket{_format_labels(bucket_labels)} {count}"
+                    )
+                lines.append(
+                    f"{metric.name}_sum{_format_labels(labels)} "
+                    f"{_format_value(snapshot['sum'])}"
+                )
+                lines.append(
+                    f"{metric.name}_count{_format_labels(labels)} {snapshot['count']}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, metric_type, name, description, labelnames, **kwargs):
+        """Get a registered metric of the given type or register a new one."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_type(
+                    name, description=description, labelnames=labelnames, **kwargs
+                )
+                self._metrics[name] = metric
+        if not isinstance(metric, metric_type) or metric.labelnames != tuple(
+            labelnames
+        ):
+            raise ValueError(
+                f"Metric {name} is already registered with another type or labels"
+            )
+        return metric
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value or bucket bound."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    """Format a label set, escaping the values."""
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+# Registry of the metrics recorded by the pipeline
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import copy
+
+import numpy as np
+import pytest
+
+from rt_wc_score.modules.preprocessing.json_flattener import (
+    ENCODING_RAW,
+    ENCODING_VARINT,
+    JsonDataFlattener,
+    JsonDataFlattenerConfigPM,
+    decode_payload,
+    encode_payload,
+)
+from rt_wc_score.modules.preprocessing.json_flattener._binary import (
+    decode_varints,
+    encode_varints,
+    zigzag_decode,
+    zigzag_encode,
+)
+
+
+def _payload():
+    return {
+        "project_id": "project",
+        "user_id": "user",
+        "metrics": {
+            "mouse": {
+                "movements": [
+                    {"x": 10, "y": -5, "timestamp": "2024-01-01T00:00:00.000Z"},
+                    {"x": 14, "y": 300, "timestamp": "2024-01-01T00:00:00.250Z"},
+                    # Out of order, and negative deltas
+                    {"x": 2, "y": 7, "timestamp": "2024-01-01T00:00:00.125Z"},
+                ],
+                "clicks": [{"timestamp": "2024-01-01T00:00:01.000Z"}],
+            },
+            "keyboard": {"keypresses": [{}, {}]},
+        },
+    }
+
+
+@pytest.mark.parametrize("encoding", [ENCODING_VARINT, ENCODING_RAW])
+def test_round_trip(encoding):
+    payload = _payload()
+    original = copy.deepcopy(payload)
+
+    decoded = decode_payload(encode_payload(payload, encoding=encoding))
+
+    assert payload == original
+    trace = decoded["metrics"]["mouse"].pop("movements")
+    del original["metrics"]["mouse"]["movements"]
+    assert decoded == original
+    start = 1704067200.0
+    np.testing.assert_array_equal(trace.x, [10, 2, 14])
+    np.testing.assert_array_equal(trace.y, [-5, 7, 300])
+    np.testing.assert_array_equal(trace.t, [start, start + 0.125, start + 0.25])
+
+
+def test_varint_and_raw_encodings_decode_alike():
+    rng = np.random.default_rng(0)
+    movements = [
+        {"x": int(x), "y": int(y), "timestamp": float(t)}
+        for x, y, t in zip(
+            rng.integers(-5000, 5000, 500),
+            rng.integers(-5000, 5000, 500),
+            1.7e9 + np.sort(rng.uniform(0, 600, 500)),
+        )
+    ]
+    payload = {"metrics": {"mouse": {"movements": movements}}}
+
+    traces = [
+        decode_payload(encode_payload(payload, encoding=encoding))["metrics"]["mouse"][
+            "movements"
+        ]
+        for encoding in (ENCODING_VARINT, ENCODING_RAW)
+    ]
+
+    for axis in ("x", "y", "t"):
+        np.testing.assert_array_equal(
+            getattr(traces[0], axis), getattr(traces[1], axis)
+        )
+
+
+def test_encoding_rounds_to_pixels_and_milliseconds():
+    payload = {
+        "metrics": {
+            "mouse": {"movements": [{"x": 10.6, "y": -2.4, "timestamp": 100.0004}]}
+        }
+    }
+
+    trace = decode_payload(encode_payload(payload))["metrics"]["mouse"]["movements"]
+
+    assert trace.x.tolist() == [11]
+    assert trace.y.tolist() == [-2]
+    assert trace.t.tolist() == [100.0]
+
+
+@pytest.mark.parametrize(
+    "movement",
+    [
+        {"x": 1, "timestamp": 100.0},
+        {"x": 1, "y": 2, "timestamp": "not a date"},
+        {"x": None, "y": 2, "timestamp": 100.0},
+    ],
+)
+def test_invalid_movements_are_not_encoded(movement):
+    with pytest.raises(ValueError):
+        encode_payload({"metrics": {"mouse": {"movements": [movement]}}})
+
+
+def test_raw_encoding_rejects_coordinates_beyond_int32():
+    movements = [{"x": 2**31, "y": 0, "timestamp": 100.0}]
+
+    with pytest.raises(ValueError):
+        encode_payload(
+            {"metrics": {"mouse": {"movements": movements}}}, encoding=ENCODING_RAW
+        )
+
+
+@pytest.mark.parametrize("encoding", [ENCODING_VARINT, ENCODING_RAW])
+def test_truncated_payloads_are_rejected(encoding):
+    data = encode_payload(_payload(), encoding=encoding)
+
+    for size in range(len(data)):
+        with pytest.raises(ValueError):
+            decode_payload(data[:size])
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: data + b"\x00",
+        lambda data: data[:4] + b"\x02" + data[5:],
+        lambda data: b"JSON" + data[4:],
+    ],
+)
+def test_corrupt_payloads_are_rejected(corrupt):
+    with pytest.raises(ValueError):
+        decode_payload(corrupt(encode_payload(_payload())))
+
+
+def test_unknown_trace_encoding_is_rejected():
+    data = bytearray(encode_payload(_payload(), encoding=ENCODING_RAW))
+    name = b"metrics.mouse.movements"
+    data[data.index(name) + len(name)] = 7
+
+    with pytest.raises(ValueError):
+        decode_payload(bytes(data))
+
+
+def test_varints_and_zigzag_round_trip():
+    values = np.array([0, 1, 127, 128, 300, 2**35, 2**64 - 1], dtype=np.uint64)
+    signed = np.array([0, -1, 1, -(2**40), 2**40, -(2**63), 2**63 - 1])
+
+    encoded = encode_varints(values)
+
+    np.testing.assert_array_equal(decode_varints(encoded, len(values)), values)
+    np.testing.assert_array_equal(zigzag_decode(zigzag_encode(signed)), signed)
+    with pytest.raises(ValueError):
+        decode_varints(encoded, len(values) + 1)
+    with pytest.raises(ValueError):
+        decode_varints(b"\x80" * 11, 1)
+
+
+def test_validating_flattener_leaves_decoded_payload_unchanged():
+    flattener = JsonDataFlattener(JsonDataFlattenerConfigPM(is_validate=True))
+    decoded = decode_payload(encode_payload(_payload()))
+    trace = decoded["metrics"]["mouse"]["movements"]
+
+    flattened = flattener(decoded)
+
+    assert decoded["metrics"]["mouse"]["movements"] is trace
+    assert flattened["mouse_movements"] is trace
+    assert len(flattened["keypresses"]) == 2
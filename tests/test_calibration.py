@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from rt_wc_score import MetricsProcessor, MetricsProcessorConfig
+from rt_wc_score.modules.calibration import (
+    ThresholdCalibrator,
+    best_operating_points,
+    curve_summary,
+    operating_curve,
+)
+from rt_wc_score.modules.heuristics import HeuristicConfig
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+
+def _brute_force_curve(scores, labels, thresholds):
+    """Confusion counts of every threshold, one full pass per threshold."""
+    curve = {name: [] for name in ("tp", "fp", "tn", "fn")}
+    for threshold in thresholds:
+        flagged = scores < threshold
+        curve["tp"].append(np.sum(flagged & labels))
+        curve["fp"].append(np.sum(flagged & ~labels))
+        curve["tn"].append(np.sum(~flagged & ~labels))
+        curve["fn"].append(np.sum(~flagged & labels))
+    return {name: np.array(values) for name, values in curve.items()}
+
+
+@pytest.fixture(scope="module")
+def labeled():
+    rng = np.random.default_rng(0)
+    labels = rng.random(2000) < 0.3
+    # Rounded so that many sessions share a score
+    scores = np.round(rng.normal(np.where(labels, 0.3, 0.6), 0.15), 2)
+    return scores, labels
+
+
+def test_curve_matches_a_brute_force_sweep(labeled):
+    scores, labels = labeled
+
+    curve = operating_curve(scores, labels)
+
+    # Every distinct score, then a threshold flagging every session
+    thresholds = np.append(np.unique(scores), np.inf)
+    np.testing.assert_array_equal(curve["thresholds"], thresholds)
+    expected = _brute_force_curve(scores, labels, thresholds)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(curve[name], values)
+
+    tp, fp = expected["tp"], expected["fp"]
+    np.testing.assert_allclose(curve["tpr"], tp / labels.sum())
+    np.testing.assert_allclose(curve["fpr"], fp / (~labels).sum())
+    flagged = tp + fp
+    precision = np.divide(tp, flagged, out=np.ones(len(tp)), where=flagged > 0)
+    np.testing.assert_allclose(curve["precision"], precision)
+
+
+def test_summary_matches_pairwise_comparison(labeled):
+    scores, labels = labeled
+    bots, humans = scores[labels], scores[~labels]
+
+    summary = curve_summary(operating_curve(scores, labels))
+
+    # Chance that a bot scores below a human, ties counting half
+    pairs = bots[:, None] - humans[None, :]
+    auc = np.mean(pairs < 0) + np.mean(pairs == 0) / 2
+    assert summary["roc_auc"] == pytest.approx(auc)
+    assert 0 < summary["average_precision"] <= 1
+
+
+def test_best_points_maximize_over_all_thresholds(labeled):
+    scores, labels = labeled
+    thresholds = np.append(np.unique(scores), np.inf)
+    expected = _brute_force_curve(scores, labels, thresholds)
+    tpr = expected["tp"] / labels.sum()
+    fpr = expected["fp"] / (~labels).sum()
+    precision = expected["tp"] / np.maximum(expected["tp"] + expected["fp"], 1)
+    f1 = 2 * precision * tpr / np.where(precision + tpr > 0, precision + tpr, 1)
+
+    best = best_operating_points(operating_curve(scores, labels))
+
+    assert best["youden"]["threshold"] == thresholds[np.argmax(tpr - fpr)]
+    assert best["f1"]["threshold"] == thresholds[np.argmax(f1)]
+    assert best["f1"]["f1"] == pytest.approx(f1.max())
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=5, chunk_size=64))
+    return list(generator.generate(150))
+
+
+def _verdicts(sessions, heuristics):
+    processor = MetricsProcessor(MetricsProcessorConfig(heuristics=heuristics))
+    return np.array(
+        [processor(session.payload)["analysis"]["is_bot"] for session in sessions]
+    )
+
+
+def test_calibration_matches_rerunning_the_pipeline(sessions):
+    calibrator = ThresholdCalibrator()
+    labels = [session.is_bot for session in sessions]
+    columns, kept = calibrator.compute_features(
+        [session.payload for session in sessions], labels
+    )
+    assert len(kept) == len(sessions)
+
+    result = calibrator.calibrate(columns, kept)
+    for threshold in (0.2, 0.35, 0.5):
+        heuristics = HeuristicConfig(score_threshold=threshold)
+        verdicts = _verdicts(sessions, heuristics)
+        point = calibrator.calibrate(columns, kept, heuristics)["current"]
+        assert point["tp"] == np.sum(verdicts & kept)
+        assert point["fp"] == np.sum(verdicts & ~kept)
+    assert result["current"]["threshold"] == 0.35
+
+
+def test_parameter_sweep_matches_rerunning_the_pipeline(sessions):
+    calibrator = ThresholdCalibrator()
+    labels = np.array([session.is_bot for session in sessions])
+    columns, _ = calibrator.compute_features(
+        [session.payload for session in sessions], labels
+    )
+    values = [400.0, 850.0, 1500.0]
+
+    results = calibrator.sweep(
+        columns, labels, "mouse_events.velocity.min_velocity_variation", values
+    )
+
+    for value, result in zip(values, results):
+        config = HeuristicConfig().model_dump()
+        config["mouse_events"]["velocity"]["min_velocity_variation"] = value
+        verdicts = _verdicts(sessions, HeuristicConfig(**config))
+        assert result["value"] == value
+        assert result["current"]["tp"] == np.sum(verdicts & labels)
+        assert result["current"]["fp"] == np.sum(verdicts & ~labels)
+    with pytest.raises(ValueError):
+        calibrator.sweep(columns, labels, "mouse_events.unknown", [1])
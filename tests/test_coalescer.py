@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from rt_wc_score import BatchCoalescer
+
+
+class _Recorder:
+    """Batch function doubling items and recording the batches it got."""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def __call__(self, items):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+def test_queued_items_are_grouped_up_to_max_batch_size():
+    recorder = _Recorder()
+    coalescer = BatchCoalescer(recorder, max_batch_size=4, max_wait_ms=1000)
+
+    futures = [coalescer.submit(i) for i in range(10)]
+    coalescer.close()
+
+    assert [future.result(0) for future in futures] == [2 * i for i in range(10)]
+    assert recorder.batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_concurrent_callers_share_batches():
+    recorder = _Recorder()
+    results = {}
+
+    with BatchCoalescer(recorder, max_batch_size=4, max_wait_ms=1000) as coalescer:
+
+        def call(item):
+            results[item] = coalescer(item, timeout=5)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == {i: 2 * i for i in range(8)}
+    assert sorted(len(batch) for batch in recorder.batches) == [4, 4]
+    assert coalescer.batch_size.snapshot()["count"] == 2
+
+
+def test_partial_batch_runs_after_max_wait():
+    recorder = _Recorder()
+
+    with BatchCoalescer(recorder, max_batch_size=100, max_wait_ms=10) as coalescer:
+        assert coalescer(21, timeout=5) == 42
+
+    assert recorder.batches == [[21]]
+
+
+def test_close_processes_queued_items():
+    gate = threading.Event()
+    recorder = _Recorder(gate)
+    coalescer = BatchCoalescer(recorder, max_batch_size=2, max_wait_ms=0)
+    futures = [coalescer.submit(i) for i in range(5)]
+
+    closing = threading.Thread(target=coalescer.close)
+    closing.start()
+    gate.set()
+    closing.join(5)
+
+    assert not closing.is_alive()
+    assert [future.result(0) for future in futures] == [0, 2, 4, 6, 8]
+    with pytest.raises(RuntimeError):
+        coalescer.submit(5)
+    coalescer.close()
+
+
+def test_error_reaches_every_caller_of_the_batch():
+    def fail(items):
+        raise KeyError("broken")
+
+    coalescer = BatchCoalescer(fail, max_batch_size=3, max_wait_ms=1000)
+    futures = [coalescer.submit(i) for i in range(3)]
+    coalescer.close()
+
+    for future in futures:
+        with pytest.raises(KeyError):
+            future.result(0)
+
+
+def test_wrong_number_of_results_fails_the_batch():
+    coalescer = BatchCoalescer(lambda items: items[:-1], max_batch_size=2)
+    futures = [coalescer.submit(i) for i in range(2)]
+    coalescer.close()
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(0)
+
+
+def test_cancelled_items_are_left_out():
+    gate = threading.Event()
+    recorder = _Recorder(gate)
+    coalescer = BatchCoalescer(recorder, max_batch_size=1, max_wait_ms=0)
+    first = coalescer.submit(1)
+    second = coalescer.submit(2)
+    third = coalescer.submit(3)
+
+    assert second.cancel()
+    gate.set()
+    coalescer.close()
+
+    assert (first.result(0), third.result(0)) == (2, 6)
+    assert recorder.batches == [[1], [3]]
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [{"max_batch_size": 0}, {"workers": 0}, {"max_wait_ms": -1}],
+)
+def test_limits_are_checked(limits):
+    with pytest.raises(ValueError):
+        BatchCoalescer(lambda items: items, **limits)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import copy
+
+import numpy as np
+import pytest
+
+from rt_wc_score import MetricsProcessor
+from rt_wc_score.columnar import ColumnarConfig, ColumnarRescorer, SessionBatch
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+FEATURES = ("mouse_movement_count", "mouse_movement_stddev_velocity")
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return MetricsProcessor()
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=9, chunk_size=64))
+    payloads = [session.payload for session in generator.generate(12)]
+    for index, payload in enumerate(payloads):
+        movements = payload["metrics"]["mouse"]["movements"]
+        if index % 3 == 0:
+            movements[len(movements) // 2]["timestamp"] = "not a date"
+        elif index % 3 == 1:
+            movements[1]["x"] = None
+            movements.append({"y": 4, "timestamp": movements[-1]["timestamp"]})
+            movements.append(None)
+        else:
+            movements.insert(2, None)
+            movements.append(None)
+    return payloads
+
+
+def _features(processor, payload):
+    features = processor.preprocessor(payload)
+    return {name: features[name] for name in FEATURES}
+
+
+@pytest.mark.parametrize("precision", ["float64", "int32", "float32"])
+def test_invalid_and_null_movements_are_counted(processor, payloads, precision):
+    batch = SessionBatch.from_payloads(
+        payloads, ColumnarConfig(trace_precision=precision)
+    )
+
+    assert batch.tables["invalid"]["mouse_movements"].tolist() == [1, 2, 0] * 4
+    assert batch.tables["nulls"]["mouse_movements"].tolist() == [0, 1, 2] * 4
+    for payload, columnar in zip(payloads, batch):
+        expected = _features(processor, copy.deepcopy(payload))
+        features = _features(processor, columnar)
+        # Null events are counted, as in the JSON
+        assert expected[FEATURES[0]] == len(payload["metrics"]["mouse"]["movements"])
+        assert features[FEATURES[0]] == expected[FEATURES[0]]
+        # float32 timestamps are only precise to a few microseconds
+        assert features[FEATURES[1]] == pytest.approx(expected[FEATURES[1]], rel=1e-5)
+    # Sessions with invalid movements get no velocity, like their JSON, while
+    # null events are skipped
+    assert _features(processor, batch.payload(0))[FEATURES[1]] == 0
+    assert _features(processor, batch.payload(2))[FEATURES[1]] > 0
+
+
+def test_invalid_counts_survive_storage(processor, payloads, tmp_path):
+    batch = SessionBatch.from_payloads(payloads)
+    batch.write(tmp_path / "sessions.npz")
+
+    stored = SessionBatch.read(tmp_path / "sessions.npz")
+
+    for table in ("invalid", "nulls"):
+        np.testing.assert_array_equal(
+            stored.tables[table]["mouse_movements"],
+            batch.tables[table]["mouse_movements"],
+        )
+    for payload, columnar in zip(payloads, stored):
+        assert _features(processor, columnar) == _features(
+            processor, copy.deepcopy(payload)
+        )
+
+
+def test_clean_sessions_have_no_invalid_or_null_table():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=9, chunk_size=64))
+    payloads = [session.payload for session in generator.generate(3)]
+
+    tables = SessionBatch.from_payloads(payloads).tables
+    assert "invalid" not in tables
+    assert "nulls" not in tables
+
+
+def test_rescoring_matches_scoring_payloads(processor, payloads):
+    batch = SessionBatch.from_payloads(payloads)
+
+    tables = ColumnarRescorer().score(batch)
+
+    expected = [
+        processor(copy.deepcopy(payload))["analysis"]["score"] for payload in payloads
+    ]
+    np.testing.assert_allclose(tables["analysis"]["score"], expected)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from rt_wc_score import MetricsProcessor
+from rt_wc_score.columnar import (
+    ColumnarConfig,
+    ColumnarRescorer,
+    CorpusWriter,
+    SessionCorpus,
+    read_tables,
+)
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+CONFIG = ColumnarConfig(shard_size=10)
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=17, chunk_size=64))
+    payloads = [session.payload for session in generator.generate(25)]
+    payloads[21]["user_id"] = payloads[4]["user_id"]
+    return payloads
+
+
+@pytest.fixture(scope="module")
+def scores(payloads):
+    processor = MetricsProcessor()
+    return [
+        processor(copy.deepcopy(payload))["analysis"]["score"] for payload in payloads
+    ]
+
+
+@pytest.fixture(scope="module")
+def corpus(payloads, tmp_path_factory):
+    path = tmp_path_factory.mktemp("corpus")
+    with CorpusWriter(path, CONFIG) as writer:
+        # Sessions arrive both as JSON text and as dictionaries
+        writer.extend(json.dumps(payload) for payload in payloads[:12])
+        writer.extend(copy.deepcopy(payload) for payload in payloads[12:])
+    return SessionCorpus(path, CONFIG)
+
+
+def test_sessions_round_trip(corpus, payloads, scores):
+    assert len(corpus) == len(payloads)
+    assert len(corpus.shard_names) == 3
+
+    processor = MetricsProcessor()
+    for payload, stored, score in zip(payloads, corpus, scores):
+        assert stored["user_id"] == payload["user_id"]
+        assert processor(stored)["analysis"]["score"] == score
+
+
+def test_sessions_are_found_by_position(corpus, payloads):
+    for index in (0, 9, 10, 24):
+        assert corpus.session(index)["user_id"] == payloads[index]["user_id"]
+    with pytest.raises(IndexError):
+        corpus.session(len(payloads))
+
+
+def test_sessions_are_found_by_user(corpus, payloads, scores):
+    found = corpus.find(payloads[4]["user_id"])
+
+    processor = MetricsProcessor()
+    assert [processor(session)["analysis"]["score"] for session in found] == [
+        scores[4],
+        scores[21],
+    ]
+    assert [session["user_id"] for session in corpus.find(payloads[7]["user_id"])] == [
+        payloads[7]["user_id"]
+    ]
+    assert corpus.find("nobody") == []
+
+
+def test_rescored_corpus_matches_the_pipeline(corpus, scores, tmp_path):
+    summary = ColumnarRescorer(config=CONFIG).rescore_corpus(corpus, tmp_path)
+
+    assert (summary["shards"], summary["sessions"]) == (3, len(scores))
+    rescored = np.concatenate(
+        [
+            read_tables(tmp_path / f"{name}.npz")[0]["analysis"]["score"]
+            for name in corpus.shard_names
+        ]
+    )
+    assert rescored.tolist() == pytest.approx(scores)
+
+
+def test_existing_corpus_is_not_overwritten(corpus, payloads):
+    with pytest.raises(ValueError):
+        CorpusWriter(corpus.path, CONFIG)
+    assert len(SessionCorpus(corpus.path, CONFIG)) == len(payloads)
+
+
+def test_interrupted_corpus_cannot_be_opened(payloads, tmp_path):
+    with pytest.raises(RuntimeError):
+        with CorpusWriter(tmp_path, CONFIG) as writer:
+            writer.extend(payloads[:15])
+            raise RuntimeError("interrupted")
+
+    assert not SessionCorpus.is_corpus(tmp_path)
+    with pytest.raises(ValueError):
+        SessionCorpus(tmp_path, CONFIG)
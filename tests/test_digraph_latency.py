@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from rt_wc_score.modules.preprocessing.feature_engineer.keyboard_events import (
+    DigraphLatencyProcessor,
+)
+from rt_wc_score.modules.preprocessing.feature_engineer.keyboard_events._digraph_latency import (
+    _DigraphTable,
+)
+from rt_wc_score.modules.preprocessing.feature_engineer.keyboard_events.config import (
+    DigraphLatencyConfig,
+    DigraphLatencyProcessingConfig,
+)
+
+
+def _processor(**processing):
+    return DigraphLatencyProcessor(
+        DigraphLatencyConfig(processing=DigraphLatencyProcessingConfig(**processing))
+    )
+
+
+def _events(keys, interval=0.1):
+    return [
+        {"key": key, "timestamp": 100.0 + index * interval}
+        for index, key in enumerate(keys)
+    ]
+
+
+def test_full_table_evicts_the_least_recent_rare_digraph():
+    table = _DigraphTable(capacity=3, min_samples=2)
+    for digraph in ["ab", "ab", "cd", "ef"]:
+        table.add(digraph, 0.1)
+
+    table.add("gh", 0.1)
+
+    # "ef" is kept to gather samples, as it was seen after "cd"
+    assert set(table.slots) == {"ab", "ef", "gh"}
+    assert table.evicted == 1
+    assert table.counts[table.slots["ab"]] == 2
+
+
+def test_digraphs_with_min_samples_are_never_evicted():
+    table = _DigraphTable(capacity=2, min_samples=2)
+    for digraph in ["ab", "ab", "cd", "cd"]:
+        table.add(digraph, 0.1)
+
+    for digraph in ["ef", "gh", "ef"]:
+        table.add(digraph, 0.1)
+
+    assert set(table.slots) == {"ab", "cd"}
+    assert (table.evicted, table.dropped) == (0, 3)
+    assert table.samples == 7
+
+
+def test_unique_counts_digraphs_beyond_the_table():
+    keys = list("abcdefghij") * 3
+
+    small = _processor(max_digraphs=2)(_events(keys))
+    large = _processor(max_digraphs=64)(_events(keys))
+
+    # 9 digraphs within the sequence and "ja" across its repetitions
+    assert small["keyboard_digraph_unique"] == large["keyboard_digraph_unique"] == 10
+    assert small["keyboard_digraph_count"] == len(keys) - 1
+
+
+def test_latency_statistics():
+    events = _events("abab", interval=0.1)
+    events[2]["timestamp"] += 0.1
+    events[3]["timestamp"] += 0.1
+
+    features = _processor(min_samples=2)(events)
+
+    assert features["keyboard_digraph_count"] == 3
+    assert features["keyboard_digraph_mean_latency"] == pytest.approx(0.4 / 3)
+    assert features["keyboard_digraph_std_latency"] == pytest.approx(
+        (2 * (0.1 - 0.4 / 3) ** 2 + (0.2 - 0.4 / 3) ** 2) ** 0.5 / 3**0.5
+    )
+    # Only "ab" has 2 samples, both 0.1 s apart
+    assert features["keyboard_digraph_mean_cv"] == pytest.approx(0.0)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+
+import pytest
+
+from rt_wc_score.feature_store import FeatureStore, FeatureStoreConfig
+from rt_wc_score.feature_store import _main
+from rt_wc_score.modules.preprocessing import PreprocessorConfig
+from rt_wc_score.modules.preprocessing.json_flattener import (
+    JsonDataFlattenerConfigPM,
+)
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=23, chunk_size=64))
+    return [session.payload for session in generator.generate(4)]
+
+
+def _store(path, config=None):
+    """Open a store, counting the payloads it engineers."""
+    store = FeatureStore(path, config)
+    store.engineered = 0
+    engineer = store._engineer
+
+    def counting(payload):
+        store.engineered += 1
+        return engineer(payload)
+
+    store._engineer = counting
+    return store
+
+
+def _fill(path, payloads):
+    with _store(path) as store:
+        expected = store.features_many(copy.deepcopy(payloads))
+    assert store.engineered == len(payloads)
+    return expected
+
+
+def test_same_configuration_and_version_hit(payloads, tmp_path):
+    path = tmp_path / "features.db"
+    expected = _fill(path, payloads)
+
+    with _store(path) as store:
+        features = store.features_many(copy.deepcopy(payloads))
+
+        assert store.engineered == 0
+        assert len(store) == len(payloads)
+        assert store.get(copy.deepcopy(payloads[0])) is not None
+    assert json.dumps(features, default=str) == json.dumps(expected, default=str)
+
+
+def test_configuration_change_misses(payloads, tmp_path):
+    path = tmp_path / "features.db"
+    _fill(path, payloads)
+    config = FeatureStoreConfig(
+        preprocessor=PreprocessorConfig(
+            flattener=JsonDataFlattenerConfigPM(is_validate=True)
+        )
+    )
+
+    with _store(path, config) as store:
+        assert len(store) == 0
+        assert store.get(copy.deepcopy(payloads[0])) is None
+        store.features_many(copy.deepcopy(payloads))
+
+        assert store.engineered == len(payloads)
+        assert store.purge_stale() == len(payloads)
+    # The entries of the new configuration are kept
+    with _store(path, config) as store:
+        assert len(store) == len(payloads)
+
+
+def test_version_change_misses(payloads, tmp_path, monkeypatch):
+    path = tmp_path / "features.db"
+    _fill(path, payloads)
+    monkeypatch.setattr(_main, "__version__", "0.0.0+other")
+
+    with _store(path) as store:
+        assert store.get_many(copy.deepcopy(payloads)) == [None] * len(payloads)
+        store.features_many(copy.deepcopy(payloads))
+
+        assert store.engineered == len(payloads)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from rt_wc_score.modules.preprocessing import InputRejectedError
+from rt_wc_score.modules.preprocessing.json_flattener import (
+    InputLimitsConfig,
+    JsonDataFlattener,
+    JsonDataFlattenerConfigPM,
+)
+from rt_wc_score.modules.preprocessing.json_flattener import _main
+from rt_wc_score.telemetry import INPUT_REJECTIONS
+
+
+def _flattener(**limits):
+    return JsonDataFlattener(
+        JsonDataFlattenerConfigPM(limits=InputLimitsConfig(**limits))
+    )
+
+
+def _payload(movements=3, checkboxes=2):
+    return {
+        "user_id": "user",
+        "metrics": {
+            "mouse": {
+                "movements": [
+                    {"x": i, "y": i, "timestamp": f"2024-01-01T00:00:{i % 60:02d}Z"}
+                    for i in range(movements)
+                ]
+            }
+        },
+        "additional": {
+            "checkbox_interactions": [
+                {"id": i, "timestamp": "2024-01-01T00:00:00Z"}
+                for i in range(checkboxes)
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def no_decoding(monkeypatch):
+    """Fail the test if the flattener decodes JSON text."""
+
+    def loads(*args, **kwargs):
+        raise AssertionError("JSON text was decoded")
+
+    monkeypatch.setattr(_main.json, "loads", loads)
+
+
+def _rejection(flattener, data, reason, field):
+    before = INPUT_REJECTIONS.value(reason=reason, field=field or "")
+    with pytest.raises(InputRejectedError) as info:
+        flattener(data)
+    assert INPUT_REJECTIONS.value(reason=reason, field=field or "") == before + 1
+    return info.value
+
+
+def test_oversized_text_is_rejected_before_decoding(no_decoding):
+    text = json.dumps(_payload(movements=50))
+
+    error = _rejection(_flattener(max_bytes=100), text, "max_bytes", None)
+
+    assert error.to_dict() == {
+        "reason": "max_bytes",
+        "field": None,
+        "limit": 100,
+        "actual": len(text),
+    }
+
+
+@pytest.mark.parametrize("encode", [lambda text: text, str.encode])
+def test_long_event_list_is_rejected_before_decoding(no_decoding, encode):
+    text = encode(json.dumps(_payload(movements=50)))
+
+    error = _rejection(
+        _flattener(max_events=20), text, "max_events", "mouse_movements"
+    )
+
+    assert error.limit == 20
+    assert error.actual > 20
+
+
+def test_checkbox_limit_is_rejected_before_decoding(no_decoding):
+    text = json.dumps(_payload(checkboxes=30))
+
+    error = _rejection(
+        _flattener(max_events_per_field={"checkboxes": 10}),
+        text,
+        "max_events",
+        "checkboxes",
+    )
+
+    assert (error.limit, error.actual) == (10, 11)
+
+
+def test_dictionary_input_is_checked_after_decoding():
+    error = _rejection(
+        _flattener(max_events=20),
+        _payload(movements=50),
+        "max_events",
+        "mouse_movements",
+    )
+
+    assert error.actual == 50
+
+
+def test_strings_and_nested_objects_do_not_count_as_events():
+    payload = _payload(movements=10)
+    for movement in payload["metrics"]["mouse"]["movements"]:
+        movement["note"] = '"], [{"x": 1}, {"x": 2}],'
+        movement["nested"] = {"a": [1, 2, 3], "b": {"c": {}}}
+    # More objects than the limit, so the text is scanned
+    payload["additional"]["padding"] = [{} for _ in range(100)]
+
+    flattened = _flattener(max_events=10)(json.dumps(payload))
+
+    assert len(flattened["mouse_movements"]) == 10
+
+
+def test_lists_within_limits_are_accepted():
+    flattener = _flattener(max_events=50, max_events_per_field={"checkboxes": 5})
+
+    flattened = flattener(json.dumps(_payload(movements=50, checkboxes=5)))
+
+    assert len(flattened["mouse_movements"]) == 50
+    assert len(flattened["checkboxes"]) == 5
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from rt_wc_score.telemetry._metrics import Counter, Histogram
+
+
+def _run_threads(target, count):
+    for _ in range(count):
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+
+
+def test_exited_threads_do_not_accumulate_cells():
+    counter = Counter("test_requests_total")
+    histogram = Histogram("test_seconds", buckets=(0.5, 1.0))
+
+    def record():
+        counter.inc(2)
+        for value in (0.25, 0.75, 3.0):
+            histogram.observe(value)
+
+    _run_threads(record, 500)
+    record()
+
+    # The retired cell and the cell of the main thread
+    assert len(counter._default._all_cells()) <= 2
+    assert len(histogram._default._all_cells()) <= 2
+    assert counter.value() == 2 * 501
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 3 * 501
+    assert snapshot["sum"] == 4.0 * 501
+    assert snapshot["buckets"] == {0.5: 501, 1.0: 1002, float("inf"): 1503}
+
+
+def test_histogram_folds_full_buffers_of_exited_threads():
+    histogram = Histogram("test_fold_seconds", buckets=(1.0,))
+    size = histogram._default.FOLD_SIZE + 10
+
+    _run_threads(lambda: [histogram.observe(0.5) for _ in range(size)], 20)
+
+    assert histogram.snapshot()["count"] == 20 * size
+    assert len(histogram._default._all_cells()) == 1
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from rt_wc_score.modules.preprocessing.feature_engineer.mouse_events import (
+    MouseClickProcessor,
+)
+from rt_wc_score.modules.preprocessing.feature_engineer.mouse_events.config import (
+    MouseClickConfig,
+    MouseClickProcessingConfig,
+)
+
+
+def _events(timestamps):
+    return [{"timestamp": timestamp} for timestamp in timestamps]
+
+
+@pytest.fixture
+def processor():
+    return MouseClickProcessor(
+        MouseClickConfig(processing=MouseClickProcessingConfig(decel_window=2))
+    )
+
+
+@pytest.fixture
+def session():
+    # Arriving speeds are 10 px/s up to t=4 and 1 px/s after it
+    movements = [
+        {"x": x, "y": 0, "timestamp": float(t)}
+        for t, x in enumerate([0, 10, 20, 30, 40, 41, 42])
+    ]
+    return {
+        "mouse_movements": movements,
+        # The down at 6.5 has no up
+        "mouse_mouseDowns": _events([5.5, 1.5, 3.25, 6.5]),
+        "mouse_mouseUps": _events([1.5, 3.255, 5.6]),
+    }
+
+
+def test_hold_and_approach_features(processor, session):
+    features = processor(session)
+
+    # Holds of 0, 5 and 100 ms; only the down at 5.5 follows a slowdown
+    assert features["mouse_click_hold_count"] == 3
+    assert features["mouse_click_hold_mean"] == pytest.approx(0.105 / 3)
+    assert features["mouse_click_hold_min"] == 0.0
+    assert features["mouse_click_zero_hold_ratio"] == pytest.approx(2 / 3)
+    assert features["mouse_click_instant_ratio"] == pytest.approx(2 / 3)
+    # Without clicks, downs are used: pauses of 0.5, 0.25, 0.5 and 0.5 s, and
+    # the downs at 5.5 and 6.5 follow a slowdown; the one at 1.5 has too few
+    # movements before it to tell
+    assert features["mouse_click_pause_mean"] == pytest.approx(0.4375)
+    assert features["mouse_click_no_decel_ratio"] == 0.5
+
+
+def test_clicks_are_used_for_the_approach(processor, session):
+    session["mouse_clicks"] = _events([3.25])
+
+    features = processor(session)
+
+    assert features["mouse_click_pause_mean"] == pytest.approx(0.25)
+    assert features["mouse_click_no_decel_ratio"] == 1.0
+    assert features["mouse_click_hold_count"] == 3
+
+
+def test_up_after_the_next_down_is_not_matched(processor):
+    features = processor(
+        {"mouse_mouseDowns": _events([0.0, 1.0]), "mouse_mouseUps": _events([1.5])}
+    )
+
+    assert features["mouse_click_hold_count"] == 1
+    assert features["mouse_click_hold_mean"] == pytest.approx(0.5)
+    # No movements: no pause, and nothing decelerated
+    assert features["mouse_click_pause_mean"] is None
+    assert features["mouse_click_no_decel_ratio"] == 1.0
+
+
+def test_no_clicks_give_defaults(processor):
+    features = processor({"mouse_movements": [{"x": 0, "y": 0, "timestamp": 1.0}]})
+
+    assert set(features.values()) == {None}
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import pytest
+
+from rt_wc_score.telemetry import (
+    ProfilingConfig,
+    SamplingProfiler,
+    list_profiles,
+    summarize_profiles,
+)
+
+
+def _busy(raw_data, deadline):
+    """Stand-in for the pipeline, sleeping as long as the payload asks."""
+    time.sleep(raw_data.get("sleep", 0.0))
+    return sum(i * i for i in range(1000))
+
+
+def _profiler(directory, **config):
+    return SamplingProfiler(
+        ProfilingConfig(enabled=True, directory=str(directory), **config)
+    )
+
+
+def _reasons(directory):
+    reasons = []
+    for base in list_profiles(directory):
+        with open(str(base) + ".json", encoding="utf-8") as f:
+            reasons.append(json.load(f)["reason"])
+    return reasons
+
+
+def test_ring_buffer_keeps_the_newest_captures(tmp_path):
+    profiler = _profiler(tmp_path, every_n=1, max_profiles=3, trace_memory=False)
+
+    for index in range(7):
+        assert profiler(_busy, {"events": [0] * index}) == _busy({}, None)
+
+    captures = list_profiles(tmp_path)
+    assert len(captures) == 3
+    assert len(list(tmp_path.iterdir())) == 3 * 2
+    events = []
+    for base in captures:
+        with open(str(base) + ".json", encoding="utf-8") as f:
+            events.append(json.load(f)["events"]["events"])
+    assert events == [4, 5, 6]
+
+
+def test_only_slow_armed_calls_are_kept(tmp_path):
+    profiler = _profiler(
+        tmp_path,
+        every_n=1000,
+        latency_threshold=0.05,
+        armed_every_n=1,
+        trace_memory=False,
+    )
+
+    for sleep in (0.0, 0.1, 0.0, 0.1, 0.0):
+        profiler(_busy, {"sleep": sleep})
+
+    assert _reasons(tmp_path) == ["slow", "slow"]
+
+
+def test_calls_are_not_armed_without_threshold(tmp_path):
+    profiler = _profiler(tmp_path, every_n=4, armed_every_n=1, trace_memory=False)
+
+    for _ in range(9):
+        profiler(_busy, {"sleep": 0.0})
+
+    assert _reasons(tmp_path) == ["sampled", "sampled"]
+
+
+def test_summary_merges_captures(tmp_path):
+    profiler = _profiler(tmp_path, every_n=1, max_profiles=10)
+    payloads = [{"events": list(range(size))} for size in (1, 2, 3)]
+    for payload in payloads:
+        profiler(_busy, payload)
+
+    summary = summarize_profiles(tmp_path, top=5, sort="total")
+
+    assert summary["profiles"] == 3
+    assert summary["reasons"] == {"sampled": 3}
+    assert summary["payload_bytes"] == sum(
+        len(json.dumps(payload, separators=(",", ":"))) for payload in payloads
+    )
+    assert len(summary["functions"]) == 5
+    totals = [function["total_seconds"] for function in summary["functions"]]
+    assert totals == sorted(totals, reverse=True)
+    assert any("_busy" in function["function"] for function in summary["functions"])
+    assert summary["allocations"]
+    assert summarize_profiles(tmp_path / "missing")["profiles"] == 0
+    with pytest.raises(ValueError):
+        summarize_profiles(tmp_path, sort="calls")
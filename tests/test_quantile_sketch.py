@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from rt_wc_score.modules.preprocessing.feature_engineer import QuantileSketch
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def _rank_error(sketch, values):
+    """Largest distance between the requested and the actual rank of a quantile."""
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(QUANTILES), "right")
+    return np.abs(ranks / len(values) - QUANTILES).max()
+
+
+def _capacity(sketch):
+    return sum(sketch._capacity(level) for level in range(len(sketch._levels)))
+
+
+@pytest.mark.parametrize("k", [50, 200])
+def test_rank_error_and_size_are_bounded(k):
+    values = np.random.default_rng(k).lognormal(size=200_000)
+
+    sketch = QuantileSketch(k=k, seed=1).update(values)
+
+    assert sketch.count == len(values)
+    assert _rank_error(sketch, values) < 3 / k
+    assert len(sketch) <= _capacity(sketch) <= 3 * k + 2 * len(sketch._levels)
+    assert (sketch.min, sketch.max) == (values.min(), values.max())
+
+
+def test_quantiles_are_exact_below_k_values():
+    values = np.random.default_rng(0).normal(size=199)
+    values[::10] = np.nan
+
+    sketch = QuantileSketch(k=200, chunk_size=16).update(values)
+
+    values = values[~np.isnan(values)]
+    assert len(sketch) == sketch.count == len(values)
+    np.testing.assert_array_equal(
+        sketch.quantiles(QUANTILES),
+        np.quantile(values, QUANTILES, method="inverted_cdf"),
+    )
+
+
+def test_merged_sketch_summarizes_both_streams():
+    rng = np.random.default_rng(2)
+    first, second = rng.normal(size=50_000), rng.normal(5, 2, size=30_000)
+
+    merged = (
+        QuantileSketch(seed=1)
+        .update(first)
+        .merge(QuantileSketch(seed=2).update(second))
+    )
+
+    values = np.concatenate((first, second))
+    assert merged.count == len(values)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+    assert _rank_error(merged, values) < 3 / merged.k
+    assert len(merged) <= _capacity(merged)
+
+
+def test_merging_small_sketches_is_exact():
+    rng = np.random.default_rng(3)
+    parts = [rng.normal(size=40) for _ in range(4)]
+
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(QuantileSketch().update(part))
+
+    np.testing.assert_array_equal(
+        merged.quantiles(QUANTILES),
+        np.quantile(np.concatenate(parts), QUANTILES, method="inverted_cdf"),
+    )
+
+
+def test_merge_checks_k_and_ignores_empty_sketches():
+    sketch = QuantileSketch(k=100).update([1.0, 2.0])
+
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(k=50))
+    assert sketch.merge(QuantileSketch(k=100)).count == 2
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_dict_round_trip():
+    sketch = QuantileSketch(k=20).update(np.arange(1000.0))
+
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+
+    np.testing.assert_array_equal(
+        restored.quantiles(QUANTILES), sketch.quantiles(QUANTILES)
+    )
+    assert restored.count == sketch.count
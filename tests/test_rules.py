@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from rt_wc_score.modules.heuristics import HeuristicAnalyzer, HeuristicConfig
+from rt_wc_score.modules.heuristics.rules import Rule, RuleConfig, RuleEngine
+
+
+class _Check:
+    """Check with a fixed score, recording whether it ran."""
+
+    def __init__(self, score, cost=1, decisive=False):
+        self.score = score
+        self.cost = cost
+        self.decisive = decisive
+        self.calls = 0
+
+    def __call__(self, features):
+        self.calls += 1
+        return self.score
+
+    def is_decisive(self, features):
+        return self.decisive
+
+
+def _analyzer(rules, **config):
+    analyzer = HeuristicAnalyzer(HeuristicConfig(rules=RuleConfig(**config)))
+    analyzer.mouse_analyzer.rules = rules
+    return analyzer
+
+
+def test_veto_skips_the_remaining_rules():
+    checkbox_path = _Check(0.0, cost=10)
+    rules = [
+        Rule("velocity", _Check(0.0, cost=2), 1.0),
+        Rule("movement_count", _Check(1.0, decisive=True), 1.0),
+        Rule("checkbox_path", checkbox_path, 1.0),
+    ]
+
+    result = _analyzer(rules)({"checkbox": []})
+
+    assert result["score"] == 0.0
+    assert result["is_bot"] == 1
+    assert result["skipped_rules"] == ["velocity", "checkbox_path"]
+    assert result["mouse_scores"]["movement_count"]["veto"]
+    assert checkbox_path.calls == 0
+
+
+def test_few_movements_veto_before_the_checkbox_path():
+    analyzer = HeuristicAnalyzer()
+    minimum = analyzer.config.mouse_events.movement_count.min_movement_count_too_low
+
+    result = analyzer({"checkbox": [], "mouse_movement_count": minimum - 1})
+
+    assert result["score"] == 0.0
+    assert "checkbox_path" in result["skipped_rules"]
+
+
+def test_veto_is_ignored_when_disabled():
+    rules = [
+        Rule("movement_count", _Check(1.0, decisive=True), 1.0),
+        Rule("velocity", _Check(0.0), 3.0),
+    ]
+
+    result = _analyzer(rules, use_veto_rules=False)({"checkbox": []})
+
+    assert result["score"] == 0.75
+    assert "skipped_rules" not in result
+
+
+def test_max_combination():
+    engine = RuleEngine(RuleConfig(combination_method="max"))
+    scores = {
+        "a": {"score": 0.2, "weight": 1.0},
+        "b": {"score": 0.9, "weight": 2.0},
+        "c": {"score": 1.0, "weight": 0.0},
+        "d": {"score": None, "weight": 1.0, "skipped": True},
+    }
+
+    assert engine.combine(scores) == 0.9
+    assert RuleEngine().combine(scores) == pytest.approx((0.2 + 1.8) / 3)
+
+
+def test_max_combination_exits_once_a_rule_is_bot_like():
+    rules = [
+        Rule("a", _Check(0.9), 1.0),
+        Rule("b", _Check(0.0, cost=2), 1.0),
+    ]
+    engine = RuleEngine(
+        RuleConfig(combination_method="max", early_exit=True, min_rules_required=1),
+        score_threshold=0.35,
+    )
+
+    scores = engine.evaluate(rules, {})
+
+    assert scores["b"]["skipped"]
+    assert rules[1].check.calls == 0
+    assert engine.bounds(scores) == (0.9, 1.0)
+
+
+def test_early_exit_gives_a_score_range():
+    expensive = _Check(1.0, cost=10)
+    rules = [
+        Rule("a", _Check(0.0), 1.0),
+        Rule("b", _Check(0.0, cost=2), 1.0),
+        Rule("c", expensive, 1.0),
+    ]
+
+    result = _analyzer(rules, early_exit=True, min_rules_required=1)({"checkbox": []})
+
+    assert result["early_exit"]
+    assert result["score"] is None
+    assert result["confidence"] is None
+    # The skipped rule could score anywhere in [0, 1]
+    assert result["score_range"] == [0.66667, 1.0]
+    assert result["is_bot"] == 0
+    assert result["skipped_rules"] == ["c"]
+    assert expensive.calls == 0
+
+
+def test_no_early_exit_before_min_rules_required():
+    rules = [
+        Rule("a", _Check(0.0), 1.0),
+        Rule("b", _Check(0.0, cost=2), 1.0),
+        Rule("c", _Check(0.0, cost=3), 1.0),
+    ]
+
+    result = _analyzer(rules, early_exit=True, min_rules_required=3)({"checkbox": []})
+
+    assert result["score"] == 1.0
+    assert "early_exit" not in result
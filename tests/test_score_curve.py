@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from rt_wc_score.modules.heuristics.mouse_events._base import BaseHeuristicCheck
+from rt_wc_score.modules.heuristics.mouse_events._curves import ScoreCurve, score_values
+
+
+def test_batch_scores_agree_with_scalar_scores():
+    curve = ScoreCurve(min_value=30.0, max_value=600.0, table_size=16)
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        (
+            rng.uniform(-100.0, 2000.0, 10_000),
+            np.arange(32, dtype=np.float64),
+            [30.0, 600.0, 9.0, 900.0],
+        )
+    )
+
+    batch = curve.batch(values)
+    scalar = np.array([curve(value) for value in values.tolist()])
+
+    np.testing.assert_allclose(batch, scalar, rtol=1e-12, atol=1e-15)
+    assert ((batch >= 0) & (batch <= 1)).all()
+
+
+class _Check(BaseHeuristicCheck):
+    def __call__(self, data):
+        return 0.0
+
+
+def test_array_scoring_matches_scalar_scoring_over_thresholds():
+    check = _Check()
+    rng = np.random.default_rng(1)
+    size = 5_000
+    min_value = rng.uniform(1.0, 100.0, size)
+    max_value = min_value + rng.uniform(1.0, 500.0, size)
+    values = rng.uniform(-50.0, 2.0 * max_value)
+    min_score = rng.uniform(0.0, 1.0, size)
+    max_score = rng.uniform(0.0, 1.0, size)
+    min_of_min = rng.uniform(0.0, 0.9, size)
+    max_of_max = rng.uniform(1.1, 3.0, size)
+
+    batch = check.scoring_function_array(
+        values, min_value, max_value, min_score, max_score, min_of_min, max_of_max
+    )
+    scalar = np.array(
+        [
+            check.scoring_function(*args)
+            for args in zip(
+                values.tolist(),
+                min_value.tolist(),
+                max_value.tolist(),
+                min_score.tolist(),
+                max_score.tolist(),
+                min_of_min.tolist(),
+                max_of_max.tolist(),
+            )
+        ]
+    )
+
+    np.testing.assert_allclose(batch, scalar, rtol=1e-12, atol=1e-12)
+
+
+def test_array_scoring_broadcasts_values_against_threshold_sets():
+    check = _Check()
+    values = np.array([5.0, 30.0, 100.0, 700.0, 2000.0])
+    thresholds = np.array([[30.0, 600.0], [10.0, 90.0], [50.0, 1000.0]])
+
+    scores = score_values(values, thresholds[:, :1], thresholds[:, 1:])
+
+    assert scores.shape == (3, 5)
+    for row, (low, high) in enumerate(thresholds.tolist()):
+        expected = [check.scoring_function(value, low, high) for value in values]
+        np.testing.assert_allclose(scores[row], expected, rtol=1e-12, atol=1e-12)
+
+
+def test_inverse_scaling_array_matches_scalar():
+    check = _Check()
+    rng = np.random.default_rng(2)
+    values = rng.uniform(-10.0, 10.0, 1000)
+    low = rng.uniform(-5.0, 0.0, 1000)
+    high = low + rng.uniform(0.5, 5.0, 1000)
+    rate = rng.uniform(0.05, 3.0, 1000)
+
+    batch = check.inverse_scaling_array(values, low, high, 0.05, 1.0, rate)
+    scalar = [
+        check.inverse_scaling(*args, 0.05, 1.0, r)
+        for *args, r in zip(values.tolist(), low.tolist(), high.tolist(), rate.tolist())
+    ]
+
+    np.testing.assert_allclose(batch, scalar, rtol=1e-12, atol=1e-12)
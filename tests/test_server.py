@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+import http.client
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from rt_wc_score import MetricsProcessor
+from rt_wc_score._utils import json_compatible
+from rt_wc_score.server import ScoringServer, ServerConfig
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+
+def _strict_loads(data):
+    def reject(token):
+        raise ValueError(f"Non-standard JSON token {token}")
+
+    return json.loads(data, parse_constant=reject)
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=11, chunk_size=64))
+    return [session.payload for session in generator.generate(6)]
+
+
+@pytest.fixture(scope="module")
+def server():
+    scoring = ScoringServer(
+        ServerConfig(port=0, workers=2, max_queue=1, max_body_bytes=4 * 1024 * 1024)
+    )
+    scoring.start()
+    yield scoring
+    scoring.shutdown()
+
+
+@pytest.fixture
+def connection(server):
+    host, port = server.address
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def saturated(server):
+    """Hold every admission slot of the server."""
+    for _ in range(server.config.workers + server.config.max_queue):
+        assert server.admit()
+    yield server
+    for _ in range(server.config.workers + server.config.max_queue):
+        server.release()
+
+
+def _request(connection, method, path, body=None, headers=None):
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response, _strict_loads(response.read())
+
+
+def _post_raw(server, path, head, body=b""):
+    """Send a request as raw bytes, for headers `http.client` would fix up."""
+    host, port = server.address
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.connect()
+    connection.sock.sendall(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\n{head}\r\n".encode() + body
+    )
+    response = http.client.HTTPResponse(connection.sock, method="POST")
+    response.begin()
+    try:
+        return response, _strict_loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_health_and_readiness(connection):
+    response, body = _request(connection, "GET", "/healthz")
+    assert (response.status, body) == (200, {"status": "ok"})
+
+    response, body = _request(connection, "GET", "/readyz")
+    assert (response.status, body) == (200, {"ready": True, "in_flight": 0})
+
+
+def test_saturated_server_is_not_ready_and_rejects_requests(
+    saturated, connection, payloads
+):
+    response, body = _request(connection, "GET", "/readyz")
+    assert response.status == 503
+    assert body == {"ready": False, "in_flight": 3}
+
+    start = time.monotonic()
+    response, body = _request(connection, "POST", "/score", json.dumps(payloads[0]))
+    assert response.status == 503
+    assert response.getheader("Retry-After") == "1"
+    assert body == {"error": "Server is saturated"}
+    assert time.monotonic() - start < 1.0
+    # The body was drained, so the connection stays usable
+    assert not response.will_close
+    response, _ = _request(connection, "GET", "/healthz")
+    assert response.status == 200
+
+
+def test_score_matches_the_pipeline(connection, payloads):
+    response, body = _request(connection, "POST", "/score", json.dumps(payloads[0]))
+
+    assert response.status == 200
+    expected = MetricsProcessor()(payloads[0])
+    assert body["analysis"]["score"] == pytest.approx(expected["analysis"]["score"])
+
+
+def test_batch_matches_scoring_one_by_one(connection, payloads):
+    response, body = _request(connection, "POST", "/score/batch", json.dumps(payloads))
+
+    assert response.status == 200
+    processor = MetricsProcessor()
+    expected = [processor(payload)["analysis"]["score"] for payload in payloads]
+    scores = [result["analysis"]["score"] for result in body["results"]]
+    assert scores == pytest.approx(expected)
+
+
+def test_batch_size_is_limited(server, connection):
+    batch = [{}] * (server.config.max_batch_size + 1)
+
+    response, body = _request(connection, "POST", "/score/batch", json.dumps(batch))
+
+    assert response.status == 400
+    assert "at most" in body["error"]
+
+
+def test_missing_content_length_is_rejected(server):
+    response, body = _post_raw(server, "/score", "")
+
+    assert response.status == 411
+    assert response.will_close
+
+
+@pytest.mark.parametrize("value", ["abc", "-1", "1e3", "١٢"])
+def test_invalid_content_length_is_rejected(server, value):
+    response, body = _post_raw(server, "/score", f"Content-Length: {value}\r\n")
+
+    assert response.status == 400
+    assert body == {"error": "Invalid Content-Length"}
+    assert response.will_close
+
+
+def test_oversized_body_is_rejected_without_reading_it(server):
+    length = server.config.max_body_bytes + 1
+
+    response, body = _post_raw(server, "/score", f"Content-Length: {length}\r\n")
+
+    assert response.status == 413
+    assert response.will_close
+
+
+def test_invalid_json_is_rejected(connection):
+    response, body = _request(connection, "POST", "/score", b"{not json")
+
+    assert response.status == 400
+    assert body["error"].startswith("Invalid JSON")
+
+
+def test_connection_is_kept_alive(connection, payloads):
+    _request(connection, "GET", "/healthz")
+    sock = connection.sock
+
+    for path, body in [("/score", json.dumps(payloads[0])), ("/nowhere", b"{}")]:
+        response, _ = _request(connection, "POST", path, body)
+        assert not response.will_close
+    response, _ = _request(connection, "GET", "/readyz")
+
+    assert response.status == 200
+    assert connection.sock is sock
+
+
+def test_concurrent_requests_beyond_capacity_get_503(server, payloads):
+    body = json.dumps(payloads * 4).encode("utf-8")
+    barrier = threading.Barrier(16)
+    latencies = {200: [], 503: []}
+
+    def post():
+        host, port = server.address
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        connection.connect()
+        barrier.wait()
+        start = time.monotonic()
+        response, _ = _request(connection, "POST", "/score/batch", body)
+        latencies[response.status].append(time.monotonic() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=post) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(map(len, latencies.values())) == 16
+    assert len(latencies[200]) >= server.config.workers
+    assert latencies[503]
+    # Rejections do not wait for the admitted requests
+    assert max(latencies[503]) < min(max(latencies[200]), 1.0)
+    assert server.in_flight == 0
+
+
+def test_non_finite_numbers_are_sent_as_null():
+    body = {"score": float("nan"), "values": np.array([1.0, np.inf]), "n": np.int64(2)}
+
+    converted = json_compatible(body)
+
+    assert converted == {"score": None, "values": [1.0, None], "n": 2}
+    assert _strict_loads(json.dumps(converted, allow_nan=False)) == converted
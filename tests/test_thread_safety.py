@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from rt_wc_score import MetricsProcessor
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+
+def _canonical(result):
+    """Serialize a result so NaN and numpy values compare as equal."""
+    return json.dumps(
+        result,
+        sort_keys=True,
+        default=lambda value: (
+            value.tolist() if hasattr(value, "tolist") else str(value)
+        ),
+    )
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=11, chunk_size=64))
+    return [session.payload for session in generator.generate(256)]
+
+
+def test_shared_processor_matches_sequential_run(payloads):
+    processor = MetricsProcessor()
+    expected = [_canonical(processor(payload)) for payload in payloads]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        # Every payload is scored several times, interleaved across threads
+        results = list(executor.map(processor, payloads * 4))
+
+    for index, result in enumerate(results):
+        assert _canonical(result) == expected[index % len(payloads)]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from rt_wc_score import MetricsProcessor
+from rt_wc_score.columnar import ColumnarConfig, SessionBatch
+from rt_wc_score.synthetic import SessionGenerator, SessionGeneratorConfig
+
+
+def _scores(batch):
+    processor = MetricsProcessor()
+    return np.array([processor(payload)["analysis"]["score"] for payload in batch])
+
+
+def _trace_bytes(batch):
+    """Bytes of the trace columns and of their origins."""
+    tables = [batch.tables[name] for name in batch.trace_fields]
+    tables.append(batch.tables.get("origins", {}))
+    return sum(column.nbytes for table in tables for column in table.values())
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    generator = SessionGenerator(SessionGeneratorConfig(seed=7, chunk_size=64))
+    return [session.payload for session in generator.generate(200)]
+
+
+@pytest.fixture(scope="module")
+def batches(payloads):
+    return {
+        precision: SessionBatch.from_payloads(
+            payloads, ColumnarConfig(trace_precision=precision)
+        )
+        for precision in ("float64", "int32", "float32")
+    }
+
+
+@pytest.mark.parametrize("precision, atol", [("int32", 1e-9), ("float32", 0.02)])
+def test_compact_traces_score_within_tolerance(batches, precision, atol):
+    expected = _scores(batches["float64"])
+
+    np.testing.assert_allclose(_scores(batches[precision]), expected, rtol=0, atol=atol)
+
+
+@pytest.mark.parametrize("precision", ["int32", "float32"])
+def test_compact_traces_halve_memory(batches, precision):
+    ratio = _trace_bytes(batches[precision]) / _trace_bytes(batches["float64"])
+
+    assert 0.45 < ratio < 0.55
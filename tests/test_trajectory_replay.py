@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import numpy as np
+import pytest
+
+from rt_wc_score import ReloadingMetricsProcessor
+from rt_wc_score.modules.preprocessing.feature_engineer._base import to_movement_trace
+from rt_wc_score.modules.preprocessing.feature_engineer.mouse_events import (
+    TrajectoryIndex,
+    TrajectoryReplayConfig,
+    TrajectoryReplayProcessor,
+    trajectory_shingles,
+)
+from rt_wc_score.modules.preprocessing.feature_engineer.mouse_events.config import (
+    TrajectoryReplayProcessingConfig,
+)
+
+
+def _movements(seed, shift=(0, 0), jitter=0, size=300):
+    """Random walk, shifted and jittered by whole pixels."""
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.normal(0, 10, size)) + shift[0]
+    y = np.cumsum(rng.normal(0, 10, size)) + shift[1]
+    noise = np.random.default_rng(seed + 1000)
+    x += noise.integers(-jitter, jitter + 1, size)
+    y += noise.integers(-jitter, jitter + 1, size)
+    return [
+        {"x": float(a), "y": float(b), "timestamp": 1.7e9 + index * 0.016}
+        for index, (a, b) in enumerate(zip(x, y))
+    ]
+
+
+def _session(user_id, seed, **replay):
+    return {"user_id": user_id, "mouse_movements": _movements(seed, **replay)}
+
+
+def test_shifted_and_jittered_replay_matches():
+    processor = TrajectoryReplayProcessor()
+    assert processor(_session("original", 1)) == {
+        "mouse_replay_similarity": 0.0,
+        "mouse_replay_matches": [],
+    }
+
+    result = processor(_session("replay", 1, shift=(240, -130), jitter=2))
+
+    assert result["mouse_replay_similarity"] >= 0.5
+    assert [match["user_id"] for match in result["mouse_replay_matches"]] == [
+        "original"
+    ]
+
+
+def test_unrelated_traces_do_not_match():
+    processor = TrajectoryReplayProcessor()
+
+    results = [processor(_session(f"user-{seed}", seed)) for seed in range(20)]
+
+    assert all(result["mouse_replay_similarity"] == 0.0 for result in results)
+    assert all(result["mouse_replay_matches"] == [] for result in results)
+
+
+def test_full_index_evicts_the_oldest_traces():
+    config = TrajectoryReplayProcessingConfig(capacity=4)
+    processor = TrajectoryReplayProcessor(TrajectoryReplayConfig(processing=config))
+    for seed in range(6):
+        processor(_session(f"user-{seed}", seed))
+
+    assert len(processor.index) == 4
+    for seed in range(6):
+        trace = to_movement_trace(_movements(seed, jitter=1))
+        signature = processor.index.signature(trajectory_shingles(trace, config))
+        keys = [key for key, _ in processor.index.query(signature)]
+        assert keys == ([] if seed < 2 else [f"user-{seed}"])
+
+
+def test_failure_gives_every_feature():
+    result = TrajectoryReplayProcessor()({"mouse_movements": 5})
+
+    assert np.isnan(result["mouse_replay_similarity"])
+    assert result["mouse_replay_matches"] == []
+
+
+def test_index_must_match_the_configuration():
+    index = TrajectoryIndex(TrajectoryReplayProcessingConfig(grid_size=8.0))
+
+    with pytest.raises(ValueError):
+        TrajectoryReplayProcessor(index=index)
+
+
+def _replay_index(processor):
+    return processor.processor.preprocessor.feature_engineer.replay_processor.index
+
+
+def test_reloaded_pipelines_keep_the_replay_history(tmp_path):
+    path = tmp_path / "config.json"
+
+    def write(score_threshold, grid_size=16.0):
+        config = {
+            "heuristics": {"score_threshold": score_threshold},
+            "preprocessor": {
+                "feature_engineer": {"replay": {"processing": {"grid_size": grid_size}}}
+            },
+        }
+        path.write_text(json.dumps(config))
+
+    write(0.35)
+    processor = ReloadingMetricsProcessor(path, cache_size=1)
+    index = _replay_index(processor)
+    index.add(index.signature(np.arange(20, dtype=np.uint64)), key="user")
+
+    write(0.4)
+    assert processor.reload(force=True)
+    # The first pipeline was evicted from the cache
+    write(0.35)
+    assert processor.reload(force=True)
+    assert _replay_index(processor) is index
+    assert len(index) == 1
+
+    write(0.35, grid_size=8.0)
+    assert processor.reload(force=True)
+    assert _replay_index(processor) is not index
+    assert len(_replay_index(processor)) == 0